@@ -0,0 +1,131 @@
+"""Seeded synthetic tenants for benchmarking the RBAC data model."""
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import src.components.access_control.hierarchy  # noqa: F401  (writes the closure rows of flushed roles)
+from src.components.access_control.models import (
+    FeatureModule,
+    Group,
+    GroupRole,
+    Permission,
+    Role,
+    RolePermission,
+    UserGroup,
+    UserPermission,
+    UserRole,
+)
+from src.components.organizations.models import Organization, OrgUserTypeEnum, UserOrganization
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+
+_WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet", "kilo",
+          "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango", "uniform", "victor"]
+
+
+@dataclass
+class TenantProfile:
+    """Shape of the generated data; ``*_per_*`` counts are averages drawn per row with the profile's seed."""
+
+    orgs: int = 5
+    users_per_org: int = 200
+    groups_per_org: int = 10
+    roles_per_org: int = 20
+    modules: int = 10
+    actions_per_module: int = 5
+    permissions_per_role: int = 8
+    roles_per_user: int = 2
+    groups_per_user: int = 1
+    roles_per_group: int = 2
+    direct_permissions_per_user: int = 1
+    seed: int = 42
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class GeneratedTenants:
+    """Ids of what was generated, for the benchmarks to pick their inputs from."""
+
+    super_admin_id: int
+    org_ids: List[int] = field(default_factory=list)
+    # org id -> ids of its owner, staff, roles and groups
+    owner_ids: Dict[int, int] = field(default_factory=dict)
+    staff_ids: Dict[int, List[int]] = field(default_factory=dict)
+    role_ids: Dict[int, List[int]] = field(default_factory=dict)
+    group_ids: Dict[int, List[int]] = field(default_factory=dict)
+    permission_ids: List[int] = field(default_factory=list)
+    permission_names: List[tuple] = field(default_factory=list)
+
+
+def _sample(rng: random.Random, population: List[int], average: int) -> List[int]:
+    # Uniform around the average so the densities vary per row while the totals stay predictable
+    count = min(len(population), rng.randint(0, 2 * average)) if average else 0
+    return rng.sample(population, count)
+
+
+def _insert_ids(db_session: Session, model, rows: List[Dict]) -> List[int]:
+    if not rows:
+        return []
+    return list(db_session.execute(insert(model).returning(model.id), rows).scalars())
+
+
+def generate_tenants(db_session: Session, profile: TenantProfile) -> GeneratedTenants:
+    """Insert ``profile``'s organizations with their users, roles, groups and grants, and commit."""
+    rng = random.Random(profile.seed)
+    module_ids = _insert_ids(db_session, FeatureModule, [{"name": f"module{m}"} for m in range(profile.modules)])
+    permission_rows = [{"module_id": module_id, "action": f"action{a}"}
+                       for module_id in module_ids for a in range(profile.actions_per_module)]
+    generated = GeneratedTenants(super_admin_id=_insert_ids(db_session, User, [{
+        "name": "Super Admin", "email": "admin@example.com", "auth0_id": "bench|admin",
+        "user_type": UserTypeEnum.SUPER_ADMIN, "is_active": True}])[0])
+    generated.permission_ids = _insert_ids(db_session, Permission, permission_rows)
+    generated.permission_names = [(f"module{m}", f"action{a}")
+                                  for m in range(profile.modules) for a in range(profile.actions_per_module)]
+
+    for o in range(profile.orgs):
+        org_id = _insert_ids(db_session, Organization, [{"name": f"{rng.choice(_WORDS).title()} Org {o}",
+                                                         "slug": f"org-{o}", "is_active": True}])[0]
+        user_ids = _insert_ids(db_session, User, [{
+            "name": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} {o}-{u}",
+            "email": f"user{o}-{u}@example.com", "auth0_id": f"bench|{o}-{u}",
+            "user_type": UserTypeEnum.ORG_USER, "is_active": True} for u in range(profile.users_per_org + 1)])
+        owner_id, staff_ids = user_ids[0], user_ids[1:]
+        db_session.execute(insert(UserOrganization), [
+            {"user_id": user_id, "organization_id": org_id,
+             "user_type": OrgUserTypeEnum.ORG_OWNER if user_id == owner_id else OrgUserTypeEnum.ORG_STAFF}
+            for user_id in user_ids])
+        # Roles go through the session, whose flush writes their closure rows
+        roles = [Role(name=f"role{r}", organization_id=org_id) for r in range(profile.roles_per_org)]
+        db_session.add_all(roles)
+        db_session.flush()
+        role_ids = [role.id for role in roles]
+        group_ids = _insert_ids(db_session, Group, [{"name": f"group{g}", "organization_id": org_id}
+                                                    for g in range(profile.groups_per_org)])
+        links = {
+            RolePermission: [{"role_id": role_id, "permission_id": permission_id} for role_id in role_ids
+                             for permission_id in _sample(rng, generated.permission_ids, profile.permissions_per_role)],
+            GroupRole: [{"group_id": group_id, "role_id": role_id} for group_id in group_ids
+                        for role_id in _sample(rng, role_ids, profile.roles_per_group)],
+            UserRole: [{"user_id": user_id, "role_id": role_id} for user_id in staff_ids
+                       for role_id in _sample(rng, role_ids, profile.roles_per_user)],
+            UserGroup: [{"user_id": user_id, "group_id": group_id} for user_id in staff_ids
+                        for group_id in _sample(rng, group_ids, profile.groups_per_user)],
+            UserPermission: [{"user_id": user_id, "permission_id": permission_id} for user_id in staff_ids
+                             for permission_id in _sample(rng, generated.permission_ids,
+                                                          profile.direct_permissions_per_user)],
+        }
+        for model, rows in links.items():
+            if rows:
+                db_session.execute(insert(model), rows)
+        generated.org_ids.append(org_id)
+        generated.owner_ids[org_id] = owner_id
+        generated.staff_ids[org_id] = staff_ids
+        generated.role_ids[org_id] = role_ids
+        generated.group_ids[org_id] = group_ids
+    db_session.commit()
+    return generated
@@ -0,0 +1,90 @@
+"""Minimal timing harness whose results are plain JSON, so runs of different versions can be diffed."""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    iterations: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    p95: float
+    stdev: float
+    ops_per_second: float
+    # Items handled per call, e.g. rows serialized, so costs can be compared per item across batch sizes
+    items: int = 1
+    per_item_median: float = 0.0
+
+
+def _percentile(sorted_timings: List[float], fraction: float) -> float:
+    return sorted_timings[min(len(sorted_timings) - 1, int(round(fraction * (len(sorted_timings) - 1))))]
+
+
+def measure(name: str, func: Callable[[], object], iterations: int = 50, warmup: int = 5,
+            setup: Optional[Callable[[], object]] = None, items: int = 1) -> BenchmarkResult:
+    """Time ``func`` over ``iterations`` calls after ``warmup`` untimed ones; ``setup`` runs untimed before each."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    timings = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    mean, median = statistics.fmean(timings), statistics.median(timings)
+    return BenchmarkResult(name=name, iterations=iterations, min=timings[0], max=timings[-1], mean=mean,
+                           median=median, p95=_percentile(timings, 0.95),
+                           stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                           ops_per_second=1 / mean if mean else 0.0, items=items, per_item_median=median / items)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: List[BenchmarkResult], profile: Dict) -> Dict:
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "profile": profile,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[str]:
+    """Benchmarks whose median grew by more than ``threshold`` (a fraction) since ``baseline``."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before and before["median"] and result["median"] > before["median"] * (1 + threshold):
+            regressions.append(f"{result['name']}: median {before['median'] * 1000:.3f}ms -> "
+                               f"{result['median'] * 1000:.3f}ms (+{result['median'] / before['median'] - 1:.0%})")
+    return regressions
+
+
+def write_report(report: Dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def read_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as report_file:
+        return json.load(report_file)
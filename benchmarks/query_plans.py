@@ -0,0 +1,97 @@
+"""Print the SQLite query plan of every reverse lookup the repositories run, without and with the secondary indexes.
+
+    python -m benchmarks.query_plans
+
+"SCAN" means a full table scan; "SEARCH ... USING (COVERING) INDEX" means the lookup is served by an index.
+"""
+import os
+import tempfile
+from typing import Dict, List
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import Engine
+
+from src.components.access_control.models import (
+    Group,
+    GroupRole,
+    Role,
+    RolePermission,
+    UserEffectivePermission,
+    UserGroup,
+    UserPermission,
+    UserRole,
+)
+from src.components.audit_log.models import AuditLog
+from src.components.organizations.models import OrgUserTypeEnum, UserOrganization
+from src.core.db import Base, load_models
+
+# Indexes added by migrations 0001 and 0003, dropped to reproduce the plans from before it
+SECONDARY_INDEXES = [
+    "ix_user_role_role_id_user_id",
+    "ix_user_group_group_id_user_id",
+    "ix_group_role_role_id_group_id",
+    "ix_role_permission_permission_id_role_id",
+    "ix_user_permission_permission_id_user_id",
+    "ix_user_organization_organization_id_user_type",
+    "ix_group_organization_id",
+    "ix_group_created_by_id",
+    "ix_group_updated_by_id",
+    "ix_role_organization_id",
+    "ix_role_created_by_id",
+    "ix_role_updated_by_id",
+    "ix_organization_created_by_id",
+    "ix_organization_updated_by_id",
+    "ix_user_effective_permission_org_id_permission_id",
+    "ix_audit_log_org_id_created_at",
+]
+
+ACCESS_PATHS = {
+    "users holding a role": select(UserRole.user_id).where(UserRole.role_id.in_([1, 2])),
+    "groups holding a role": select(GroupRole.group_id).where(GroupRole.role_id.in_([1, 2])),
+    "members of a group": select(UserGroup.user_id).where(UserGroup.group_id.in_([1, 2])),
+    "roles granting a permission": select(RolePermission.role_id).where(RolePermission.permission_id == 1),
+    "users granted a permission": select(UserPermission.user_id).where(UserPermission.permission_id == 1),
+    "members of an organization": select(UserOrganization.user_id).where(UserOrganization.organization_id == 1),
+    "staff among users": select(UserOrganization.user_id).where(
+        UserOrganization.organization_id == 1, UserOrganization.user_id.in_([1, 2, 3]),
+        UserOrganization.user_type == OrgUserTypeEnum.ORG_STAFF),
+    "roles of an organization": select(Role.id).where(Role.organization_id == 1),
+    "groups of an organization": select(Group.id).where(Group.organization_id == 1),
+    "roles created by a user": select(Role.id).where(Role.created_by_id == 1),
+    "holders of an effective permission": select(UserEffectivePermission.user_id).where(
+        UserEffectivePermission.org_id == 1, UserEffectivePermission.permission_id == 1),
+    "latest audit entries of an organization": select(AuditLog.id).where(AuditLog.org_id == 1).order_by(
+        AuditLog.created_at.desc()).limit(50),
+}
+
+
+def explain(engine: Engine) -> Dict[str, List[str]]:
+    plans = {}
+    with engine.connect() as connection:
+        for name, query in ACCESS_PATHS.items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plans[name] = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return plans
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'plans.sqlite')}")
+        load_models()
+        Base.metadata.create_all(engine)
+        after = explain(engine)
+        with engine.begin() as connection:
+            for index in SECONDARY_INDEXES:
+                connection.execute(text(f"DROP INDEX {index}"))
+        # New connections, so no statement prepared against the old schema is reused
+        engine.dispose()
+        before = explain(engine)
+        engine.dispose()
+    for name in ACCESS_PATHS:
+        print(name)
+        print(f"  before: {'; '.join(before[name])}")
+        print(f"  after:  {'; '.join(after[name])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmark the RBAC data model against a seeded synthetic tenant set and write the timings as JSON.
+
+    python -m benchmarks.run --orgs 5 --users-per-org 200 --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+
+Every run generates a fresh SQLite database in a temporary directory unless ``--database-url`` names an empty
+database to use instead. ``--compare`` exits with status 1 when a median regressed by more than ``--threshold``.
+"""
+import argparse
+import dataclasses
+import itertools
+import os
+import random
+import sys
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session, sessionmaker
+
+import src.components.audit_log.models  # noqa: F401
+from benchmarks.generator import GeneratedTenants, TenantProfile, generate_tenants
+from benchmarks.harness import BenchmarkResult, build_report, compare_reports, measure, read_report, write_report
+from src.components.access_control.bitset import invalidate_permission_catalogue
+from src.components.access_control.cache import clear_permission_caches
+from src.components.access_control.models import Role, UserPermission
+from src.components.access_control.repository import RBACRepository
+from src.components.organizations.cache import membership_cache
+from src.components.users.repository import UserRepository
+from src.config import Settings
+from src.core.db import Base, get_db
+from src.main import create_application
+
+
+def clear_caches() -> None:
+    invalidate_permission_catalogue()
+    clear_permission_caches()
+    membership_cache.clear()
+
+
+def _repository_benchmarks(db_session: Session, tenants: GeneratedTenants,
+                           rng: random.Random) -> List[Tuple[str, Callable, Callable]]:
+    """``(name, func, setup)`` for the repository-level benchmarks; ``setup`` may be None."""
+    org_id = tenants.org_ids[0]
+    owner_id, staff_ids = tenants.owner_ids[org_id], tenants.staff_ids[org_id]
+    users = UserRepository(db_session)
+
+    def permissions_for_user():
+        staff_id = rng.choice(staff_ids)
+        RBACRepository(db_session, org_id=org_id, user_id=staff_id).get_permissions_for_user(staff_id)
+
+    role_ids: List[int] = []
+    role_names = itertools.count()
+
+    def new_role():
+        role = Role(name=f"bench{next(role_names)}", organization_id=org_id)
+        db_session.add(role)
+        db_session.commit()
+        role_ids[:] = [role.id]
+
+    def assign_permissions_to_role():
+        RBACRepository(db_session, org_id=org_id, user_id=owner_id).bulk_assign_permissions_to_roles(
+            [(role_ids[0], permission_id) for permission_id in tenants.permission_ids])
+
+    direct_pairs = [(staff_id, permission_id) for staff_id in staff_ids[:50]
+                    for permission_id in tenants.permission_ids[:10]]
+
+    def revoke_direct_permissions():
+        db_session.execute(delete(UserPermission).where(UserPermission.user_id.in_(staff_ids[:50])))
+        db_session.commit()
+
+    def assign_permissions_to_users():
+        RBACRepository(db_session, org_id=org_id, user_id=owner_id).bulk_assign_permissions_to_users(direct_pairs)
+
+    return [
+        ("repository.get_permissions_for_user.cold", permissions_for_user, clear_caches),
+        ("repository.get_permissions_for_user.warm", permissions_for_user, None),
+        ("repository.get_all_users.page", lambda: users.get_all_users(limit=50), None),
+        ("repository.get_all_users.deep_offset", lambda: users.get_all_users(limit=50, offset=len(staff_ids) // 2),
+         None),
+        ("repository.get_all_users.search", lambda: users.get_all_users(search_query="alpha", limit=50), None),
+        ("repository.bulk_assign.role_permissions", assign_permissions_to_role, new_role),
+        ("repository.bulk_assign.user_permissions", assign_permissions_to_users, revoke_direct_permissions),
+    ]
+
+
+def _http_benchmarks(client: TestClient, db_session: Session, tenants: GeneratedTenants,
+                     rng: random.Random) -> List[Tuple[str, Callable, Callable]]:
+    org_id = tenants.org_ids[0]
+    staff_ids = tenants.staff_ids[org_id]
+    admin = {"X-User-Id": str(tenants.super_admin_id)}
+    owner = {"X-User-Id": str(tenants.owner_ids[org_id])}
+    module, action = tenants.permission_names[0]
+
+    def get(url: str, headers: Dict[str, str], params: Dict = None):
+        response = client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+
+    def check_permissions():
+        response = client.post(f"/access-control/{org_id}/permissions/check", headers=owner, json={
+            "user_ids": rng.sample(staff_ids, min(100, len(staff_ids))),
+            "permissions": [{"module": m, "action": a} for m, a in tenants.permission_names[:10]]})
+        response.raise_for_status()
+
+    def revoke_direct_permissions():
+        db_session.execute(delete(UserPermission).where(UserPermission.user_id.in_(staff_ids[:50])))
+        db_session.commit()
+
+    def bulk_assign():
+        response = client.post(f"/access-control/{org_id}/assignments/bulk", headers=owner, json={
+            "user_permissions": [[staff_id, permission_id] for staff_id in staff_ids[:50]
+                                 for permission_id in tenants.permission_ids[:10]]})
+        response.raise_for_status()
+
+    return [
+        ("http.users.list", lambda: get("/users/", admin, {"limit": 50}), None),
+        ("http.users.search", lambda: get("/users/", admin, {"search_query": "alpha", "limit": 50}), None),
+        ("http.users.get", lambda: get(f"/users/{rng.choice(staff_ids)}", admin), None),
+        ("http.access_control.holders",
+         lambda: get(f"/access-control/{org_id}/permissions/{module}/{action}/holders", owner, {"limit": 100}), None),
+        ("http.access_control.check", check_permissions, None),
+        ("http.access_control.bulk_assign", bulk_assign, revoke_direct_permissions),
+    ]
+
+
+def run(profile: TenantProfile, database_url: str, iterations: int, warmup: int) -> List[BenchmarkResult]:
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    rng = random.Random(profile.seed)
+    results = []
+    try:
+        tenants = generate_tenants(db_session, profile)
+        for name, func, setup in _repository_benchmarks(db_session, tenants, rng):
+            results.append(measure(name, func, iterations, warmup, setup))
+            print(f"{name}: median {results[-1].median * 1000:.3f}ms", file=sys.stderr)
+
+        clear_caches()
+        application = create_application(Settings(authorization_enabled=True))
+        application.dependency_overrides[get_db] = lambda: db_session  # noqa
+        with TestClient(application) as client:
+            for name, func, setup in _http_benchmarks(client, db_session, tenants, rng):
+                results.append(measure(name, func, iterations, warmup, setup))
+                print(f"{name}: median {results[-1].median * 1000:.3f}ms", file=sys.stderr)
+    finally:
+        db_session.close()
+        clear_caches()
+        engine.dispose()
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for profile_field in dataclasses.fields(TenantProfile):
+        parser.add_argument(f"--{profile_field.name.replace('_', '-')}", type=int, default=profile_field.default)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--database-url", help="Empty database to generate the tenants into")
+    parser.add_argument("--output", help="Where to write the JSON report; stdout by default")
+    parser.add_argument("--compare", help="Report of a previous run to check this one against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Tolerated median slowdown, as a fraction")
+    args = parser.parse_args(argv)
+    profile = TenantProfile(**{profile_field.name: getattr(args, profile_field.name)
+                               for profile_field in dataclasses.fields(TenantProfile)})
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{os.path.join(directory, 'benchmark.sqlite')}"
+        report = build_report(run(profile, database_url, args.iterations, args.warmup), profile.to_dict())
+    if args.output:
+        write_report(report, args.output)
+    else:
+        import json
+
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        regressions = compare_reports(read_report(args.compare), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
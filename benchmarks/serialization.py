@@ -0,0 +1,73 @@
+"""Per-item cost of turning ``User`` rows into a JSON response body, before and after the single-validation path.
+
+    python -m benchmarks.serialization --items 1000 --output serialization.json
+
+"legacy" replays what the user routes did before: build the schema field by field, let FastAPI validate it again
+against ``response_model`` and encode it with the stdlib ``json`` module. "schema_response" builds the schema once
+with ``model_validate`` and renders it with ``SchemaResponse``; "orjson_response" is the app-wide default
+response class used by the routes that still go through ``response_model``.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+import src.components.access_control.models  # noqa: F401
+import src.components.organizations.models  # noqa: F401
+from benchmarks.harness import build_report, measure, write_report
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.components.users.schema import UserShort
+from src.utils.responses import SchemaResponse
+
+
+def make_users(count: int) -> List[User]:
+    now = datetime(2025, 1, 1)
+    return [User(id=i, name=f"User {i}", email=f"user{i}@example.com", auth0_id=f"auth0|{i}",
+                 user_type=UserTypeEnum.ORG_USER, is_active=True, created_at=now) for i in range(count)]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", help="Where to write the JSON report; stdout by default")
+    args = parser.parse_args(argv)
+
+    users = make_users(args.items)
+    response_adapter = TypeAdapter(List[UserShort])
+
+    def legacy():
+        built = [UserShort(id=user.id, auth0_id=user.auth0_id, name=user.name, email=user.email,
+                           is_active=user.is_active) for user in users]
+        validated = response_adapter.validate_python([item.model_dump() for item in built])
+        return json.dumps(jsonable_encoder(response_adapter.dump_python(validated, mode="json"))).encode("utf-8")
+
+    def schema_response():
+        return SchemaResponse([UserShort.model_validate(user) for user in users], List[UserShort]).body
+
+    def orjson_response():
+        built = [UserShort.model_validate(user) for user in users]
+        return ORJSONResponse(jsonable_encoder(response_adapter.dump_python(built, mode="json"))).body
+
+    results = []
+    for name, func in [("legacy", legacy), ("schema_response", schema_response),
+                       ("orjson_response", orjson_response)]:
+        results.append(measure(f"serialize.users.{name}", func, args.iterations, args.warmup, items=args.items))
+        print(f"{results[-1].name}: {results[-1].per_item_median * 1e6:.2f}us per item", file=sys.stderr)
+    report = build_report(results, {"items": args.items})
+    if args.output:
+        write_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
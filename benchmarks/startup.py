@@ -0,0 +1,44 @@
+"""Time worker cold starts: a fresh interpreter importing the app and running its startup against a database.
+
+    python -m benchmarks.startup --iterations 10 --output startup.json
+
+The first boot creates the schema; the timed ones find its fingerprint current and skip DDL. Run it on two
+revisions and diff the reports with ``benchmarks.harness.compare_reports``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+from benchmarks.harness import build_report, measure, write_report
+
+_BOOT = "from fastapi.testclient import TestClient; from src.main import app; TestClient(app).__enter__()"
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", help="Where to write the JSON report; stdout by default")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'startup.sqlite')}"}
+
+        def boot():
+            subprocess.run([sys.executable, "-c", _BOOT], env=env, check=True, stdout=subprocess.DEVNULL)
+
+        results = [measure("startup.boot", boot, args.iterations, warmup=1)]
+    print(f"startup.boot: median {results[0].median * 1000:.1f}ms", file=sys.stderr)
+    report = build_report(results, {"iterations": args.iterations})
+    if args.output:
+        write_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
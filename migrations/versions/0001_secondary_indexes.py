@@ -0,0 +1,46 @@
+"""Secondary indexes for reverse lookups on association tables and foreign keys
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns); databases created by init_db() after this revision already have them
+INDEXES = [
+    ("ix_user_role_role_id_user_id", "user_role", ["role_id", "user_id"]),
+    ("ix_user_group_group_id_user_id", "user_group", ["group_id", "user_id"]),
+    ("ix_group_role_role_id_group_id", "group_role", ["role_id", "group_id"]),
+    ("ix_role_permission_permission_id_role_id", "role_permission", ["permission_id", "role_id"]),
+    ("ix_user_permission_permission_id_user_id", "user_permission", ["permission_id", "user_id"]),
+    ("ix_user_organization_organization_id_user_type", "user_organization",
+     ["organization_id", "user_type", "user_id"]),
+    ("ix_group_organization_id", "group", ["organization_id"]),
+    ("ix_group_created_by_id", "group", ["created_by_id"]),
+    ("ix_group_updated_by_id", "group", ["updated_by_id"]),
+    ("ix_role_organization_id", "role", ["organization_id"]),
+    ("ix_role_created_by_id", "role", ["created_by_id"]),
+    ("ix_role_updated_by_id", "role", ["updated_by_id"]),
+    ("ix_organization_created_by_id", "organization", ["created_by_id"]),
+    ("ix_organization_updated_by_id", "organization", ["updated_by_id"]),
+    ("ix_user_effective_permission_org_id_permission_id", "user_effective_permission", ["org_id", "permission_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,34 @@
+"""Backfill the role_closure self rows of roles that have none
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+role = sa.table("role", sa.column("id"))
+role_closure = sa.table("role_closure", sa.column("ancestor_id"), sa.column("descendant_id"),
+                        sa.column("path_count"))
+
+
+def upgrade() -> None:
+    # Roles that predate role_closure, or were inserted without going through the repository, resolve no grants
+    # until they are their own ancestor
+    missing = sa.select(role.c.id, role.c.id, sa.literal(1)).where(~sa.exists().where(
+        role_closure.c.ancestor_id == role.c.id, role_closure.c.descendant_id == role.c.id))
+    op.execute(role_closure.insert().from_select(["ancestor_id", "descendant_id", "path_count"], missing))
+
+
+def downgrade() -> None:
+    # The self rows are required by permission resolution from here on, whichever revision wrote them
+    pass
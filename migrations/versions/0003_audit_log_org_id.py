@@ -0,0 +1,45 @@
+"""Record the organization of audit entries and index (org_id, created_at)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import re
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The unpartitioned table and its monthly partitions, which are created at runtime and unknown to Base.metadata
+_PARTITION_NAME = re.compile(r"^audit_log_p\d{6}$")
+
+
+def _audit_tables() -> List[str]:
+    names = sa.inspect(op.get_bind()).get_table_names()
+    return [name for name in names if name == "audit_log" or _PARTITION_NAME.match(name)]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in _audit_tables():
+        if "org_id" not in {column["name"] for column in inspector.get_columns(table)}:
+            # Like user_id, only the unpartitioned table references its parent
+            foreign_keys = [sa.ForeignKey("organization.id", ondelete="SET NULL",
+                                         name="fk_audit_log_org_id_organization")] if table == "audit_log" else []
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column("org_id", sa.Integer(), *foreign_keys, nullable=True))
+        op.create_index(f"ix_{table}_org_id_created_at", table, ["org_id", "created_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    for table in _audit_tables():
+        op.drop_index(f"ix_{table}_org_id_created_at", table_name=table, if_exists=True)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("org_id")
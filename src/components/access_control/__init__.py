@@ -0,0 +1,4 @@
+from src.core.routers import component_routers
+
+# ``router`` and ``async_router`` are built from .views on first access
+__getattr__ = component_routers(__name__)
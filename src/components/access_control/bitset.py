@@ -0,0 +1,133 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from src.components.access_control.cache import bump_global_permission_version, clear_permission_caches
+from src.components.access_control.models import FeatureModule, Permission
+
+
+class PermissionCatalogue:
+    """Dense integer index over every ``Permission`` row so permission sets can be held as integer bitsets.
+
+    Bit ``i`` of a bitset stands for ``permission_ids[i]``; indexes follow ascending permission id.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str]], version: int = 0):
+        # Global permission version (see cache.get_permission_version) the catalogue was loaded under
+        self.version = version
+        self.permission_ids: List[int] = []
+        self.names: List[Tuple[str, str]] = []
+        self._index_by_id: Dict[int, int] = {}
+        self._index_by_name: Dict[Tuple[str, str], int] = {}
+        for index, (permission_id, module, action) in enumerate(sorted(rows)):
+            self.permission_ids.append(permission_id)
+            self.names.append((module, action))
+            self._index_by_id[permission_id] = index
+            self._index_by_name[(module, action)] = index
+
+    @classmethod
+    def load(cls, db_session: Session, version: int = 0) -> "PermissionCatalogue":
+        rows = db_session.query(Permission.id, FeatureModule.name, Permission.action).join(
+            FeatureModule, Permission.module_id == FeatureModule.id).all()
+        return cls(rows, version)
+
+    def __len__(self) -> int:
+        return len(self.permission_ids)
+
+    def __contains__(self, permission_id: int) -> bool:
+        return permission_id in self._index_by_id
+
+    def extends(self, other: "PermissionCatalogue") -> bool:
+        """Whether every index of ``other`` still means the same permission in this catalogue."""
+        size = len(other)
+        return self.permission_ids[:size] == other.permission_ids and self.names[:size] == other.names
+
+    def index_of(self, module: str, action: str) -> Optional[int]:
+        return self._index_by_name.get((module, action))
+
+    def encode(self, permission_ids: Iterable[int]) -> int:
+        bits = 0
+        for permission_id in permission_ids:
+            bits |= 1 << self._index_by_id[permission_id]
+        return bits
+
+    def mask(self, permissions: Iterable[Tuple[str, str]]) -> int:
+        """Bitset of the given ``(module, action)`` pairs; pairs unknown to the catalogue are ignored."""
+        bits = 0
+        for permission in permissions:
+            index = self._index_by_name.get(permission)
+            if index is not None:
+                bits |= 1 << index
+        return bits
+
+    def has(self, bits: int, module: str, action: str) -> bool:
+        index = self._index_by_name.get((module, action))
+        return index is not None and bits >> index & 1 == 1
+
+    def decode(self, bits: int) -> Dict[str, List[str]]:
+        module_permissions = {}
+        while bits:
+            lowest = bits & -bits
+            module, action = self.names[lowest.bit_length() - 1]
+            module_permissions.setdefault(module, []).append(action)
+            bits ^= lowest
+        return module_permissions
+
+
+_catalogue: Optional[PermissionCatalogue] = None
+_catalogue_lock = threading.Lock()
+
+
+def get_permission_catalogue(db_session: Session, required_ids: Iterable[int] = (),
+                             version: Optional[int] = None, refresh: bool = False) -> PermissionCatalogue:
+    """Return the process-wide catalogue, reloading it when it is missing or lacks one of ``required_ids``.
+
+    Passing the current global permission ``version`` also reloads it after another worker changed the catalogue,
+    and ``refresh`` always reloads it, e.g. to pick up permissions created since it was loaded.
+    """
+    global _catalogue
+    catalogue = _catalogue
+    if not refresh and catalogue is not None and (version is None or catalogue.version == version) and all(
+            permission_id in catalogue for permission_id in required_ids):
+        return catalogue
+    with _catalogue_lock:
+        if version is None:
+            version = catalogue.version if catalogue is not None else 0
+        catalogue = PermissionCatalogue.load(db_session, version)
+        if _catalogue is not None and not catalogue.extends(_catalogue):
+            # Indexes have shifted, so every bitset built against the old catalogue is meaningless now
+            clear_permission_caches()
+        _catalogue = catalogue
+    return catalogue
+
+
+def invalidate_permission_catalogue() -> None:
+    global _catalogue
+    with _catalogue_lock:
+        if _catalogue is not None:
+            _catalogue = None
+            clear_permission_caches()
+
+
+@event.listens_for(Permission, "after_delete")
+@event.listens_for(Permission, "after_update")
+@event.listens_for(FeatureModule, "after_update")
+def _catalogue_changed(mapper, connection, target):
+    invalidate_permission_catalogue()
+    session = object_session(target)
+    if session is not None:
+        session.info["permission_catalogue_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _announce_catalogue_change(session):
+    # Only once the change is visible to the other workers, or they could reload the old catalogue
+    if session.info.pop("permission_catalogue_changed", False):
+        bump_global_permission_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_catalogue_change(session):
+    session.info.pop("permission_catalogue_changed", None)
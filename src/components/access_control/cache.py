@@ -0,0 +1,117 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.components.users.cache import USERS_NAMESPACE
+from src.config import get_settings
+from src.utils.cache import TTLCache
+from src.utils.shared_cache import bump_versions, get_shared_cache, get_versions
+
+logger = logging.getLogger("uvicorn")
+
+_settings = get_settings()
+
+# Permission bitsets (see bitset.PermissionCatalogue): effective per (org_id, user_id), granted per role and per group.
+# Values are (version, bits) where version is the PermissionVersion the bits were computed under.
+permission_cache = TTLCache(max_size=_settings.permission_cache_max_size, ttl=_settings.permission_cache_ttl)
+role_bitset_cache = TTLCache(max_size=_settings.permission_cache_max_size, ttl=_settings.permission_cache_ttl)
+group_bitset_cache = TTLCache(max_size=_settings.permission_cache_max_size, ttl=_settings.permission_cache_ttl)
+
+# (global version, organization version), read from the shared cache; (0, 0) when there is none
+PermissionVersion = Tuple[int, int]
+
+_GLOBAL_NAMESPACE = "rbac"
+
+
+def _org_namespace(org_id: Optional[int]) -> str:
+    return f"rbac:org:{org_id}"
+
+
+def get_permission_version(org_id: Optional[int]) -> Optional[PermissionVersion]:
+    """Version the cached permissions of ``org_id`` must carry to be trusted; None when it cannot be read."""
+    versions = get_versions([_GLOBAL_NAMESPACE, _org_namespace(org_id)])
+    return (versions[0], versions[1]) if versions is not None else None
+
+
+def get_rbac_version(org_id: Optional[int]) -> Optional[Tuple[int, int, int]]:
+    """Version of everything the RBAC reads of ``org_id`` return, for their ETags; None when it cannot be read.
+
+    The permission version plus the users version, since those reads also list user names and emails. Also None
+    without a shared cache: the other workers' changes would not move the version, so it cannot back an ETag.
+    """
+    if get_shared_cache() is None:
+        return None
+    versions = get_versions([_GLOBAL_NAMESPACE, _org_namespace(org_id), USERS_NAMESPACE])
+    return (versions[0], versions[1], versions[2]) if versions is not None else None
+
+
+def bump_org_permission_versions(org_ids: Iterable[Optional[int]]) -> None:
+    """Make every worker drop the permissions it cached for the given organizations."""
+    bump_versions(_org_namespace(org_id) for org_id in org_ids)
+
+
+def bump_global_permission_version() -> None:
+    """Make every worker drop all of its cached permissions, e.g. when the permission catalogue changes."""
+    bump_versions([_GLOBAL_NAMESPACE])
+
+
+def get_versioned(cache: TTLCache, key, version: Optional[PermissionVersion]) -> Optional[int]:
+    """Bits cached under ``key`` if they were computed under ``version``."""
+    entry = cache.get(key) if version is not None else None
+    return entry[1] if entry is not None and entry[0] == version else None
+
+
+def set_versioned(cache: TTLCache, key, version: Optional[PermissionVersion], bits: int) -> None:
+    if version is not None:
+        cache.set(key, (version, bits))
+
+
+def _shared_permission_key(version: PermissionVersion, org_id: Optional[int], user_id: int) -> str:
+    # The version is part of the key, so a bump orphans the old entries and they simply expire
+    return f"rbac:perm:{version[0]}.{version[1]}:{org_id}:{user_id}"
+
+
+def get_shared_permission_bitsets(version: Optional[PermissionVersion], org_id: Optional[int],
+                                  user_ids: List[int]) -> Dict[int, int]:
+    """Effective bitsets another worker already computed under ``version``, in one round trip."""
+    cache = get_shared_cache()
+    if cache is None or version is None or not user_ids:
+        return {}
+    try:
+        values = cache.get_many([_shared_permission_key(version, org_id, user_id) for user_id in user_ids])
+    except Exception as e:  # noqa
+        logger.warning(f"Failed to read shared permission bitsets: {e}")
+        return {}
+    return {user_id: int(value, 16) for user_id, value in zip(user_ids, values) if value is not None}
+
+
+def set_shared_permission_bitsets(version: Optional[PermissionVersion], org_id: Optional[int],
+                                  bitsets: Dict[int, int]) -> None:
+    cache = get_shared_cache()
+    if cache is None or version is None or not bitsets:
+        return
+    try:
+        cache.set_many({_shared_permission_key(version, org_id, user_id): format(bits, "x")
+                        for user_id, bits in bitsets.items()}, ttl=_settings.permission_cache_ttl)
+    except Exception as e:  # noqa
+        logger.warning(f"Failed to write shared permission bitsets: {e}")
+
+
+def invalidate_user_permissions(user_ids: Iterable[int]) -> None:
+    """Drop the cached permissions of the given users in every organization."""
+    user_ids = set(user_ids)
+    if user_ids:
+        permission_cache.delete_where(lambda key: key[1] in user_ids)
+
+
+def invalidate_role_bitsets(role_ids: Iterable[int]) -> None:
+    role_bitset_cache.delete_many(role_ids)
+
+
+def invalidate_group_bitsets(group_ids: Iterable[int]) -> None:
+    group_bitset_cache.delete_many(group_ids)
+
+
+def clear_permission_caches() -> None:
+    permission_cache.clear()
+    role_bitset_cache.clear()
+    group_bitset_cache.clear()
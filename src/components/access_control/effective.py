@@ -0,0 +1,84 @@
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, delete, except_, func, insert, literal, null, or_, select, union
+from sqlalchemy.orm import Session
+
+from src.components.access_control.models import (
+    Group,
+    GroupRole,
+    Role,
+    RoleClosure,
+    RolePermission,
+    UserEffectivePermission,
+    UserGroup,
+    UserPermission,
+    UserRole,
+)
+from src.config import get_settings
+
+_COLUMNS = ["user_id", "org_id", "permission_id", "source"]
+
+
+def effective_permissions_enabled() -> bool:
+    return get_settings().effective_permissions_enabled
+
+
+def get_live_grants_query(user_ids: Optional[Iterable[int]] = None) -> Select:
+    """The UNION of every grant path as ``(user_id, org_id, permission_id, source)`` rows, for all users by default."""
+    direct = select(UserPermission.user_id, null(), UserPermission.permission_id, literal("direct"))
+    role = select(UserRole.user_id, Role.organization_id, RolePermission.permission_id, literal("role")).join(
+        Role, Role.id == UserRole.role_id).join(
+        RoleClosure, RoleClosure.descendant_id == UserRole.role_id).join(
+        RolePermission, RolePermission.role_id == RoleClosure.ancestor_id)
+    group = select(UserGroup.user_id, Group.organization_id, RolePermission.permission_id, literal("group")).join(
+        Group, Group.id == UserGroup.group_id).join(
+        GroupRole, GroupRole.group_id == UserGroup.group_id).join(
+        RoleClosure, RoleClosure.descendant_id == GroupRole.role_id).join(
+        RolePermission, RolePermission.role_id == RoleClosure.ancestor_id)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        direct = direct.where(UserPermission.user_id.in_(user_ids))
+        role = role.where(UserRole.user_id.in_(user_ids))
+        group = group.where(UserGroup.user_id.in_(user_ids))
+    return union(direct, role, group)
+
+
+def _stored_grants_query() -> Select:
+    return select(UserEffectivePermission.user_id, UserEffectivePermission.org_id,
+                  UserEffectivePermission.permission_id, UserEffectivePermission.source)
+
+
+def refresh_effective_permissions(db_session: Session, user_ids: Iterable[int]) -> None:
+    """Recompute the materialized grants of ``user_ids`` from the live tables, without committing."""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    db_session.execute(delete(UserEffectivePermission).where(UserEffectivePermission.user_id.in_(user_ids)))
+    db_session.execute(insert(UserEffectivePermission).from_select(_COLUMNS, get_live_grants_query(user_ids)))
+
+
+def rebuild_effective_permissions(db_session: Session) -> int:
+    """Recompute the whole table from the live tables and commit; returns the number of rows written."""
+    db_session.execute(delete(UserEffectivePermission))
+    db_session.execute(insert(UserEffectivePermission).from_select(_COLUMNS, get_live_grants_query()))
+    db_session.commit()
+    return db_session.execute(select(func.count()).select_from(UserEffectivePermission)).scalar_one()
+
+
+def check_effective_permissions(db_session: Session) -> Tuple[List[Tuple], List[Tuple]]:
+    """Diff the table against the live UNION: (rows missing from the table, rows it holds that are not granted)."""
+    # Each side is wrapped in a subquery so the EXCEPT does not mix with the UNION inside the live query
+    live = select(get_live_grants_query().subquery())
+    stored = select(_stored_grants_query().subquery())
+    missing = db_session.execute(except_(live, stored)).all()
+    extra = db_session.execute(except_(stored, live)).all()
+    return [tuple(row) for row in missing], [tuple(row) for row in extra]
+
+
+def get_effective_permission_rows(db_session: Session, org_id: Optional[int],
+                                  user_ids: List[int]) -> List[Tuple[int, int]]:
+    """``(user_id, permission_id)`` granted to the users in the organization, from a single indexed lookup."""
+    query = select(UserEffectivePermission.user_id, UserEffectivePermission.permission_id).where(
+        UserEffectivePermission.user_id.in_(user_ids),
+        or_(UserEffectivePermission.org_id == org_id, UserEffectivePermission.org_id.is_(None))).distinct()
+    return [tuple(row) for row in db_session.execute(query)]
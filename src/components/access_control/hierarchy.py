@@ -0,0 +1,136 @@
+from collections import Counter
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import bindparam, delete, event, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from src.components.access_control.models import Role, RoleClosure, RoleParent
+
+
+@event.listens_for(Session, "after_flush")
+def _add_closure_self_rows(session, flush_context):
+    """Write the closure rows of the roles a flush created, in the same transaction.
+
+    Every role is its own ancestor, so resolution joins ``role_closure`` without a special case for direct grants.
+    Roles inserted with Core statements bypass the session and need ``rebuild_role_closure``.
+    """
+    rows = [{"ancestor_id": role.id, "descendant_id": role.id, "path_count": 1}
+            for role in session.new if isinstance(role, Role)]
+    if rows:
+        session.connection().execute(insert(RoleClosure.__table__), rows)
+
+
+def get_ancestor_ids(db_session: Session, role_ids: Iterable[int]) -> Set[int]:
+    """The given roles and every role they inherit from."""
+    query = select(RoleClosure.ancestor_id).where(RoleClosure.descendant_id.in_(list(role_ids)))
+    return set(db_session.execute(query).scalars())
+
+
+def get_descendant_ids(db_session: Session, role_ids: Iterable[int]) -> Set[int]:
+    """The given roles and every role inheriting from them."""
+    query = select(RoleClosure.descendant_id).where(RoleClosure.ancestor_id.in_(list(role_ids)))
+    return set(db_session.execute(query).scalars())
+
+
+def _get_path_counts(db_session: Session, role_id: int, parent_id: int) -> Dict[Tuple[int, int], int]:
+    """Paths running through the edge ``role_id -> parent_id``, per (ancestor, descendant) pair."""
+    ancestors = db_session.execute(select(RoleClosure.ancestor_id, RoleClosure.path_count).where(
+        RoleClosure.descendant_id == parent_id)).all()
+    descendants = db_session.execute(select(RoleClosure.descendant_id, RoleClosure.path_count).where(
+        RoleClosure.ancestor_id == role_id)).all()
+    counts: Counter = Counter()
+    for ancestor_id, ancestor_paths in ancestors:
+        for descendant_id, descendant_paths in descendants:
+            counts[(ancestor_id, descendant_id)] += ancestor_paths * descendant_paths
+    return counts
+
+
+def _apply_path_counts(db_session: Session, counts: Dict[Tuple[int, int], int], sign: int) -> None:
+    pair_column = tuple_(RoleClosure.ancestor_id, RoleClosure.descendant_id)
+    existing = {(ancestor_id, descendant_id): path_count for ancestor_id, descendant_id, path_count in
+                db_session.execute(select(RoleClosure.ancestor_id, RoleClosure.descendant_id,
+                                          RoleClosure.path_count).where(pair_column.in_(list(counts))))}
+    inserts, updates, deletes = [], [], []
+    for pair, paths in counts.items():
+        path_count = existing.get(pair, 0) + sign * paths
+        if pair not in existing:
+            inserts.append({"ancestor_id": pair[0], "descendant_id": pair[1], "path_count": path_count})
+        elif path_count > 0:
+            updates.append({"a": pair[0], "d": pair[1], "path_count": path_count})
+        else:
+            deletes.append(pair)
+    if inserts:
+        db_session.execute(insert(RoleClosure.__table__), inserts)
+    if updates:
+        db_session.execute(update(RoleClosure.__table__).where(
+            RoleClosure.ancestor_id == bindparam("a"), RoleClosure.descendant_id == bindparam("d")
+        ).values(path_count=bindparam("path_count")), updates)
+    if deletes:
+        db_session.execute(delete(RoleClosure).where(pair_column.in_(deletes)))
+
+
+def _lock_edge_roles(db_session: Session, role_id: int, parent_id: int) -> None:
+    """Lock the roles whose closure rows an edge ``role_id -> parent_id`` reads or writes, until the commit.
+
+    Two edges that could close a cycle together, or that update the same path counts, share one of these roles, so
+    their cycle checks and upserts run one after the other. SQLite does not render FOR UPDATE; its writes are
+    serialized by the database lock instead.
+    """
+    role_ids = get_ancestor_ids(db_session, [parent_id]) | get_descendant_ids(db_session, [role_id])
+    db_session.execute(select(Role.id).where(Role.id.in_(role_ids)).order_by(Role.id).with_for_update()).all()
+
+
+def add_role_parent(db_session: Session, role_id: int, parent_id: int) -> bool:
+    """Make ``role_id`` inherit ``parent_id`` and extend the closure, without committing.
+
+    Returns False when the edge already exists; raises ValueError when it would close a cycle.
+    """
+    _lock_edge_roles(db_session, role_id, parent_id)
+    if role_id == parent_id or role_id in get_ancestor_ids(db_session, [parent_id]):
+        raise ValueError("Role inheritance cannot form a cycle.")
+    if db_session.get(RoleParent, (role_id, parent_id)) is not None:
+        return False
+    db_session.add(RoleParent(role_id=role_id, parent_id=parent_id))
+    db_session.flush()
+    _apply_path_counts(db_session, _get_path_counts(db_session, role_id, parent_id), 1)
+    return True
+
+
+def remove_role_parent(db_session: Session, role_id: int, parent_id: int) -> bool:
+    """Drop the edge and the paths running through it, without committing; False when there was no such edge."""
+    _lock_edge_roles(db_session, role_id, parent_id)
+    edge = db_session.get(RoleParent, (role_id, parent_id))
+    if edge is None:
+        return False
+    db_session.delete(edge)
+    db_session.flush()
+    _apply_path_counts(db_session, _get_path_counts(db_session, role_id, parent_id), -1)
+    return True
+
+
+def rebuild_role_closure(db_session: Session) -> int:
+    """Recompute the whole closure from ``role_parent``, e.g. after roles or edges were deleted outside this module.
+
+    Returns the number of closure rows written.
+    """
+    parents: Dict[int, Set[int]] = {}
+    for role_id, parent_id in db_session.execute(select(RoleParent.role_id, RoleParent.parent_id)):
+        parents.setdefault(role_id, set()).add(parent_id)
+    paths: Dict[int, Counter] = {}
+
+    def ancestors_of(role_id: int) -> Counter:
+        # Memoized depth-first walk; role_parent is acyclic since add_role_parent rejects cycles
+        if role_id not in paths:
+            counts = Counter({role_id: 1})
+            for parent_id in parents.get(role_id, ()):
+                counts.update(ancestors_of(parent_id))
+            paths[role_id] = counts
+        return paths[role_id]
+
+    rows = [{"ancestor_id": ancestor_id, "descendant_id": role_id, "path_count": path_count}
+            for role_id in db_session.execute(select(Role.id)).scalars()
+            for ancestor_id, path_count in ancestors_of(role_id).items()]
+    db_session.execute(delete(RoleClosure))
+    if rows:
+        db_session.execute(insert(RoleClosure.__table__), rows)
+    return len(rows)
@@ -0,0 +1,28 @@
+"""Rebuild or verify the materialized user_effective_permission table.
+
+    python -m src.components.access_control.maintenance rebuild
+    python -m src.components.access_control.maintenance check
+
+``check`` exits with status 1 when the table disagrees with the live grant tables.
+"""
+import sys
+
+from src.core.db import SessionLocal
+
+from .effective import check_effective_permissions, rebuild_effective_permissions
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command not in ("rebuild", "check"):
+        sys.exit(__doc__)
+    with SessionLocal() as session:
+        if command == "rebuild":
+            print(f"Rebuilt user_effective_permission: {rebuild_effective_permissions(session)} rows")
+        else:
+            missing, extra = check_effective_permissions(session)
+            for row in missing:
+                print(f"missing {row}")
+            for row in extra:
+                print(f"extra {row}")
+            print(f"{len(missing)} missing, {len(extra)} extra")
+            sys.exit(1 if missing or extra else 0)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from src.core.db import Base
+from src.core.search import register_search_index
 
 
 class Group(Base):
@@ -20,7 +21,12 @@ class Group(Base):
     users = relationship("UserGroup", back_populates="group")
     roles = relationship("GroupRole", back_populates="group")
 
-    __table_args__ = (UniqueConstraint("name", "organization_id", name="uq_group_name_org"),)
+    __table_args__ = (
+        UniqueConstraint("name", "organization_id", name="uq_group_name_org"),
+        Index("ix_group_organization_id", "organization_id"),
+        Index("ix_group_created_by_id", "created_by_id"),
+        Index("ix_group_updated_by_id", "updated_by_id"),
+    )
 
 
 class UserGroup(Base):
@@ -32,6 +38,8 @@ class UserGroup(Base):
     user = relationship("User", back_populates="groups")
     group = relationship("Group", back_populates="users")
 
+    __table_args__ = (Index("ix_user_group_group_id_user_id", "group_id", "user_id"),)
+
 
 class Role(Base):
     __tablename__ = "role"
@@ -46,7 +54,39 @@ class Role(Base):
     users = relationship("UserRole", back_populates="role")
     permissions = relationship("RolePermission", back_populates="role")
 
-    __table_args__ = (UniqueConstraint("name", "organization_id", name="uq_role_name_org"),)
+    __table_args__ = (
+        UniqueConstraint("name", "organization_id", name="uq_role_name_org"),
+        Index("ix_role_organization_id", "organization_id"),
+        Index("ix_role_created_by_id", "created_by_id"),
+        Index("ix_role_updated_by_id", "updated_by_id"),
+    )
+
+
+class RoleParent(Base):
+    """Inheritance edge: ``role_id`` is granted every permission of ``parent_id``."""
+
+    __tablename__ = "role_parent"
+
+    role_id = Column(Integer, ForeignKey("role.id", ondelete="CASCADE"), primary_key=True)
+    parent_id = Column(Integer, ForeignKey("role.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (Index("ix_role_parent_parent_id", "parent_id"),)
+
+
+class RoleClosure(Base):
+    """Transitive closure of ``role_parent``, maintained incrementally by ``hierarchy``.
+
+    One row per (ancestor, descendant) pair joined by at least one path, every role being its own ancestor.
+    ``path_count`` counts the distinct paths, so removing one side of a diamond keeps the pair.
+    """
+
+    __tablename__ = "role_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("role.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("role.id", ondelete="CASCADE"), primary_key=True)
+    path_count = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (Index("ix_role_closure_descendant_id_ancestor_id", "descendant_id", "ancestor_id"),)
 
 
 class GroupRole(Base):
@@ -58,6 +98,8 @@ class GroupRole(Base):
     group = relationship("Group", back_populates="roles")
     role = relationship("Role", back_populates="groups")
 
+    __table_args__ = (Index("ix_group_role_role_id_group_id", "role_id", "group_id"),)
+
 
 class UserRole(Base):
     __tablename__ = "user_role"
@@ -68,6 +110,8 @@ class UserRole(Base):
     user = relationship("User", back_populates="roles")
     role = relationship("Role", back_populates="users")
 
+    __table_args__ = (Index("ix_user_role_role_id_user_id", "role_id", "user_id"),)
+
 
 class FeatureModule(Base):
     __tablename__ = "feature_module"
@@ -83,6 +127,7 @@ class Permission(Base):
     module_id = Column(Integer, ForeignKey("feature_module.id", ondelete="CASCADE"), nullable=False)
     action = Column(String, nullable=False)
 
+    module = relationship("FeatureModule")
     roles = relationship("RolePermission", back_populates="permission")
     users = relationship("UserPermission", back_populates="permission")
 
@@ -98,6 +143,8 @@ class RolePermission(Base):
     role = relationship("Role", back_populates="permissions")
     permission = relationship("Permission", back_populates="roles")
 
+    __table_args__ = (Index("ix_role_permission_permission_id_role_id", "permission_id", "role_id"),)
+
 
 class UserPermission(Base):
     __tablename__ = "user_permission"
@@ -107,3 +154,30 @@ class UserPermission(Base):
 
     user = relationship("User", back_populates="permissions")
     permission = relationship("Permission", back_populates="users")
+
+    __table_args__ = (Index("ix_user_permission_permission_id_user_id", "permission_id", "user_id"),)
+
+
+class UserEffectivePermission(Base):
+    """Denormalized grants of every user, maintained by ``effective`` when ``effective_permissions_enabled`` is on.
+
+    One row per (user, organization, permission, source) where source is ``direct``, ``role`` or ``group``.
+    Direct grants apply in every organization and have no ``org_id``.
+    """
+
+    __tablename__ = "user_effective_permission"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    org_id = Column(Integer, ForeignKey("organization.id", ondelete="CASCADE"))
+    permission_id = Column(Integer, ForeignKey("permission.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_effective_permission_lookup", "user_id", "org_id", "permission_id", "source", unique=True),
+        Index("ix_user_effective_permission_org_id_permission_id", "org_id", "permission_id"),
+    )
+
+
+register_search_index(Group, "name")
+register_search_index(Role, "name")
@@ -1,36 +1,191 @@
-from typing import Dict, List, Optional, Type
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
 
+from sqlalchemy import literal, or_, select, union, union_all
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.components.access_control.bitset import PermissionCatalogue, get_permission_catalogue
+from src.components.access_control.cache import (
+    PermissionVersion,
+    bump_org_permission_versions,
+    get_permission_version,
+    get_shared_permission_bitsets,
+    get_versioned,
+    group_bitset_cache,
+    invalidate_group_bitsets,
+    invalidate_role_bitsets,
+    invalidate_user_permissions,
+    permission_cache,
+    role_bitset_cache,
+    set_shared_permission_bitsets,
+    set_versioned,
+)
+from src.components.access_control.effective import (
+    effective_permissions_enabled,
+    get_effective_permission_rows,
+    refresh_effective_permissions,
+)
+from src.components.access_control.hierarchy import (
+    add_role_parent,
+    get_descendant_ids,
+    remove_role_parent,
+)
 from src.components.access_control.models import (
     FeatureModule,
     Group,
     GroupRole,
     Permission,
     Role,
+    RoleClosure,
     RolePermission,
+    UserEffectivePermission,
     UserGroup,
     UserPermission,
     UserRole,
 )
+from src.components.organizations.membership import MembershipContext, resolve_membership
 from src.components.organizations.models import OrgUserTypeEnum, UserOrganization
+from src.components.users.models import User
+from src.core.db import AsyncRepository
+from src.core.routing import read_only
+from src.core.search import apply_search
+from src.utils.pagination import decode_cursor, encode_cursor, paginate
+
+
+# Link tables handled by the bulk assignment methods: model -> (left column, right column)
+_LINK_COLUMNS = {
+    UserRole: ("user_id", "role_id"),
+    GroupRole: ("group_id", "role_id"),
+    UserGroup: ("user_id", "group_id"),
+    RolePermission: ("role_id", "permission_id"),
+    UserPermission: ("user_id", "permission_id"),
+}
+
+
+# Bulk assignment kinds, named like the fields of BulkAssignmentRequest: link model, whether only organization
+# managers may assign it (the others need OrgStaff, as the single assignment methods do), and the refusal message
+_BULK_KINDS = {
+    "user_roles": (UserRole, False, "Only OrgStaff can have roles assigned."),
+    "group_roles": (GroupRole, True, "Only OrgOwner or OrgAdmin can assign roles to groups."),
+    "user_groups": (UserGroup, False, "Only OrgStaff can be assigned to groups."),
+    "role_permissions": (RolePermission, True, "Only OrgOwner or OrgAdmin can assign permissions to roles."),
+    "user_permissions": (UserPermission, True, "Only OrgOwner or OrgAdmin can assign permissions to users."),
+}
+
+# Outcome of a bulk assignment: pairs created, pairs skipped as present or repeated, and the pairs rejected
+BulkResult = Tuple[int, int, List[Tuple[int, int]]]
+
+# Link column -> query of which of ``ids`` the organization may link: its members, roles and groups, and any
+# permission since the catalogue is global. Each row is (column name, id)
+_ORG_ID_QUERIES = {
+    "user_id": lambda org_id, ids: select(literal("user_id"), UserOrganization.user_id).where(
+        UserOrganization.organization_id == org_id, UserOrganization.user_id.in_(ids)),
+    "role_id": lambda org_id, ids: select(literal("role_id"), Role.id).where(
+        Role.organization_id == org_id, Role.id.in_(ids)),
+    "group_id": lambda org_id, ids: select(literal("group_id"), Group.id).where(
+        Group.organization_id == org_id, Group.id.in_(ids)),
+    "permission_id": lambda org_id, ids: select(literal("permission_id"), Permission.id).where(Permission.id.in_(ids)),
+}
+
+
+def _insert_ignoring_conflicts(db_session: Session, model):
+    dialect = db_session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql_insert(model).on_conflict_do_nothing()
+    if dialect in ("mysql", "mariadb"):
+        return mysql_insert(model).prefix_with("IGNORE")
+    raise ValueError(f"Bulk assignments do not support the '{dialect}' dialect.")
 
 
 class RBACRepository:
     def __init__(self, db_session: Session, org_id: Optional[int] = None, is_super_admin: bool = False,
-                 user_id: Optional[int] = None):
+                 user_id: Optional[int] = None, membership: Optional[MembershipContext] = None):
         self.db_session = db_session
-        self.org_id = org_id
-        self.is_super_admin = is_super_admin
-        self.user_id = user_id
-        self.org_user_type = self._get_org_user_type() if not is_super_admin and org_id and user_id else None
-
-    def _get_org_user_type(self) -> Optional[str]:
-        user_org = self.db_session.query(UserOrganization).filter(
-            UserOrganization.user_id == self.user_id,
-            UserOrganization.organization_id == self.org_id
-        ).first()
-        return user_org.user_type if user_org else None
+        # Callers that already resolved the membership for this request pass it in to avoid another lookup
+        self.membership = membership or resolve_membership(db_session, user_id, org_id)
+        self.org_id = self.membership.org_id
+        self.is_super_admin = is_super_admin or self.membership.is_super_admin
+        self.user_id = self.membership.user_id
+        self.org_user_type = self.membership.org_user_type
+
+    def _get_users_with_roles(self, role_ids: Iterable[int]) -> Set[int]:
+        role_ids = list(role_ids)
+        direct_users = self.db_session.query(UserRole.user_id).filter(UserRole.role_id.in_(role_ids))
+        group_users = self.db_session.query(UserGroup.user_id).join(
+            GroupRole, GroupRole.group_id == UserGroup.group_id).filter(GroupRole.role_id.in_(role_ids))
+        return {user_id for user_id, in direct_users.union(group_users).all()}
+
+    def _get_groups_with_roles(self, role_ids: Iterable[int]) -> Set[int]:
+        query = self.db_session.query(GroupRole.group_id).filter(GroupRole.role_id.in_(list(role_ids)))
+        return {group_id for group_id, in query.all()}
+
+    def _get_users_in_groups(self, group_ids: Iterable[int]) -> Set[int]:
+        query = self.db_session.query(UserGroup.user_id).filter(UserGroup.group_id.in_(list(group_ids)))
+        return {user_id for user_id, in query.all()}
+
+    def _invalidate_roles(self, role_ids: Iterable[int]) -> None:
+        """Drop the cached bitsets of the given roles, of every role inheriting from them and of their holders."""
+        role_ids = get_descendant_ids(self.db_session, role_ids)
+        if role_ids:
+            invalidate_role_bitsets(role_ids)
+            invalidate_group_bitsets(self._get_groups_with_roles(role_ids))
+            invalidate_user_permissions(self._get_users_with_roles(role_ids))
+        bump_org_permission_versions([self.org_id])
+
+    def _get_users_inheriting_roles(self, role_ids: Iterable[int]) -> Set[int]:
+        return self._get_users_with_roles(get_descendant_ids(self.db_session, role_ids))
+
+    def _commit(self, affected_user_ids: Callable[[], Iterable[int]]) -> None:
+        """Commit pending grant changes along with the materialized grants of the users they affect, if enabled."""
+        if effective_permissions_enabled():
+            self.db_session.flush()
+            refresh_effective_permissions(self.db_session, affected_user_ids())
+        self.db_session.commit()
+
+    def _get_organizations_of_users(self, user_ids: Iterable[int]) -> Set[int]:
+        query = self.db_session.query(UserOrganization.organization_id).filter(
+            UserOrganization.user_id.in_(list(user_ids)))
+        return {org_id for org_id, in query.distinct().all()}
+
+    def _get_linkable_ids(self, ids: Dict[str, Set[int]]) -> Dict[str, Set[int]]:
+        """The ids, per link column, that belong to the organization, checked together in one query."""
+        queries = [_ORG_ID_QUERIES[column](self.org_id, column_ids) for column, column_ids in ids.items() if column_ids]
+        linkable: Dict[str, Set[int]] = {column: set() for column in ids}
+        if queries:
+            for column, linkable_id in self.db_session.execute(union_all(*queries) if len(queries) > 1 else queries[0]):
+                linkable[column].add(linkable_id)
+        return linkable
+
+    def _link_missing(self, model, pairs: Iterable[Tuple[int, int]]
+                      ) -> Tuple[List[Tuple[int, int]], int, List[Tuple[int, int]]]:
+        """Insert the pairs of ``model`` that are not linked yet, without committing.
+
+        Returns the pairs that were created, how many were skipped as already present or repeated, and the pairs
+        rejected because they name a user, role or group outside the organization or an unknown permission.
+        Existing links are filtered out up front; the insert still ignores conflicts so a concurrent writer
+        cannot fail it.
+        """
+        pairs = list(pairs)
+        unique_pairs = list(dict.fromkeys(pairs))
+        left_name, right_name = _LINK_COLUMNS[model]
+        left, right = getattr(model, left_name), getattr(model, right_name)
+        linkable = self._get_linkable_ids({left_name: {pair[0] for pair in unique_pairs},
+                                           right_name: {pair[1] for pair in unique_pairs}})
+        rejected = [pair for pair in unique_pairs
+                    if pair[0] not in linkable[left_name] or pair[1] not in linkable[right_name]]
+        unique_pairs = [pair for pair in unique_pairs if pair not in set(rejected)]
+        existing = {tuple(row) for row in self.db_session.query(left, right).filter(
+            left.in_({pair[0] for pair in unique_pairs}), right.in_({pair[1] for pair in unique_pairs})).all()}
+        created = [pair for pair in unique_pairs if pair not in existing]
+        if created:
+            self.db_session.execute(_insert_ignoring_conflicts(self.db_session, model),
+                                    [{left_name: left_id, right_name: right_id} for left_id, right_id in created])
+        return created, len(pairs) - len(created) - len(rejected), rejected
 
     def create_role(self, name: str, created_by_id: int) -> Optional[Role]:
         if self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
@@ -43,10 +198,12 @@ class RBACRepository:
         raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can create roles.")
 
     def assign_role_to_user(self, user_id: int, role_id: int) -> Optional[UserRole]:
-        if self._get_org_user_type() == OrgUserTypeEnum.ORG_STAFF.value:
+        if self.org_user_type == OrgUserTypeEnum.ORG_STAFF.value:
             user_role = UserRole(user_id=user_id, role_id=role_id)
             self.db_session.add(user_role)
-            self.db_session.commit()
+            self._commit(lambda: [user_id])
+            invalidate_user_permissions([user_id])
+            bump_org_permission_versions([self.org_id])
             return user_role
         raise Exception("Unauthorized action - Only OrgStaff can have roles assigned.")
 
@@ -55,23 +212,60 @@ class RBACRepository:
                                                          OrgUserTypeEnum.ORG_ADMIN.value]:
             group_role = GroupRole(group_id=group_id, role_id=role_id)
             self.db_session.add(group_role)
-            self.db_session.commit()
+            self._commit(lambda: self._get_users_in_groups([group_id]))
+            invalidate_group_bitsets([group_id])
+            invalidate_user_permissions(self._get_users_in_groups([group_id]))
+            bump_org_permission_versions([self.org_id])
             return group_role
         raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can assign roles to groups.")
 
+    @read_only
     def get_roles_for_user(self, user_id: int, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
-                           sort_by: Optional[str] = None, sort_order: str = 'asc') -> List[Type[Role]]:
+                           sort_by: Optional[str] = None, sort_order: str = 'asc',
+                           cursor: Optional[str] = None) -> List[Type[Role]]:
         query = self.db_session.query(Role).join(UserRole).filter(Role.organization_id == self.org_id)
-        if self._get_org_user_type() == OrgUserTypeEnum.ORG_STAFF.value:
+        if self.org_user_type == OrgUserTypeEnum.ORG_STAFF.value:
             query = query.filter(UserRole.user_id == user_id)
+        relevance = None
         if search_query:
-            query = query.filter(Role.name.ilike(f"%{search_query}%"))
-        if sort_by:
-            query = query.order_by(
-                getattr(Role, sort_by).desc() if sort_order == 'desc' else getattr(Role, sort_by).asc())
-        else:
-            query = query.order_by(Role.id)
-        return query.offset(offset).limit(limit).all()
+            query, relevance = apply_search(query, Role, search_query)
+        return paginate(query, Role, sort_by, sort_order, limit, offset, cursor, relevance).all()
+
+    def _check_org_roles(self, role_ids: Iterable[int]) -> None:
+        role_ids = set(role_ids)
+        found = self.db_session.query(Role.id).filter(Role.id.in_(role_ids), Role.organization_id == self.org_id)
+        if len(found.all()) != len(role_ids):
+            raise ValueError("Roles must exist in the organization.")
+
+    def add_role_parent(self, role_id: int, parent_id: int) -> bool:
+        """Make ``role_id`` inherit every permission of ``parent_id``; False when it already did."""
+        if not (self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
+                                                              OrgUserTypeEnum.ORG_ADMIN.value]):
+            raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can change role inheritance.")
+        self._check_org_roles([role_id, parent_id])
+        try:
+            added = add_role_parent(self.db_session, role_id, parent_id)
+        except ValueError:
+            self.db_session.rollback()
+            raise
+        self._commit(lambda: self._get_users_inheriting_roles([role_id]))
+        if added:
+            self._invalidate_roles([role_id])
+        return added
+
+    def remove_role_parent(self, role_id: int, parent_id: int) -> bool:
+        """Stop ``role_id`` inheriting from ``parent_id``; False when it did not."""
+        if not (self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
+                                                              OrgUserTypeEnum.ORG_ADMIN.value]):
+            raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can change role inheritance.")
+        self._check_org_roles([role_id, parent_id])
+        # Roles below the edge lose permissions, so collect them before the closure shrinks
+        affected = get_descendant_ids(self.db_session, [role_id])
+        removed = remove_role_parent(self.db_session, role_id, parent_id)
+        self._commit(lambda: self._get_users_with_roles(affected))
+        if removed:
+            self._invalidate_roles(affected)
+        return removed
 
     def create_group(self, name: str) -> Optional[Group]:
         if self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
@@ -84,33 +278,34 @@ class RBACRepository:
         raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can create groups.")
 
     def assign_user_to_group(self, user_id: int, group_id: int) -> Optional[UserGroup]:
-        if self._get_org_user_type() == OrgUserTypeEnum.ORG_STAFF.value:
+        if self.org_user_type == OrgUserTypeEnum.ORG_STAFF.value:
             user_group = UserGroup(user_id=user_id, group_id=group_id)
             self.db_session.add(user_group)
-            self.db_session.commit()
+            self._commit(lambda: [user_id])
+            invalidate_user_permissions([user_id])
+            bump_org_permission_versions([self.org_id])
             return user_group
         raise Exception("Unauthorized action - Only OrgStaff can be assigned to groups.")
 
+    @read_only
     def get_groups_for_user(self, user_id: int, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
-                            sort_by: Optional[str] = None, sort_order: str = 'asc') -> List[Type[Group]]:
+                            sort_by: Optional[str] = None, sort_order: str = 'asc',
+                            cursor: Optional[str] = None) -> List[Type[Group]]:
         query = self.db_session.query(Group).join(UserGroup).filter(Group.organization_id == self.org_id)
-        if self._get_org_user_type() == OrgUserTypeEnum.ORG_STAFF.value:
+        if self.org_user_type == OrgUserTypeEnum.ORG_STAFF.value:
             query = query.filter(UserGroup.user_id == user_id)
+        relevance = None
         if search_query:
-            query = query.filter(Group.name.ilike(f"%{search_query}%"))
-        if sort_by:
-            query = query.order_by(
-                getattr(Group, sort_by).desc() if sort_order == 'desc' else getattr(Group, sort_by).asc())
-        else:
-            query = query.order_by(Group.id)
-        return query.offset(offset).limit(limit).all()
+            query, relevance = apply_search(query, Group, search_query)
+        return paginate(query, Group, sort_by, sort_order, limit, offset, cursor, relevance).all()
 
     def assign_permission_to_role(self, role_id: int, permission_id: int) -> Optional[RolePermission]:
         if self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
                                                          OrgUserTypeEnum.ORG_ADMIN.value]:
             role_permission = RolePermission(role_id=role_id, permission_id=permission_id)
             self.db_session.add(role_permission)
-            self.db_session.commit()
+            self._commit(lambda: self._get_users_inheriting_roles([role_id]))
+            self._invalidate_roles([role_id])
             return role_permission
         raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can assign permissions to roles.")
 
@@ -119,26 +314,363 @@ class RBACRepository:
                                                          OrgUserTypeEnum.ORG_ADMIN.value]:
             user_permission = UserPermission(user_id=user_id, permission_id=permission_id)
             self.db_session.add(user_permission)
-            self.db_session.commit()
+            self._commit(lambda: [user_id])
+            invalidate_user_permissions([user_id])
+            # Direct grants apply in every organization of the user
+            bump_org_permission_versions(self._get_organizations_of_users([user_id]))
             return user_permission
         raise Exception("Unauthorized action - Only OrgOwner or OrgAdmin can assign permissions to users.")
 
+    def _check_bulk_allowed(self, kind: str) -> None:
+        _, managers_only, message = _BULK_KINDS[kind]
+        if managers_only:
+            allowed = self.is_super_admin or self.org_user_type in [OrgUserTypeEnum.ORG_OWNER.value,
+                                                                    OrgUserTypeEnum.ORG_ADMIN.value]
+        else:
+            allowed = self.org_user_type == OrgUserTypeEnum.ORG_STAFF.value
+        if not allowed:
+            raise Exception(f"Unauthorized action - {message}")
+
+    def _get_bulk_affected_users(self, created: Dict[str, List[Tuple[int, int]]]) -> Set[int]:
+        user_ids = {user_id for kind in ("user_roles", "user_groups", "user_permissions")
+                    for user_id, _ in created.get(kind, [])}
+        user_ids |= self._get_users_in_groups({group_id for group_id, _ in created.get("group_roles", [])})
+        return user_ids | self._get_users_inheriting_roles({role_id for role_id, _ in
+                                                            created.get("role_permissions", [])})
+
+    def _invalidate_bulk(self, created: Dict[str, List[Tuple[int, int]]]) -> None:
+        member_ids = {user_id for kind in ("user_roles", "user_groups") for user_id, _ in created.get(kind, [])}
+        group_ids = {group_id for group_id, _ in created.get("group_roles", [])}
+        if member_ids or group_ids:
+            invalidate_group_bitsets(group_ids)
+            invalidate_user_permissions(member_ids | self._get_users_in_groups(group_ids))
+            bump_org_permission_versions([self.org_id])
+        role_ids = {role_id for role_id, _ in created.get("role_permissions", [])}
+        if role_ids:
+            self._invalidate_roles(role_ids)
+        user_ids = {user_id for user_id, _ in created.get("user_permissions", [])}
+        if user_ids:
+            invalidate_user_permissions(user_ids)
+            # Direct grants apply in every organization of the user
+            bump_org_permission_versions(self._get_organizations_of_users(user_ids))
+
+    def bulk_assign(self, assignments: Dict[str, List[Tuple[int, int]]]) -> Dict[str, BulkResult]:
+        """Apply the pairs of every kind in ``assignments``, keyed like ``BulkAssignmentRequest``, in one transaction.
+
+        Either every kind is committed or, when any of them fails, none is. Returns the outcome of each non-empty
+        kind.
+        """
+        assignments = {kind: pairs for kind, pairs in assignments.items() if pairs}
+        for kind in assignments:
+            self._check_bulk_allowed(kind)
+        created: Dict[str, List[Tuple[int, int]]] = {}
+        results: Dict[str, BulkResult] = {}
+        try:
+            for kind, pairs in assignments.items():
+                created[kind], skipped, rejected = self._link_missing(_BULK_KINDS[kind][0], pairs)
+                results[kind] = (len(created[kind]), skipped, rejected)
+            self._commit(lambda: self._get_bulk_affected_users(created))
+        except Exception:
+            self.db_session.rollback()
+            raise
+        self._invalidate_bulk(created)
+        return results
+
+    def bulk_assign_roles_to_users(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        """Assign many ``(user_id, role_id)`` pairs in one transaction."""
+        return self.bulk_assign({"user_roles": pairs}).get("user_roles", (0, 0, []))
+
+    def bulk_assign_roles_to_groups(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        """Assign many ``(group_id, role_id)`` pairs in one transaction."""
+        return self.bulk_assign({"group_roles": pairs}).get("group_roles", (0, 0, []))
+
+    def bulk_assign_users_to_groups(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        """Add many ``(user_id, group_id)`` memberships in one transaction."""
+        return self.bulk_assign({"user_groups": pairs}).get("user_groups", (0, 0, []))
+
+    def bulk_assign_permissions_to_roles(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        """Grant many ``(role_id, permission_id)`` pairs in one transaction."""
+        return self.bulk_assign({"role_permissions": pairs}).get("role_permissions", (0, 0, []))
+
+    def bulk_assign_permissions_to_users(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        """Grant many ``(user_id, permission_id)`` pairs in one transaction."""
+        return self.bulk_assign({"user_permissions": pairs}).get("user_permissions", (0, 0, []))
+
     def get_permissions_for_user(self, user_id: int) -> Dict[str, List[str]]:
-        if self._get_org_user_type() != OrgUserTypeEnum.ORG_STAFF.value:
+        if self.org_user_type != OrgUserTypeEnum.ORG_STAFF.value:
             return {}
-        direct_permissions = self.db_session.query(Permission.module_id, Permission.action).join(UserPermission).filter(
-            UserPermission.user_id == user_id)
-        role_permissions = self.db_session.query(Permission.module_id, Permission.action).join(RolePermission).join(
-            UserRole, RolePermission.role_id == UserRole.role_id).filter(UserRole.user_id == user_id)
-        group_permissions = self.db_session.query(Permission.module_id, Permission.action).join(RolePermission).join(
-            GroupRole, RolePermission.role_id == GroupRole.role_id).join(UserGroup,
-                                                                         GroupRole.group_id == UserGroup.group_id).filter(
-            UserGroup.user_id == user_id)
-        all_permissions = direct_permissions.union(role_permissions).union(group_permissions).distinct().all()
-        module_permissions = {}
-        for module_id, action in all_permissions:
-            module = self.db_session.query(FeatureModule.name).filter(FeatureModule.id == module_id).scalar()
-            if module not in module_permissions:
-                module_permissions[module] = []
-            module_permissions[module].append(action)
-        return module_permissions
+        catalogue, bitsets = self.get_permission_bitsets([user_id])
+        return catalogue.decode(bitsets[user_id])
+
+    def has_permission(self, user_id: int, module: str, action: str) -> bool:
+        if self.org_user_type != OrgUserTypeEnum.ORG_STAFF.value:
+            return False
+        catalogue, bitsets = self.get_permission_bitsets([user_id])
+        return catalogue.has(bitsets[user_id], module, action)
+
+    def get_staff_user_ids(self, user_ids: List[int]) -> Set[int]:
+        """Return which of the given users are OrgStaff of the current organization."""
+        return {user_id for user_id, in self.db_session.query(UserOrganization.user_id).filter(
+            UserOrganization.organization_id == self.org_id,
+            UserOrganization.user_id.in_(user_ids),
+            UserOrganization.user_type == OrgUserTypeEnum.ORG_STAFF
+        ).all()}
+
+    def _get_holder_grants(self, permission_id: int):
+        """``(user_id, source)`` of every direct, role and group path granting the permission in the organization.
+
+        Each path starts from the permission and walks the reverse indexes of the association tables.
+        """
+        if effective_permissions_enabled():
+            return select(UserEffectivePermission.user_id, UserEffectivePermission.source).where(
+                UserEffectivePermission.permission_id == permission_id,
+                or_(UserEffectivePermission.org_id == self.org_id, UserEffectivePermission.org_id.is_(None)))
+        direct = select(UserPermission.user_id, literal("direct")).where(UserPermission.permission_id == permission_id)
+        role = select(UserRole.user_id, literal("role")).select_from(RolePermission).join(
+            RoleClosure, RoleClosure.ancestor_id == RolePermission.role_id).join(
+            Role, Role.id == RoleClosure.descendant_id).join(
+            UserRole, UserRole.role_id == RoleClosure.descendant_id).where(
+            RolePermission.permission_id == permission_id, Role.organization_id == self.org_id)
+        group = select(UserGroup.user_id, literal("group")).select_from(RolePermission).join(
+            RoleClosure, RoleClosure.ancestor_id == RolePermission.role_id).join(
+            GroupRole, GroupRole.role_id == RoleClosure.descendant_id).join(
+            Group, Group.id == GroupRole.group_id).join(
+            UserGroup, UserGroup.group_id == GroupRole.group_id).where(
+            RolePermission.permission_id == permission_id, Group.organization_id == self.org_id)
+        return union(direct, role, group)
+
+    def get_permission_holders(self, module: str, action: str, limit: int = 100,
+                               cursor: Optional[str] = None) -> Tuple[List[Tuple[User, List[str]]], Optional[str]]:
+        """OrgStaff of the organization holding ``module:action``, by user id, with the paths granting it.
+
+        Returns one page of ``(user, sources)`` and the cursor of the next page.
+        """
+        catalogue = get_permission_catalogue(self.db_session)
+        index = catalogue.index_of(module, action)
+        if index is None:
+            # Permissions created since the catalogue was loaded are not in it yet
+            catalogue = get_permission_catalogue(self.db_session, refresh=True)
+            index = catalogue.index_of(module, action)
+        if index is None:
+            raise ValueError(f"Unknown permission '{module}:{action}'.")
+        grants = self._get_holder_grants(catalogue.permission_ids[index]).subquery()
+        query = self.db_session.query(User).join(UserOrganization, UserOrganization.user_id == User.id).filter(
+            UserOrganization.organization_id == self.org_id,
+            UserOrganization.user_type == OrgUserTypeEnum.ORG_STAFF,
+            User.id.in_(select(grants.c[0])))
+        if cursor is not None:
+            payload = decode_cursor(cursor)
+            if payload["k"] != "holders":
+                raise ValueError("Invalid pagination cursor.")
+            query = query.filter(User.id > payload["id"])
+        users = query.order_by(User.id).limit(limit).all()
+
+        sources: Dict[int, List[str]] = {user.id: [] for user in users}
+        if users:
+            for user_id, source in self.db_session.execute(
+                    select(grants).where(grants.c[0].in_(list(sources))).order_by(grants.c[1])):
+                sources[user_id].append(source)
+        next_cursor = encode_cursor("holders", "asc", None, users[-1].id) if len(users) == limit else None
+        return [(user, sources[user.id]) for user in users], next_cursor
+
+    def get_permission_bitsets(self, user_ids: List[int]) -> Tuple[PermissionCatalogue, Dict[int, int]]:
+        """Return the effective permission bitsets of the given users within the current organization.
+
+        Cached users cost no SQL; the rest are resolved together with a fixed number of set-based queries.
+        Local entries are only trusted while the organization's version in the shared cache is unchanged, and
+        users missing locally are looked up in the shared cache before being resolved.
+        The bitsets are only meaningful against the returned catalogue.
+        """
+        version = get_permission_version(self.org_id)
+        catalogue = get_permission_catalogue(self.db_session, version=version[0] if version else None)
+        bitsets = {}
+        missing = []
+        for user_id in user_ids:
+            bits = get_versioned(permission_cache, (self.org_id, user_id), version)
+            if bits is None:
+                missing.append(user_id)
+            else:
+                bitsets[user_id] = bits
+        if missing:
+            for user_id, bits in get_shared_permission_bitsets(version, self.org_id, missing).items():
+                # Bits beyond the local catalogue belong to permissions this worker has not loaded yet
+                if bits.bit_length() <= len(catalogue):
+                    bitsets[user_id] = bits
+                    set_versioned(permission_cache, (self.org_id, user_id), version, bits)
+            missing = [user_id for user_id in missing if user_id not in bitsets]
+        if not missing:
+            return catalogue, bitsets
+        resolved_catalogue, resolved = self._resolve_permission_bitsets(missing, catalogue, version)
+        if resolved_catalogue is not catalogue and not resolved_catalogue.extends(catalogue):
+            # The catalogue was rebuilt with different indexes, so the cached hits above are stale
+            return self.get_permission_bitsets(user_ids)
+        for user_id, bits in resolved.items():
+            set_versioned(permission_cache, (self.org_id, user_id), version, bits)
+        set_shared_permission_bitsets(version, self.org_id, resolved)
+        bitsets.update(resolved)
+        return resolved_catalogue, bitsets
+
+    def _resolve_permission_bitsets(self, user_ids: List[int], catalogue: PermissionCatalogue,
+                                    version: Optional[PermissionVersion]
+                                    ) -> Tuple[PermissionCatalogue, Dict[int, int]]:
+        if effective_permissions_enabled():
+            return self._resolve_effective_permission_bitsets(user_ids)
+        direct_grants = self.db_session.query(
+            UserPermission.user_id, literal("permission").label("source"), UserPermission.permission_id
+        ).filter(UserPermission.user_id.in_(user_ids))
+        role_grants = self.db_session.query(UserRole.user_id, literal("role"), UserRole.role_id).join(
+            Role, Role.id == UserRole.role_id).filter(UserRole.user_id.in_(user_ids),
+                                                      Role.organization_id == self.org_id)
+        group_grants = self.db_session.query(UserGroup.user_id, literal("group"), UserGroup.group_id).join(
+            Group, Group.id == UserGroup.group_id).filter(UserGroup.user_id.in_(user_ids),
+                                                          Group.organization_id == self.org_id)
+        grants = {user_id: {"permission": [], "role": [], "group": []} for user_id in user_ids}
+        for user_id, source, target_id in direct_grants.union(role_grants).union(group_grants).all():
+            grants[user_id][source].append(target_id)
+
+        role_ids = {role_id for user_grants in grants.values() for role_id in user_grants["role"]}
+        group_ids = {group_id for user_grants in grants.values() for group_id in user_grants["group"]}
+        role_bitsets = {role_id: get_versioned(role_bitset_cache, role_id, version) for role_id in role_ids}
+        group_bitsets = {group_id: get_versioned(group_bitset_cache, group_id, version) for group_id in group_ids}
+        role_rows = self._get_role_permission_rows([role_id for role_id, bits in role_bitsets.items() if bits is None])
+        group_rows = self._get_group_permission_rows(
+            [group_id for group_id, bits in group_bitsets.items() if bits is None])
+
+        permission_ids = {permission_id for user_grants in grants.values()
+                          for permission_id in user_grants["permission"]}
+        permission_ids.update(permission_id for _, permission_id in role_rows + group_rows)
+        resolved_catalogue = get_permission_catalogue(self.db_session, permission_ids)
+        if resolved_catalogue is not catalogue and not resolved_catalogue.extends(catalogue):
+            return self._resolve_permission_bitsets(user_ids, resolved_catalogue, version)
+
+        for bitsets, rows, cache in ((role_bitsets, role_rows, role_bitset_cache),
+                                     (group_bitsets, group_rows, group_bitset_cache)):
+            loaded = {owner_id: 0 for owner_id, bits in bitsets.items() if bits is None}
+            for owner_id, permission_id in rows:
+                loaded[owner_id] |= resolved_catalogue.encode([permission_id])
+            for owner_id, bits in loaded.items():
+                set_versioned(cache, owner_id, version, bits)
+            bitsets.update(loaded)
+
+        resolved = {}
+        for user_id, user_grants in grants.items():
+            bits = resolved_catalogue.encode(user_grants["permission"])
+            for role_id in user_grants["role"]:
+                bits |= role_bitsets[role_id]
+            for group_id in user_grants["group"]:
+                bits |= group_bitsets[group_id]
+            resolved[user_id] = bits
+        return resolved_catalogue, resolved
+
+    def _resolve_effective_permission_bitsets(self, user_ids: List[int]
+                                              ) -> Tuple[PermissionCatalogue, Dict[int, int]]:
+        rows = get_effective_permission_rows(self.db_session, self.org_id, user_ids)
+        resolved_catalogue = get_permission_catalogue(self.db_session, {permission_id for _, permission_id in rows})
+        resolved = {user_id: 0 for user_id in user_ids}
+        for user_id, permission_id in rows:
+            resolved[user_id] |= resolved_catalogue.encode([permission_id])
+        return resolved_catalogue, resolved
+
+    def _get_role_permission_rows(self, role_ids: List[int]) -> List[Tuple[int, int]]:
+        if not role_ids:
+            return []
+        # role_closure holds every role's ancestors including itself, so inheritance depth costs no extra queries
+        query = self.db_session.query(RoleClosure.descendant_id, RolePermission.permission_id).join(
+            RolePermission, RolePermission.role_id == RoleClosure.ancestor_id).filter(
+            RoleClosure.descendant_id.in_(role_ids))
+        return [tuple(row) for row in query.distinct().all()]
+
+    def _get_group_permission_rows(self, group_ids: List[int]) -> List[Tuple[int, int]]:
+        if not group_ids:
+            return []
+        query = self.db_session.query(GroupRole.group_id, RolePermission.permission_id).join(
+            RoleClosure, RoleClosure.descendant_id == GroupRole.role_id).join(
+            RolePermission, RolePermission.role_id == RoleClosure.ancestor_id).filter(GroupRole.group_id.in_(group_ids))
+        return [tuple(row) for row in query.distinct().all()]
+
+
+class AsyncRBACRepository(AsyncRepository):
+    """Async counterpart of ``RBACRepository``; build it with ``await AsyncRBACRepository.create(...)``."""
+
+    @classmethod
+    async def create(cls, db_session: AsyncSession, org_id: Optional[int] = None, is_super_admin: bool = False,
+                     user_id: Optional[int] = None,
+                     membership: Optional[MembershipContext] = None) -> "AsyncRBACRepository":
+        # The constructor may resolve the caller's org role, so it has to run on the async connection as well
+        repository = await db_session.run_sync(
+            lambda session: RBACRepository(session, org_id=org_id, is_super_admin=is_super_admin, user_id=user_id,
+                                           membership=membership))
+        return cls(db_session, repository)
+
+    async def create_role(self, name: str, created_by_id: int) -> Optional[Role]:
+        return await self.run(self.repository.create_role, name, created_by_id)
+
+    async def assign_role_to_user(self, user_id: int, role_id: int) -> Optional[UserRole]:
+        return await self.run(self.repository.assign_role_to_user, user_id, role_id)
+
+    async def assign_role_to_group(self, group_id: int, role_id: int) -> Optional[GroupRole]:
+        return await self.run(self.repository.assign_role_to_group, group_id, role_id)
+
+    async def get_roles_for_user(self, user_id: int, search_query: Optional[str] = None, limit: int = 10,
+                                 offset: int = 0, sort_by: Optional[str] = None, sort_order: str = 'asc',
+                                 cursor: Optional[str] = None) -> List[Type[Role]]:
+        return await self.run(self.repository.get_roles_for_user, user_id, search_query, limit, offset, sort_by,
+                              sort_order, cursor)
+
+    async def add_role_parent(self, role_id: int, parent_id: int) -> bool:
+        return await self.run(self.repository.add_role_parent, role_id, parent_id)
+
+    async def remove_role_parent(self, role_id: int, parent_id: int) -> bool:
+        return await self.run(self.repository.remove_role_parent, role_id, parent_id)
+
+    async def create_group(self, name: str) -> Optional[Group]:
+        return await self.run(self.repository.create_group, name)
+
+    async def assign_user_to_group(self, user_id: int, group_id: int) -> Optional[UserGroup]:
+        return await self.run(self.repository.assign_user_to_group, user_id, group_id)
+
+    async def get_groups_for_user(self, user_id: int, search_query: Optional[str] = None, limit: int = 10,
+                                  offset: int = 0, sort_by: Optional[str] = None, sort_order: str = 'asc',
+                                  cursor: Optional[str] = None) -> List[Type[Group]]:
+        return await self.run(self.repository.get_groups_for_user, user_id, search_query, limit, offset, sort_by,
+                              sort_order, cursor)
+
+    async def assign_permission_to_role(self, role_id: int, permission_id: int) -> Optional[RolePermission]:
+        return await self.run(self.repository.assign_permission_to_role, role_id, permission_id)
+
+    async def assign_permission_to_user(self, user_id: int, permission_id: int) -> Optional[UserPermission]:
+        return await self.run(self.repository.assign_permission_to_user, user_id, permission_id)
+
+    async def bulk_assign(self, assignments: Dict[str, List[Tuple[int, int]]]) -> Dict[str, BulkResult]:
+        return await self.run(self.repository.bulk_assign, assignments)
+
+    async def bulk_assign_roles_to_users(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        return await self.run(self.repository.bulk_assign_roles_to_users, pairs)
+
+    async def bulk_assign_roles_to_groups(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        return await self.run(self.repository.bulk_assign_roles_to_groups, pairs)
+
+    async def bulk_assign_users_to_groups(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        return await self.run(self.repository.bulk_assign_users_to_groups, pairs)
+
+    async def bulk_assign_permissions_to_roles(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        return await self.run(self.repository.bulk_assign_permissions_to_roles, pairs)
+
+    async def bulk_assign_permissions_to_users(self, pairs: List[Tuple[int, int]]) -> BulkResult:
+        return await self.run(self.repository.bulk_assign_permissions_to_users, pairs)
+
+    async def get_permissions_for_user(self, user_id: int) -> Dict[str, List[str]]:
+        return await self.run(self.repository.get_permissions_for_user, user_id)
+
+    async def has_permission(self, user_id: int, module: str, action: str) -> bool:
+        return await self.run(self.repository.has_permission, user_id, module, action)
+
+    async def get_staff_user_ids(self, user_ids: List[int]) -> Set[int]:
+        return await self.run(self.repository.get_staff_user_ids, user_ids)
+
+    async def get_permission_holders(self, module: str, action: str, limit: int = 100, cursor: Optional[str] = None
+                                     ) -> Tuple[List[Tuple[User, List[str]]], Optional[str]]:
+        return await self.run(self.repository.get_permission_holders, module, action, limit, cursor)
+
+    async def get_permission_bitsets(self, user_ids: List[int]) -> Tuple[PermissionCatalogue, Dict[int, int]]:
+        return await self.run(self.repository.get_permission_bitsets, user_ids)
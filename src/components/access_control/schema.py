@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+
+class PermissionRef(BaseModel):
+    module: str
+    action: str
+
+
+class BatchPermissionCheckRequest(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    permissions: List[PermissionRef] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchPermissionCheckResponse(BaseModel):
+    user_ids: List[int]
+    permissions: List[PermissionRef]
+    # matrix[i][j] tells whether user_ids[i] holds permissions[j]
+    matrix: List[List[bool]]
+    # Hex bitmap per user where bit j is set when the user holds permissions[j]
+    bitmaps: List[str]
+
+
+class PermissionHolder(BaseModel):
+    user_id: int
+    name: str
+    email: str
+    # Paths granting the permission: "direct", "role" and/or "group"
+    sources: List[str]
+
+
+# Largest number of pairs accepted per assignment kind in one bulk request
+MAX_BULK_ASSIGNMENTS = 10000
+
+
+class BulkAssignmentRequest(BaseModel):
+    user_roles: List[Tuple[int, int]] = Field([], max_length=MAX_BULK_ASSIGNMENTS, description="(user_id, role_id)")
+    group_roles: List[Tuple[int, int]] = Field([], max_length=MAX_BULK_ASSIGNMENTS, description="(group_id, role_id)")
+    user_groups: List[Tuple[int, int]] = Field([], max_length=MAX_BULK_ASSIGNMENTS, description="(user_id, group_id)")
+    role_permissions: List[Tuple[int, int]] = Field([], max_length=MAX_BULK_ASSIGNMENTS,
+                                                    description="(role_id, permission_id)")
+    user_permissions: List[Tuple[int, int]] = Field([], max_length=MAX_BULK_ASSIGNMENTS,
+                                                    description="(user_id, permission_id)")
+
+
+class BulkAssignmentSummary(BaseModel):
+    created: int
+    # Pairs that were already assigned or repeated within the request
+    skipped: int
+    # Pairs naming a user, role or group outside the organization, or an unknown permission; none were inserted
+    rejected: List[Tuple[int, int]] = []
+
+
+class BulkAssignmentResponse(BaseModel):
+    user_roles: Optional[BulkAssignmentSummary] = None
+    group_roles: Optional[BulkAssignmentSummary] = None
+    user_groups: Optional[BulkAssignmentSummary] = None
+    role_permissions: Optional[BulkAssignmentSummary] = None
+    user_permissions: Optional[BulkAssignmentSummary] = None
+
+
+class RoleParentResponse(BaseModel):
+    role_id: int
+    parent_id: int
+    # False when the request left the hierarchy as it was
+    changed: bool
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.components.audit_log.service import record_audit, record_audit_async
+
+from .bitset import PermissionCatalogue
+from .repository import AsyncRBACRepository, BulkResult, RBACRepository
+from .schema import (
+    BatchPermissionCheckRequest,
+    BatchPermissionCheckResponse,
+    BulkAssignmentRequest,
+    BulkAssignmentResponse,
+    BulkAssignmentSummary,
+    PermissionHolder,
+    RoleParentResponse,
+)
+
+def _to_check_response(check_request: BatchPermissionCheckRequest, catalogue: PermissionCatalogue,
+                       bitsets: Dict[int, int]) -> BatchPermissionCheckResponse:
+    indexes = [catalogue.index_of(permission.module, permission.action) for permission in check_request.permissions]
+    matrix, bitmaps = [], []
+    for user_id in check_request.user_ids:
+        bits = bitsets.get(user_id, 0)
+        row = [index is not None and bits >> index & 1 == 1 for index in indexes]
+        matrix.append(row)
+        bitmaps.append(format(sum(1 << position for position, allowed in enumerate(row) if allowed), "x"))
+    return BatchPermissionCheckResponse(
+        user_ids=check_request.user_ids,
+        permissions=check_request.permissions,
+        matrix=matrix,
+        bitmaps=bitmaps
+    )
+
+
+def _to_holders(page) -> List[PermissionHolder]:
+    return [PermissionHolder(user_id=user.id, name=user.name, email=user.email, sources=sources)
+            for user, sources in page]
+
+
+def _to_bulk_response(results: Dict[str, BulkResult]) -> BulkAssignmentResponse:
+    return BulkAssignmentResponse(**{field: BulkAssignmentSummary(created=created, skipped=skipped, rejected=rejected)
+                                     for field, (created, skipped, rejected) in results.items()})
+
+
+class RBACService:
+    def __init__(self, rbac_repository: RBACRepository):
+        self.rbac_repository = rbac_repository
+
+    def check_permissions(self, check_request: BatchPermissionCheckRequest) -> BatchPermissionCheckResponse:
+        """Evaluate every (user, permission) pair of the request in one pass."""
+        staff_ids = self.rbac_repository.get_staff_user_ids(check_request.user_ids)
+        catalogue, bitsets = self.rbac_repository.get_permission_bitsets(sorted(staff_ids))
+        return _to_check_response(check_request, catalogue, bitsets)
+
+    def get_permission_holders(self, module: str, action: str, limit: int = 100,
+                               cursor: Optional[str] = None) -> Tuple[List[PermissionHolder], Optional[str]]:
+        """One page of the organization's staff holding the permission, and the cursor of the next one."""
+        page, next_cursor = self.rbac_repository.get_permission_holders(module, action, limit, cursor)
+        return _to_holders(page), next_cursor
+
+    def bulk_assign(self, assignments: BulkAssignmentRequest) -> BulkAssignmentResponse:
+        """Apply every non-empty kind of assignment in one transaction: all of them are committed or none is."""
+        results = self.rbac_repository.bulk_assign(assignments.model_dump())
+        for field, (created, _, _) in results.items():
+            record_audit(self.rbac_repository.user_id,
+                         f"{field}.bulk_assign:org={self.rbac_repository.org_id},created={created}",
+                         org_id=self.rbac_repository.org_id)
+        return _to_bulk_response(results)
+
+    def add_role_parent(self, role_id: int, parent_id: int) -> RoleParentResponse:
+        """Make a role inherit the permissions of another role of the organization."""
+        changed = self.rbac_repository.add_role_parent(role_id, parent_id)
+        if changed:
+            record_audit(self.rbac_repository.user_id, f"role.add_parent:role={role_id},parent={parent_id}",
+                         org_id=self.rbac_repository.org_id)
+        return RoleParentResponse(role_id=role_id, parent_id=parent_id, changed=changed)
+
+    def remove_role_parent(self, role_id: int, parent_id: int) -> RoleParentResponse:
+        changed = self.rbac_repository.remove_role_parent(role_id, parent_id)
+        if changed:
+            record_audit(self.rbac_repository.user_id, f"role.remove_parent:role={role_id},parent={parent_id}",
+                         org_id=self.rbac_repository.org_id)
+        return RoleParentResponse(role_id=role_id, parent_id=parent_id, changed=changed)
+
+
+class AsyncRBACService:
+    def __init__(self, rbac_repository: AsyncRBACRepository):
+        self.rbac_repository = rbac_repository
+
+    async def check_permissions(self, check_request: BatchPermissionCheckRequest) -> BatchPermissionCheckResponse:
+        """Evaluate every (user, permission) pair of the request in one pass."""
+        staff_ids = await self.rbac_repository.get_staff_user_ids(check_request.user_ids)
+        catalogue, bitsets = await self.rbac_repository.get_permission_bitsets(sorted(staff_ids))
+        return _to_check_response(check_request, catalogue, bitsets)
+
+    async def get_permission_holders(self, module: str, action: str, limit: int = 100,
+                                     cursor: Optional[str] = None) -> Tuple[List[PermissionHolder], Optional[str]]:
+        """One page of the organization's staff holding the permission, and the cursor of the next one."""
+        page, next_cursor = await self.rbac_repository.get_permission_holders(module, action, limit, cursor)
+        return _to_holders(page), next_cursor
+
+    async def bulk_assign(self, assignments: BulkAssignmentRequest) -> BulkAssignmentResponse:
+        """Apply every non-empty kind of assignment in one transaction: all of them are committed or none is."""
+        results = await self.rbac_repository.bulk_assign(assignments.model_dump())
+        for field, (created, _, _) in results.items():
+            await record_audit_async(self.rbac_repository.repository.user_id,
+                                     f"{field}.bulk_assign:org={self.rbac_repository.repository.org_id},"
+                                     f"created={created}", org_id=self.rbac_repository.repository.org_id)
+        return _to_bulk_response(results)
+
+    async def add_role_parent(self, role_id: int, parent_id: int) -> RoleParentResponse:
+        """Make a role inherit the permissions of another role of the organization."""
+        changed = await self.rbac_repository.add_role_parent(role_id, parent_id)
+        if changed:
+            await record_audit_async(self.rbac_repository.repository.user_id,
+                                     f"role.add_parent:role={role_id},parent={parent_id}",
+                                     org_id=self.rbac_repository.repository.org_id)
+        return RoleParentResponse(role_id=role_id, parent_id=parent_id, changed=changed)
+
+    async def remove_role_parent(self, role_id: int, parent_id: int) -> RoleParentResponse:
+        changed = await self.rbac_repository.remove_role_parent(role_id, parent_id)
+        if changed:
+            await record_audit_async(self.rbac_repository.repository.user_id,
+                                     f"role.remove_parent:role={role_id},parent={parent_id}",
+                                     org_id=self.rbac_repository.repository.org_id)
+        return RoleParentResponse(role_id=role_id, parent_id=parent_id, changed=changed)
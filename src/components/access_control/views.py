@@ -0,0 +1,207 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.components.organizations.membership import (
+    MembershipContext,
+    get_async_membership_context,
+    get_membership_context,
+)
+from src.config import Settings, get_settings
+from src.core.authorization import require_permission, require_permission_async
+from src.core.db import get_async_db, get_db
+from src.utils.etag import etag_matches, make_etag, not_modified
+
+from .cache import get_rbac_version
+
+from .repository import AsyncRBACRepository, RBACRepository
+from .schema import (
+    BatchPermissionCheckRequest,
+    BatchPermissionCheckResponse,
+    BulkAssignmentRequest,
+    BulkAssignmentResponse,
+    PermissionHolder,
+    RoleParentResponse,
+)
+from .service import AsyncRBACService, RBACService
+
+router = APIRouter()
+
+# Same routes served from an AsyncSession, mounted instead of ``router`` when async database mode is on
+async_router = APIRouter()
+
+
+# Dependency to get RBACService acting as the caller in the organization of the path
+def get_rbac_service(_: Request, membership: MembershipContext = Depends(get_membership_context),
+                     db: Session = Depends(get_db)):
+    rbac_repo = RBACRepository(db, membership=membership)
+    return RBACService(rbac_repo)
+
+
+# Dependency to get AsyncRBACService acting as the caller in the organization of the path
+async def get_async_rbac_service(_: Request, membership: MembershipContext = Depends(get_async_membership_context),
+                                 db: AsyncSession = Depends(get_async_db)):
+    rbac_repo = await AsyncRBACRepository.create(db, membership=membership)
+    return AsyncRBACService(rbac_repo)
+
+
+def _holders_etag(org_id: int, module: str, action: str, limit: int, cursor: Optional[str]) -> Optional[str]:
+    """ETag of a page of permission holders, from the organization's RBAC version; costs no SQL."""
+    version = get_rbac_version(org_id)
+    return make_etag("holders", org_id, version, module, action, limit, cursor) if version is not None else None
+
+
+def _set_cache_headers(response: Response, etag: Optional[str], settings: Settings):
+    if etag:
+        response.headers["ETag"] = etag
+    if settings.permissions_cache_control:
+        response.headers["Cache-Control"] = settings.permissions_cache_control
+
+
+def _raise_for_unauthorized(error: Exception):
+    """Surface the repository's authorization failures as 403 and let anything else propagate."""
+    if str(error).startswith("Unauthorized action"):
+        raise HTTPException(status_code=403, detail=str(error))
+    raise error
+
+
+@router.post("/{org_id}/permissions/check", response_model=BatchPermissionCheckResponse, status_code=200,
+             dependencies=[Depends(require_permission("access_control", "read"))])
+def check_permissions(check_request: BatchPermissionCheckRequest,
+                      rbac_service: RBACService = Depends(get_rbac_service)):
+    return rbac_service.check_permissions(check_request)
+
+
+@async_router.post("/{org_id}/permissions/check", response_model=BatchPermissionCheckResponse, status_code=200,
+                   dependencies=[Depends(require_permission_async("access_control", "read"))])
+async def check_permissions_async(check_request: BatchPermissionCheckRequest,
+                                  rbac_service: AsyncRBACService = Depends(get_async_rbac_service)):
+    return await rbac_service.check_permissions(check_request)
+
+
+@router.get("/{org_id}/permissions/{module}/{action}/holders", response_model=List[PermissionHolder],
+            status_code=200, dependencies=[Depends(require_permission("access_control", "read"))])
+def get_permission_holders(
+        org_id: int,
+        module: str,
+        action: str,
+        response: Response,
+        limit: int = Query(100, ge=1, le=1000, description="Number of holders per page"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+        if_none_match: Optional[str] = Header(None),
+        rbac_service: RBACService = Depends(get_rbac_service),
+        settings: Settings = Depends(get_settings)
+):
+    etag = _holders_etag(org_id, module, action, limit, cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, settings.permissions_cache_control)
+    try:
+        holders, next_cursor = rbac_service.get_permission_holders(module, action, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    _set_cache_headers(response, etag, settings)
+    return holders
+
+
+@async_router.get("/{org_id}/permissions/{module}/{action}/holders", response_model=List[PermissionHolder],
+                  status_code=200, dependencies=[Depends(require_permission_async("access_control", "read"))])
+async def get_permission_holders_async(
+        org_id: int,
+        module: str,
+        action: str,
+        response: Response,
+        limit: int = Query(100, ge=1, le=1000, description="Number of holders per page"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+        if_none_match: Optional[str] = Header(None),
+        rbac_service: AsyncRBACService = Depends(get_async_rbac_service),
+        settings: Settings = Depends(get_settings)
+):
+    etag = _holders_etag(org_id, module, action, limit, cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, settings.permissions_cache_control)
+    try:
+        holders, next_cursor = await rbac_service.get_permission_holders(module, action, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    _set_cache_headers(response, etag, settings)
+    return holders
+
+
+@router.post("/{org_id}/assignments/bulk", response_model=BulkAssignmentResponse, response_model_exclude_none=True,
+             status_code=200, dependencies=[Depends(require_permission("access_control", "update"))])
+def bulk_assign(assignments: BulkAssignmentRequest, rbac_service: RBACService = Depends(get_rbac_service)):
+    """Create many assignments of the organization at once, in one transaction.
+
+    Either every kind of assignment is committed or, when one fails, none is. Pairs already linked are skipped and
+    pairs naming users, roles or groups outside the organization, or unknown permissions, are returned as rejected.
+    """
+    try:
+        return rbac_service.bulk_assign(assignments)
+    except Exception as e:
+        _raise_for_unauthorized(e)
+
+
+@async_router.post("/{org_id}/assignments/bulk", response_model=BulkAssignmentResponse,
+                   response_model_exclude_none=True, status_code=200,
+                   dependencies=[Depends(require_permission_async("access_control", "update"))])
+async def bulk_assign_async(assignments: BulkAssignmentRequest,
+                            rbac_service: AsyncRBACService = Depends(get_async_rbac_service)):
+    """Create many assignments of the organization at once, in one transaction.
+
+    Either every kind of assignment is committed or, when one fails, none is. Pairs already linked are skipped and
+    pairs naming users, roles or groups outside the organization, or unknown permissions, are returned as rejected.
+    """
+    try:
+        return await rbac_service.bulk_assign(assignments)
+    except Exception as e:
+        _raise_for_unauthorized(e)
+
+
+@router.put("/{org_id}/roles/{role_id}/parents/{parent_id}", response_model=RoleParentResponse, status_code=200)
+def add_role_parent(role_id: int, parent_id: int, rbac_service: RBACService = Depends(get_rbac_service)):
+    try:
+        return rbac_service.add_role_parent(role_id, parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        _raise_for_unauthorized(e)
+
+
+@async_router.put("/{org_id}/roles/{role_id}/parents/{parent_id}", response_model=RoleParentResponse,
+                  status_code=200)
+async def add_role_parent_async(role_id: int, parent_id: int,
+                                rbac_service: AsyncRBACService = Depends(get_async_rbac_service)):
+    try:
+        return await rbac_service.add_role_parent(role_id, parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        _raise_for_unauthorized(e)
+
+
+@router.delete("/{org_id}/roles/{role_id}/parents/{parent_id}", response_model=RoleParentResponse, status_code=200)
+def remove_role_parent(role_id: int, parent_id: int, rbac_service: RBACService = Depends(get_rbac_service)):
+    try:
+        return rbac_service.remove_role_parent(role_id, parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        _raise_for_unauthorized(e)
+
+
+@async_router.delete("/{org_id}/roles/{role_id}/parents/{parent_id}", response_model=RoleParentResponse,
+                     status_code=200)
+async def remove_role_parent_async(role_id: int, parent_id: int,
+                                   rbac_service: AsyncRBACService = Depends(get_async_rbac_service)):
+    try:
+        return await rbac_service.remove_role_parent(role_id, parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        _raise_for_unauthorized(e)
@@ -0,0 +1,12 @@
+"""Roll the audit log partitions over and expire old ones; meant to run from cron.
+
+    python -m src.components.audit_log.maintenance
+"""
+from src.config import get_settings
+from src.core.db import engine
+
+from .service import run_audit_maintenance
+
+if __name__ == "__main__":
+    expired = run_audit_maintenance(get_settings(), engine)
+    print(f"Expired audit log partitions: {', '.join(expired) or 'none'}")
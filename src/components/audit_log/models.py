@@ -1,13 +1,23 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.sql import func
 
 from src.core.db import Base
 
 
 class AuditLog(Base):
+    """Audit entries written before monthly partitioning; new entries go to the ``audit_log_pYYYYMM`` tables."""
+
     __tablename__ = "audit_log"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("user.id", ondelete="SET NULL"))
+    # Organization the action was performed in; None for actions outside any organization
+    org_id = Column(Integer, ForeignKey("organization.id", ondelete="SET NULL"))
     action = Column(String, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_log_user_id_created_at", "user_id", "created_at"),
+        Index("ix_audit_log_org_id_created_at", "org_id", "created_at"),
+        Index("ix_audit_log_created_at", "created_at"),
+    )
@@ -0,0 +1,144 @@
+import gzip
+import json
+import logging
+import os
+import re
+import weakref
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection
+
+from .models import AuditLog
+
+logger = logging.getLogger("uvicorn")
+
+PARTITION_PREFIX = "audit_log_p"
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+# Partition tables live outside Base.metadata: they are created on demand and dropped by the retention job.
+# They carry no foreign key to user or organization so that deleting a user never has to touch every partition.
+_metadata = MetaData()
+_tables: Dict[str, Table] = {}
+
+# engine -> names of the partitions known to exist
+_known_partitions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def utcnow() -> datetime:
+    # Naive UTC, like the timestamps stored in the created_at columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(moment: datetime) -> str:
+    return f"{PARTITION_PREFIX}{moment:%Y%m}"
+
+
+def get_partition_start(name: str) -> Optional[datetime]:
+    match = _PARTITION_NAME.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def get_partition_table(name: str) -> Table:
+    table = _tables.get(name)
+    if table is None:
+        table = Table(
+            name, _metadata,
+            Column("id", Integer, primary_key=True, autoincrement=True),
+            Column("user_id", Integer),
+            Column("org_id", Integer),
+            Column("action", String, nullable=False),
+            Column("created_at", DateTime, nullable=False),
+            Index(f"ix_{name}_user_id_created_at", "user_id", "created_at"),
+            Index(f"ix_{name}_org_id_created_at", "org_id", "created_at"),
+            Index(f"ix_{name}_created_at", "created_at"),
+        )
+        _tables[name] = table
+    return table
+
+
+def _known(connection: Connection) -> Set[str]:
+    return _known_partitions.setdefault(connection.engine, set())
+
+
+def ensure_partition(connection: Connection, moment: datetime) -> Table:
+    """Return the partition holding ``moment``, creating it when it does not exist yet."""
+    name = get_partition_name(moment)
+    table = get_partition_table(name)
+    known = _known(connection)
+    if name not in known:
+        table.create(connection, checkfirst=True)
+        known.add(name)
+    return table
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    """Names of the existing partitions, oldest first."""
+    names = sorted(name for name in inspect(connection).get_table_names() if _PARTITION_NAME.match(name))
+    _known(connection).update(names)
+    return names
+
+
+def get_partition_sources(connection: Connection, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None) -> List[Table]:
+    """Tables that may hold rows created in ``[since, until)``, newest first.
+
+    The unpartitioned ``audit_log`` table comes last: it only holds rows written before partitioning.
+    """
+    sources = []
+    for name in reversed(list_partitions(connection)):
+        start = get_partition_start(name)
+        if (until is None or start < until) and (since is None or add_months(start, 1) > since):
+            sources.append(get_partition_table(name))
+    sources.append(AuditLog.__table__)
+    return sources
+
+
+def rollover(connection: Connection, now: Optional[datetime] = None) -> List[str]:
+    """Make sure the partitions of the current and the next month exist ahead of the writes."""
+    current = month_start(now or utcnow())
+    return [ensure_partition(connection, moment).name for moment in (current, add_months(current, 1))]
+
+
+def archive_partition(connection: Connection, name: str, archive_dir: str) -> str:
+    """Write every row of the partition to a gzipped NDJSON file in ``archive_dir``."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.ndjson.gz")
+    table = get_partition_table(name)
+    rows = connection.execution_options(yield_per=1000).execute(select(table).order_by(table.c.id))
+    with gzip.open(path, "wt", encoding="utf-8") as archive:
+        for row in rows.mappings():
+            archive.write(json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n")
+    return path
+
+
+def apply_retention(connection: Connection, retention_months: int, now: Optional[datetime] = None,
+                    archive_dir: Optional[str] = None) -> List[str]:
+    """Drop (after archiving, when ``archive_dir`` is set) the partitions older than ``retention_months``.
+
+    Whole tables are dropped, so expiring a month costs the same whatever its row count.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(now or utcnow()), -retention_months)
+    dropped = []
+    for name in list_partitions(connection):
+        if get_partition_start(name) >= cutoff:
+            break
+        if archive_dir:
+            archive_partition(connection, name, archive_dir)
+        get_partition_table(name).drop(connection)
+        _known(connection).discard(name)
+        dropped.append(name)
+        logger.info(f"Audit log partition {name} expired")
+    return dropped
@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.db import AsyncRepository
+from src.core.routing import read_only
+from src.utils.pagination import decode_cursor, encode_cursor
+
+from .partitions import ensure_partition, get_partition_name, get_partition_sources, month_start
+
+
+class AuditLogRepository:
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def bulk_create(self, entries: List[Dict]) -> None:
+        """Insert ``entries`` into their monthly partitions, one executemany per partition, in one transaction."""
+        by_partition: Dict[str, Tuple[datetime, List[Dict]]] = {}
+        for entry in entries:
+            moment = month_start(entry["created_at"])
+            by_partition.setdefault(get_partition_name(moment), (moment, []))[1].append(entry)
+        if not by_partition:
+            return
+        connection = self.db_session.connection()
+        for moment, partition_entries in by_partition.values():
+            self.db_session.execute(insert(ensure_partition(connection, moment)), partition_entries)
+        self.db_session.commit()
+
+    @read_only
+    def get_entries(self, user_id: Optional[int] = None, org_id: Optional[int] = None,
+                    since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 50,
+                    cursor: Optional[str] = None) -> Tuple[List[RowMapping], Optional[str]]:
+        """Entries created in ``[since, until)``, newest first, with the cursor of the next page.
+
+        Only the partitions overlapping the range are read, newest first, each through its
+        ``(user_id, created_at)``, ``(org_id, created_at)`` or ``created_at`` index; the page is filled from as many
+        of them as needed.
+        """
+        sources = get_partition_sources(self.db_session.connection(), since, until)
+        position = None
+        if cursor is not None:
+            payload = decode_cursor(cursor)
+            names = [source.name for source in sources]
+            if payload["k"] not in names or payload["o"] != "desc":
+                raise ValueError("Invalid pagination cursor.")
+            # The cursor names the partition the previous page ended in; everything newer was already returned
+            sources = sources[names.index(payload["k"]):]
+            position = (datetime.fromisoformat(payload["v"]), payload["id"])
+
+        entries: List[RowMapping] = []
+        last_source = None
+        for source in sources:
+            query = select(source)
+            if user_id is not None:
+                query = query.where(source.c.user_id == user_id)
+            if org_id is not None:
+                query = query.where(source.c.org_id == org_id)
+            if since is not None:
+                query = query.where(source.c.created_at >= since)
+            if until is not None:
+                query = query.where(source.c.created_at < until)
+            if position is not None and source is sources[0]:
+                query = query.where(tuple_(source.c.created_at, source.c.id) < position)
+            query = query.order_by(source.c.created_at.desc(), source.c.id.desc()).limit(limit - len(entries))
+            rows = self.db_session.execute(query).mappings().all()
+            if rows:
+                entries += rows
+                last_source = source
+            if len(entries) >= limit:
+                break
+
+        next_cursor = None
+        if len(entries) >= limit:
+            last = entries[-1]
+            next_cursor = encode_cursor(last_source.name, "desc", last["created_at"], last["id"])
+        return entries, next_cursor
+
+
+class AsyncAuditLogRepository(AsyncRepository):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session, AuditLogRepository(db_session.sync_session))
+
+    async def get_entries(self, user_id: Optional[int] = None, org_id: Optional[int] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 50,
+                          cursor: Optional[str] = None) -> Tuple[List[RowMapping], Optional[str]]:
+        return await self.run(self.repository.get_entries, user_id, org_id, since, until, limit, cursor)
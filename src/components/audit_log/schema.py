@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class AuditLogEntry(BaseModel):
+    id: int
+    user_id: Optional[int]
+    org_id: Optional[int] = None
+    action: str
+    created_at: datetime
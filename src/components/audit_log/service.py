@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.config import Settings
+
+from .partitions import apply_retention, rollover
+from .repository import AsyncAuditLogRepository, AuditLogRepository
+from .schema import AuditLogEntry
+from .writer import AuditLogWriter, make_entry
+
+# Process-wide writer; None while auditing is disabled
+_writer: Optional[AuditLogWriter] = None
+
+
+def get_audit_writer() -> Optional[AuditLogWriter]:
+    return _writer
+
+
+def start_audit_writer(settings: Settings, session_factory: Callable[[], Session]) -> Optional[AuditLogWriter]:
+    """Start the background writer when auditing is enabled."""
+    global _writer
+    if not settings.audit_enabled:
+        return None
+    _writer = AuditLogWriter(
+        session_factory,
+        queue_size=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval=settings.audit_flush_interval,
+        overflow_policy=settings.audit_overflow_policy,
+        enqueue_timeout=settings.audit_enqueue_timeout,
+        spill_path=settings.audit_spill_path,
+    )
+    _writer.start()
+    return _writer
+
+
+def stop_audit_writer(timeout: Optional[float] = None) -> None:
+    """Flush the queued entries and stop the writer."""
+    global _writer
+    if _writer is not None:
+        _writer.drain(timeout)
+        _writer = None
+
+
+def record_audit(user_id: Optional[int], action: str, org_id: Optional[int] = None) -> None:
+    """Queue an audit entry for ``action`` by ``user_id`` in ``org_id``; a no-op while auditing is disabled."""
+    writer = _writer
+    if writer is not None:
+        writer.record(make_entry(user_id, action, org_id))
+
+
+async def record_audit_async(user_id: Optional[int], action: str, org_id: Optional[int] = None) -> None:
+    writer = _writer
+    if writer is None:
+        return
+    entry = make_entry(user_id, action, org_id)
+    if not writer.offer(entry):
+        # The overflow policy may block, which must not happen on the event loop
+        await run_in_threadpool(writer.record, entry)
+
+
+def run_audit_maintenance(settings: Settings, engine: Engine) -> List[str]:
+    """Create the upcoming monthly partitions and expire the ones past retention; returns the expired names."""
+    with engine.begin() as connection:
+        rollover(connection)
+        return apply_retention(connection, settings.audit_retention_months, archive_dir=settings.audit_archive_dir)
+
+
+class AuditLogService:
+    def __init__(self, audit_log_repository: AuditLogRepository):
+        self.audit_log_repository = audit_log_repository
+
+    def get_entries(self, user_id: Optional[int] = None, org_id: Optional[int] = None,
+                    since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 50,
+                    cursor: Optional[str] = None) -> Tuple[List[AuditLogEntry], Optional[str]]:
+        """Fetch a page of audit entries, newest first, together with the cursor of the next page."""
+        entries, next_cursor = self.audit_log_repository.get_entries(user_id, org_id, since, until, limit, cursor)
+        return [AuditLogEntry(**entry) for entry in entries], next_cursor
+
+
+class AsyncAuditLogService:
+    def __init__(self, audit_log_repository: AsyncAuditLogRepository):
+        self.audit_log_repository = audit_log_repository
+
+    async def get_entries(self, user_id: Optional[int] = None, org_id: Optional[int] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 50,
+                          cursor: Optional[str] = None) -> Tuple[List[AuditLogEntry], Optional[str]]:
+        """Fetch a page of audit entries, newest first, together with the cursor of the next page."""
+        entries, next_cursor = await self.audit_log_repository.get_entries(user_id, org_id, since, until, limit, cursor)
+        return [AuditLogEntry(**entry) for entry in entries], next_cursor
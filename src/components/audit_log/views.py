@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.authorization import get_caller_org_id, require_permission, require_permission_async
+from src.core.db import get_async_db, get_db
+
+from .repository import AsyncAuditLogRepository, AuditLogRepository
+from .schema import AuditLogEntry
+from .service import AsyncAuditLogService, AuditLogService
+
+router = APIRouter()
+
+# Same routes served from an AsyncSession, mounted instead of ``router`` when async database mode is on
+async_router = APIRouter()
+
+
+# Dependency to get AuditLogService
+def get_audit_log_service(_: Request, db: Session = Depends(get_db)):
+    return AuditLogService(AuditLogRepository(db))
+
+
+# Dependency to get AsyncAuditLogService
+def get_async_audit_log_service(_: Request, db: AsyncSession = Depends(get_async_db)):
+    return AsyncAuditLogService(AsyncAuditLogRepository(db))
+
+
+ORG_ID_DESCRIPTION = "Only entries of this organization; callers other than super admins get the X-Org-Id one"
+
+
+def _get_org_filter(request: Request, org_id: Optional[int]) -> Optional[int]:
+    # Only super admins read the entries of every organization
+    caller_org_id = get_caller_org_id(request)
+    return org_id if caller_org_id is None else caller_org_id
+
+
+@router.get("/", response_model=List[AuditLogEntry], status_code=200,
+            dependencies=[Depends(require_permission("audit_log", "read"))])
+def get_audit_log(
+        request: Request,
+        response: Response,
+        user_id: Optional[int] = Query(None, description="Only entries of this user"),
+        org_id: Optional[int] = Query(None, description=ORG_ID_DESCRIPTION),
+        since: Optional[datetime] = Query(None, description="Only entries created at or after this time (UTC)"),
+        until: Optional[datetime] = Query(None, description="Only entries created before this time (UTC)"),
+        limit: int = Query(50, ge=1, le=500, description="Number of entries per page"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+        audit_log_service: AuditLogService = Depends(get_audit_log_service)
+):
+    org_id = _get_org_filter(request, org_id)
+    try:
+        entries, next_cursor = audit_log_service.get_entries(user_id, org_id, since, until, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
+
+
+@async_router.get("/", response_model=List[AuditLogEntry], status_code=200,
+                  dependencies=[Depends(require_permission_async("audit_log", "read"))])
+async def get_audit_log_async(
+        request: Request,
+        response: Response,
+        user_id: Optional[int] = Query(None, description="Only entries of this user"),
+        org_id: Optional[int] = Query(None, description=ORG_ID_DESCRIPTION),
+        since: Optional[datetime] = Query(None, description="Only entries created at or after this time (UTC)"),
+        until: Optional[datetime] = Query(None, description="Only entries created before this time (UTC)"),
+        limit: int = Query(50, ge=1, le=500, description="Number of entries per page"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+        audit_log_service: AsyncAuditLogService = Depends(get_async_audit_log_service)
+):
+    org_id = _get_org_filter(request, org_id)
+    try:
+        entries, next_cursor = await audit_log_service.get_entries(user_id, org_id, since, until, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
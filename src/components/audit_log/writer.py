@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .repository import AuditLogRepository
+
+logger = logging.getLogger("uvicorn")
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+
+def make_entry(user_id: Optional[int], action: str, org_id: Optional[int] = None) -> Dict[str, Any]:
+    # Timestamped when the action happens, not when the batch reaches the database
+    return {"user_id": user_id, "org_id": org_id, "action": action,
+            "created_at": datetime.now(timezone.utc).replace(tzinfo=None)}
+
+
+class AuditLogWriter:
+    """Bounded in-process queue of audit entries drained by a background thread in batches.
+
+    A batch is written once ``batch_size`` entries are waiting or ``flush_interval`` seconds after its first entry,
+    whichever comes first. When the queue is full the overflow policy applies: ``block`` applies backpressure for
+    up to ``enqueue_timeout`` and then drops, ``drop`` drops straight away and ``spill`` appends the entry to an
+    NDJSON file that is replayed once the queue has room again. Batches the database rejects are spilled as well
+    under the ``spill`` policy and dropped otherwise.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], queue_size: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, overflow_policy: str = "block", enqueue_timeout: float = 0.5,
+                 spill_path: Optional[str] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy '{overflow_policy}'.")
+        if overflow_policy == "spill" and not spill_path:
+            raise ValueError("The spill overflow policy needs a spill path.")
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_path = spill_path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed_batches = 0
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def offer(self, entry: Dict[str, Any]) -> bool:
+        """Queue ``entry`` without waiting; False when the queue is full."""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            return False
+        self._count(enqueued=1)
+        return True
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Queue ``entry``, applying the overflow policy when the queue is full."""
+        if self.offer(entry):
+            return
+        if self.overflow_policy == "spill":
+            self._spill([entry])
+            return
+        if self.overflow_policy == "block":
+            try:
+                self._queue.put(entry, timeout=self.enqueue_timeout)
+                self._count(enqueued=1)
+                return
+            except queue.Full:
+                pass
+        self._count(dropped=1)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop waiting for new entries and flush what is queued; True when everything was written."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Audit log writer did not drain within {timeout}s; "
+                               f"{self._queue.qsize()} entries left in the queue")
+                return False
+            self._thread = None
+        return self._queue.empty()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "failed_batches": self.failed_batches,
+                "overflow_policy": self.overflow_policy,
+            }
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for name, increment in increments.items():
+                setattr(self, name, getattr(self, name) + increment)
+
+    def _run(self) -> None:
+        self._replay_spill()
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+            if self.overflow_policy == "spill" and self._queue.qsize() < self._queue.maxsize // 2:
+                self._replay_spill()
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            if self._stopping.is_set():
+                batch.append(self._queue.get_nowait())
+            else:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if self._stopping.is_set() or remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            with self.session_factory() as session:
+                AuditLogRepository(session).bulk_create(batch)
+        except Exception as e:  # noqa
+            logger.error(f"Failed to write {len(batch)} audit log entries: {e}")
+            self._count(failed_batches=1)
+            if self.overflow_policy == "spill":
+                self._spill(batch)
+            else:
+                self._count(dropped=len(batch))
+            return False
+        self._count(written=len(batch))
+        return True
+
+    def _spill(self, entries: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps({**entry, "created_at": entry["created_at"].isoformat()}) + "\n"
+                        for entry in entries)
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                spill_file.write(lines)
+        self._count(spilled=len(entries))
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path:
+            return
+        replay_path = f"{self.spill_path}.replay"
+        with self._spill_lock:
+            # A replay file left behind by a crash is retried before anything spilled since
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+        with open(replay_path, encoding="utf-8") as replay_file:
+            entries = [json.loads(line) for line in replay_file if line.strip()]
+        for entry in entries:
+            entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+            # Spilled before entries carried an organization
+            entry.setdefault("org_id", None)
+        for start in range(0, len(entries), self.batch_size):
+            if not self._write(entries[start:start + self.batch_size]):
+                # The failed batch went back to the spill file; keep the rest for the next attempt too
+                self._spill(entries[start + self.batch_size:])
+                break
+        os.remove(replay_path)
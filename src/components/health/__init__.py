@@ -1,10 +1,21 @@
 from fastapi import APIRouter, Depends
 
+from src.components.audit_log.service import get_audit_writer
 from src.config import Settings, get_settings
+from src.core import db
+from src.core.pool import get_pool_status
 
 router = APIRouter()
 
 
 @router.get("/health")
 async def health(settings: Settings = Depends(get_settings)):
-    return {"status": "active", "environment": settings.environment, "testing": settings.testing}
+    database_pool = {"sync": get_pool_status(db.engine)}
+    if db.async_engine is not None:
+        database_pool["async"] = get_pool_status(db.async_engine.sync_engine)
+    status = {"status": "active", "environment": settings.environment, "testing": settings.testing,
+              "database_pool": database_pool}
+    audit_writer = get_audit_writer()
+    if audit_writer is not None:
+        status["audit_log"] = audit_writer.stats()
+    return status
@@ -0,0 +1,38 @@
+from typing import Iterable, Optional
+
+from src.config import get_settings
+from src.utils.cache import TTLCache
+from src.utils.shared_cache import bump_versions, get_versions
+
+_settings = get_settings()
+
+# (user_id, org_id) -> (version, global user type, org user type) as enum values; the types are None when the user
+# or membership is missing and version is the user's membership version when the entry was cached
+membership_cache = TTLCache(max_size=_settings.membership_cache_max_size, ttl=_settings.membership_cache_ttl)
+
+
+def _user_namespace(user_id: int) -> str:
+    return f"membership:user:{user_id}"
+
+
+def get_membership_version(user_id: int) -> Optional[int]:
+    """Version cached memberships of the user must carry to be trusted; None when it cannot be read."""
+    versions = get_versions([_user_namespace(user_id)])
+    return versions[0] if versions is not None else None
+
+
+def invalidate_membership(user_id: int, org_id: Optional[int] = None) -> None:
+    """Forget cached memberships of a user, in one organization or in all of them, in every worker."""
+    if org_id is None:
+        membership_cache.delete_where(lambda key: key[0] == user_id)
+    else:
+        membership_cache.delete((user_id, org_id))
+    bump_versions([_user_namespace(user_id)])
+
+
+def invalidate_memberships(user_ids: Iterable[int]) -> None:
+    """Forget cached memberships of many users in one pass over the cache."""
+    user_ids = set(user_ids)
+    if user_ids:
+        membership_cache.delete_where(lambda key: key[0] in user_ids)
+        bump_versions(_user_namespace(user_id) for user_id in user_ids)
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.core.db import get_async_db, get_db
+
+from .cache import get_membership_version, membership_cache
+from .models import UserOrganization
+
+
+@dataclass(frozen=True)
+class MembershipContext:
+    """Who is acting and in which organization, resolved once per request and shared by the repositories."""
+
+    user_id: Optional[int] = None
+    org_id: Optional[int] = None
+    user_type: Optional[str] = None
+    org_user_type: Optional[str] = None
+
+    @property
+    def is_super_admin(self) -> bool:
+        return self.user_type == UserTypeEnum.SUPER_ADMIN.value
+
+
+def resolve_membership(db_session: Session, user_id: Optional[int], org_id: Optional[int]) -> MembershipContext:
+    if user_id is None:
+        return MembershipContext(org_id=org_id)
+    version = get_membership_version(user_id)
+    cached = membership_cache.get((user_id, org_id)) if version is not None else None
+    if cached is None or cached[0] != version:
+        row = db_session.query(User.user_type, UserOrganization.user_type).outerjoin(
+            UserOrganization,
+            (UserOrganization.user_id == User.id) & (UserOrganization.organization_id == org_id)
+        ).filter(User.id == user_id).first()
+        user_type, org_user_type = row if row else (None, None)
+        cached = (version, user_type.value if user_type else None, org_user_type.value if org_user_type else None)
+        if version is not None:
+            membership_cache.set((user_id, org_id), cached)
+    return MembershipContext(user_id=user_id, org_id=org_id, user_type=cached[1], org_user_type=cached[2])
+
+
+def _get_stored_membership(request: Request, user_id: Optional[int],
+                           org_id: Optional[int]) -> Optional[MembershipContext]:
+    membership = getattr(request.state, "membership", None)
+    if membership is not None and (membership.user_id, membership.org_id) == (user_id, org_id):
+        return membership
+    return None
+
+
+def get_request_membership(request: Request, db_session: Session, user_id: Optional[int],
+                           org_id: Optional[int]) -> MembershipContext:
+    """Resolve the caller's membership, reusing the one already stored on ``request.state`` by this request."""
+    membership = _get_stored_membership(request, user_id, org_id)
+    if membership is None:
+        membership = resolve_membership(db_session, user_id, org_id)
+        request.state.membership = membership
+    return membership
+
+
+async def get_async_request_membership(request: Request, db_session: AsyncSession, user_id: Optional[int],
+                                       org_id: Optional[int]) -> MembershipContext:
+    membership = _get_stored_membership(request, user_id, org_id)
+    if membership is None:
+        membership = await db_session.run_sync(lambda session: resolve_membership(session, user_id, org_id))
+        request.state.membership = membership
+    return membership
+
+
+# Dependency resolving the caller's membership in the organization of the path, at most once per request
+def get_membership_context(request: Request, org_id: int, x_user_id: Optional[int] = Header(None),
+                           db: Session = Depends(get_db)) -> MembershipContext:
+    return get_request_membership(request, db, x_user_id, org_id)
+
+
+async def get_async_membership_context(request: Request, org_id: int, x_user_id: Optional[int] = Header(None),
+                                       db: AsyncSession = Depends(get_async_db)) -> MembershipContext:
+    return await get_async_request_membership(request, db, x_user_id, org_id)
@@ -1,10 +1,11 @@
 import enum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from src.core.db import Base
+from src.core.search import register_search_index
 
 
 class OrgUserTypeEnum(enum.Enum):
@@ -28,6 +29,14 @@ class Organization(Base):
 
     users = relationship("UserOrganization", back_populates="organization")
 
+    __table_args__ = (
+        Index("ix_organization_created_by_id", "created_by_id"),
+        Index("ix_organization_updated_by_id", "updated_by_id"),
+    )
+
+
+register_search_index(Organization, "name")
+
 
 class UserOrganization(Base):
     __tablename__ = "user_organization"
@@ -38,3 +47,7 @@ class UserOrganization(Base):
 
     user = relationship("User", back_populates="organizations")
     organization = relationship("Organization", back_populates="users")
+
+    # The primary key serves lookups by user; members of an organization, optionally of one type, go through this
+    __table_args__ = (Index("ix_user_organization_organization_id_user_type", "organization_id", "user_type",
+                            "user_id"),)
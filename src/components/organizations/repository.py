@@ -1,10 +1,17 @@
 from typing import List, Optional, Type
 
-from models import Organization, UserOrganization
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.components.access_control.cache import bump_org_permission_versions, invalidate_user_permissions
 from src.components.users.models import User
+from src.core.db import AsyncRepository
+from src.core.routing import read_only
+from src.core.search import apply_search
+from src.utils.pagination import paginate
+
+from .cache import invalidate_membership
+from .models import Organization, OrgUserTypeEnum, UserOrganization
 
 
 class OrganizationRepository:
@@ -18,30 +25,70 @@ class OrganizationRepository:
         self.db_session.refresh(organization)
         return organization
 
+    @read_only
     def get_organization_by_id(self, org_id: int) -> Optional[Organization]:
         return self.db_session.get(Organization, org_id)
 
+    @read_only
     def get_all_organizations(self, is_super_admin: bool, user_id: Optional[int] = None,
-                              search_query: Optional[str] = None, limit: int = 10, offset: int = 0) -> List[
-        Type[Organization]]:
+                              search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                              sort_by: Optional[str] = None, sort_order: str = 'asc',
+                              cursor: Optional[str] = None) -> List[Type[Organization]]:
         query = self.db_session.query(Organization)
         if not is_super_admin and user_id:
             query = query.join(UserOrganization).filter(UserOrganization.user_id == user_id)
         elif not is_super_admin:
             raise Exception("Unauthorized action - User ID required for non-super admin.")
+        relevance = None
         if search_query:
-            query = query.filter(Organization.name.ilike(f"%{search_query}%"))
-        return query.order_by(Organization.id).offset(offset).limit(limit).all()
+            query, relevance = apply_search(query, Organization, search_query)
+        return paginate(query, Organization, sort_by, sort_order, limit, offset, cursor, relevance).all()
 
-    def assign_user_to_organization(self, user_id: int, organization_id: int) -> UserOrganization:
-        mapping = UserOrganization(user_id=user_id, organization_id=organization_id)
+    def assign_user_to_organization(self, user_id: int, organization_id: int,
+                                    user_type: OrgUserTypeEnum = OrgUserTypeEnum.ORG_STAFF) -> UserOrganization:
+        mapping = UserOrganization(user_id=user_id, organization_id=organization_id, user_type=user_type)
         self.db_session.add(mapping)
         self.db_session.commit()
+        invalidate_membership(user_id, organization_id)
+        invalidate_user_permissions([user_id])
+        # Who is OrgStaff decides what the RBAC reads of the organization return
+        bump_org_permission_versions([organization_id])
         return mapping
 
+    @read_only
     def get_users_in_organization(self, org_id: int, search_query: Optional[str] = None, limit: int = 10,
-                                  offset: int = 0) -> List[Type[User]]:
+                                  offset: int = 0, sort_by: Optional[str] = None, sort_order: str = 'asc',
+                                  cursor: Optional[str] = None) -> List[Type[User]]:
         query = self.db_session.query(User).join(UserOrganization).filter(UserOrganization.organization_id == org_id)
+        relevance = None
         if search_query:
-            query = query.filter(or_(User.name.ilike(f"%{search_query}%"), User.email.ilike(f"%{search_query}%")))
-        return query.order_by(User.id).offset(offset).limit(limit).all()
+            query, relevance = apply_search(query, User, search_query)
+        return paginate(query, User, sort_by, sort_order, limit, offset, cursor, relevance).all()
+
+
+class AsyncOrganizationRepository(AsyncRepository):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session, OrganizationRepository(db_session.sync_session))
+
+    async def create_organization(self, name: str, slug: str, created_by_id: int) -> Organization:
+        return await self.run(self.repository.create_organization, name, slug, created_by_id)
+
+    async def get_organization_by_id(self, org_id: int) -> Optional[Organization]:
+        return await self.run(self.repository.get_organization_by_id, org_id)
+
+    async def get_all_organizations(self, is_super_admin: bool, user_id: Optional[int] = None,
+                                    search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                                    sort_by: Optional[str] = None, sort_order: str = 'asc',
+                                    cursor: Optional[str] = None) -> List[Type[Organization]]:
+        return await self.run(self.repository.get_all_organizations, is_super_admin, user_id, search_query, limit,
+                              offset, sort_by, sort_order, cursor)
+
+    async def assign_user_to_organization(self, user_id: int, organization_id: int,
+                                          user_type: OrgUserTypeEnum = OrgUserTypeEnum.ORG_STAFF) -> UserOrganization:
+        return await self.run(self.repository.assign_user_to_organization, user_id, organization_id, user_type)
+
+    async def get_users_in_organization(self, org_id: int, search_query: Optional[str] = None, limit: int = 10,
+                                        offset: int = 0, sort_by: Optional[str] = None, sort_order: str = 'asc',
+                                        cursor: Optional[str] = None) -> List[Type[User]]:
+        return await self.run(self.repository.get_users_in_organization, org_id, search_query, limit, offset, sort_by,
+                              sort_order, cursor)
@@ -1,7 +1,4 @@
-from fastapi import APIRouter
+from src.core.routers import component_routers
 
-from .views import router as views_router
-
-router = APIRouter()
-
-router.include_router(views_router)
+# ``router`` and ``async_router`` are built from .views on first access
+__getattr__ = component_routers(__name__)
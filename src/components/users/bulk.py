@@ -0,0 +1,158 @@
+import csv
+import io
+import itertools
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .enums import UserTypeEnum
+from .schema import CreateUserRequest, UserDetail, UserImportError, UserImportResult
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+CSV_CONTENT_TYPES = ("text/csv",)
+
+EXPORT_FIELDS = list(UserDetail.model_fields)
+
+# (line number, validated row or None, error or None)
+ImportRow = Tuple[int, Optional[CreateUserRequest], Optional[str]]
+
+
+def get_import_format(content_type: Optional[str]) -> Optional[str]:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    return None
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines without buffering more than one partial line."""
+    buffer = b""
+    line_number = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.decode("utf-8-sig" if line_number == 1 else "utf-8").rstrip("\r")
+    if buffer:
+        yield line_number + 1, buffer.decode("utf-8-sig" if line_number == 0 else "utf-8").rstrip("\r")
+
+
+def _validate(line_number: int, data) -> ImportRow:
+    try:
+        return line_number, CreateUserRequest.model_validate(data), None
+    except ValidationError as e:
+        details = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+        return line_number, None, details
+
+
+class _IncompleteRecord(Exception):
+    """Raised into the CSV reader when the lines read so far end inside a quoted field."""
+
+
+def _incomplete_record():
+    raise _IncompleteRecord
+    yield
+
+
+def _parse_csv_record(lines: List[str]) -> Optional[List[str]]:
+    """Fields of the CSV record spanning ``lines``, or None when a quoted field carries on past the last one."""
+    try:
+        return next(csv.reader(itertools.chain(lines, _incomplete_record())))
+    except _IncompleteRecord:
+        return None
+
+
+async def read_import_rows(stream: AsyncIterator[bytes], import_format: str) -> AsyncIterator[ImportRow]:
+    """Parse and validate an NDJSON or CSV upload row by row. Blank lines are skipped.
+
+    A CSV record may span several lines within a quoted field; its errors are reported at its first line.
+    """
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    record_line_number = 0
+    async for line_number, line in iter_lines(stream):
+        if not record and not line.strip():
+            continue
+        if import_format == "ndjson":
+            try:
+                data = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Invalid JSON."
+                continue
+            yield _validate(line_number, data)
+            continue
+        if not record:
+            record_line_number = line_number
+        record.append(line + "\n")
+        values = _parse_csv_record(record)
+        if values is None:
+            continue
+        record = []
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_line_number, None, f"Expected {len(header)} columns, got {len(values)}."
+            continue
+        # Empty cells fall back to the schema defaults
+        yield _validate(record_line_number, {name: value for name, value in zip(header, values) if value != ""})
+    if record:
+        yield record_line_number, None, "Unterminated quoted field."
+
+
+async def restrict_user_types(rows: AsyncIterator[ImportRow], allowed: bool) -> AsyncIterator[ImportRow]:
+    """Reject the rows setting a user type other than the default unless ``allowed``, i.e. for super admins."""
+    async for line_number, user, error in rows:
+        if user is not None and not allowed and user.user_type != UserTypeEnum.ORG_USER:
+            yield line_number, None, "Only super admins can set the user type."
+        else:
+            yield line_number, user, error
+
+
+async def import_users(rows: AsyncIterator[ImportRow], chunk_size: int,
+                       import_chunk: Callable[[List[Tuple[int, CreateUserRequest]]], Awaitable[Dict[int, str]]]
+                       ) -> UserImportResult:
+    """Feed validated rows to ``import_chunk`` ``chunk_size`` at a time and collect the per-line outcome."""
+    result = UserImportResult()
+    chunk: List[Tuple[int, CreateUserRequest]] = []
+
+    async def flush():
+        errors = await import_chunk(chunk)
+        result.created += len(chunk) - len(errors)
+        result.errors.extend(UserImportError(line=line, error=error) for line, error in errors.items())
+        chunk.clear()
+
+    async for line_number, user, error in rows:
+        if error is not None:
+            result.errors.append(UserImportError(line=line_number, error=error))
+            continue
+        chunk.append((line_number, user))
+        if len(chunk) >= chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+    result.errors.sort(key=lambda error: error.line)
+    result.failed = len(result.errors)
+    return result
+
+
+def to_import_values(user: CreateUserRequest) -> Dict:
+    return {"name": user.name, "email": str(user.email), "auth0_id": user.auth0_id, "user_type": user.user_type}
+
+
+def format_ndjson(users: Iterable[UserDetail]) -> str:
+    return "".join(user.model_dump_json() + "\n" for user in users)
+
+
+def format_csv(users: Iterable[UserDetail], header: bool = False) -> str:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+    if header:
+        writer.writeheader()
+    for user in users:
+        writer.writerow(user.model_dump(mode="json"))
+    return output.getvalue()
@@ -0,0 +1,58 @@
+from typing import Iterable, Optional
+
+from src.config import get_settings
+from src.utils.cache import TTLCache
+from src.utils.etag import make_etag
+from src.utils.shared_cache import bump_versions, get_shared_cache, get_versions
+
+_settings = get_settings()
+
+# user_id -> (version, ETag) of the user as last served; version is the user's version when the entry was cached
+user_etag_cache = TTLCache(max_size=_settings.user_etag_cache_max_size, ttl=_settings.user_etag_cache_ttl)
+
+# Bumped whenever any user changes, for responses listing users of many organizations, e.g. permission holders
+USERS_NAMESPACE = "users"
+
+
+def _user_namespace(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def user_etag(user) -> str:
+    """ETag of a ``User`` row or schema.
+
+    Derived from ``updated_at``, falling back to ``created_at`` for users never updated. The other columns are
+    hashed in too: SQLite stores ``updated_at`` to the second, so two updates within one second would share it.
+    """
+    return make_etag("user", user.id, user.updated_at or user.created_at, user.name, user.email, user.auth0_id,
+                     user.user_type, user.is_active)
+
+
+def get_user_version(user_id: int) -> Optional[int]:
+    """Version the cached ETag of the user must carry to be trusted; None when it cannot be read.
+
+    Also None without a shared cache, where the other workers' updates would not move it: the ETag is then derived
+    from the row on every request.
+    """
+    if get_shared_cache() is None:
+        return None
+    versions = get_versions([_user_namespace(user_id)])
+    return versions[0] if versions is not None else None
+
+
+def get_cached_user_etag(user_id: int, version: Optional[int]) -> Optional[str]:
+    entry = user_etag_cache.get(user_id) if version is not None else None
+    return entry[1] if entry is not None and entry[0] == version else None
+
+
+def set_cached_user_etag(user_id: int, version: Optional[int], etag: str) -> None:
+    if version is not None:
+        user_etag_cache.set(user_id, (version, etag))
+
+
+def invalidate_user_etags(user_ids: Iterable[int]) -> None:
+    """Forget the ETags of the given users in every worker."""
+    user_ids = set(user_ids)
+    if user_ids:
+        user_etag_cache.delete_many(user_ids)
+        bump_versions([USERS_NAMESPACE, *(_user_namespace(user_id) for user_id in user_ids)])
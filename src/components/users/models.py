@@ -5,6 +5,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from src.core.db import Base
+from src.core.search import register_search_index
 from .enums import UserTypeEnum
 
 
@@ -25,3 +26,6 @@ class User(Base):
     groups = relationship("UserGroup", back_populates="user")
     roles = relationship("UserRole", back_populates="user")
     permissions = relationship("UserPermission", back_populates="user")
+
+
+register_search_index(User, "name", "email")
@@ -1,36 +1,153 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from src.components.access_control.models import Group, Permission, Role, UserGroup, UserPermission, UserRole
+from src.components.organizations.cache import invalidate_membership, invalidate_memberships
+from src.components.organizations.models import UserOrganization
+from src.core.db import AsyncRepository
+from src.core.routing import read_only
+from src.core.search import apply_search
+from src.utils.pagination import paginate
+
+from .cache import invalidate_user_etags
 from .models import User
 
+# Relationships ``expand`` can load with the users: one SELECT ... IN per collection for the whole page, with the
+# rows each association points to joined into it
+EXPANSIONS = {
+    "organizations": (User.organizations, (UserOrganization.organization,)),
+    "roles": (User.roles, (UserRole.role,)),
+    "groups": (User.groups, (UserGroup.group,)),
+    "permissions": (User.permissions, (UserPermission.permission, Permission.module)),
+}
+
+
+def _organization_criteria(org_id: int) -> Dict[str, Any]:
+    # Direct grants belong to no organization and apply in every one, so they are not limited
+    return {
+        "organizations": UserOrganization.organization_id == org_id,
+        "roles": UserRole.role_id.in_(select(Role.id).where(Role.organization_id == org_id)),
+        "groups": UserGroup.group_id.in_(select(Group.id).where(Group.organization_id == org_id)),
+    }
+
+
+def get_expansion_options(expand: Iterable[str], org_id: Optional[int] = None) -> List:
+    """Loader options for ``expand``; memberships, roles and groups of other organizations than ``org_id`` are left
+    out unless it is None."""
+    unknown = set(expand) - set(EXPANSIONS)
+    if unknown:
+        raise ValueError(f"Cannot expand {', '.join(sorted(unknown))}; choose from {', '.join(EXPANSIONS)}.")
+    criteria = {} if org_id is None else _organization_criteria(org_id)
+    options = []
+    for name in expand:
+        relationship, targets = EXPANSIONS[name]
+        if name in criteria:
+            relationship = relationship.and_(criteria[name])
+        option = selectinload(relationship)
+        for target in targets:
+            option = option.joinedload(target)
+        options.append(option)
+    return options
+
+
+def _in_organization(query, org_id: Optional[int]):
+    """Limit a query of users to the members of ``org_id``, unless it is None."""
+    if org_id is None:
+        return query
+    return query.where(User.id.in_(select(UserOrganization.user_id).where(UserOrganization.organization_id == org_id)))
+
 
 class UserRepository:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, org_id: Optional[int] = None):
         self.db_session = db_session
+        # Organization whose members are the only users reached, as for callers let in on one of its grants;
+        # None reaches every user
+        self.org_id = org_id
 
     def create_user(self, name: str, email: str, auth0_id: str, user_type: str, is_active: bool = True) -> User:
         user_obj = User(name=name, email=email, auth0_id=auth0_id, user_type=user_type, is_active=is_active)
         self.db_session.add(user_obj)
         self.db_session.commit()
         self.db_session.refresh(user_obj)
+        invalidate_membership(user_obj.id)
         return user_obj
 
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
-        return self.db_session.get(User, user_id)
+    def get_user_by_id(self, user_id: int, expand: Iterable[str] = ()) -> Optional[User]:
+        options = get_expansion_options(expand, self.org_id)
+        if not options and self.org_id is None:
+            return self.db_session.get(User, user_id)
+        query = _in_organization(select(User).where(User.id == user_id), self.org_id)
+        return self.db_session.execute(query.options(*options)).scalar()
 
+    @read_only
     def get_all_users(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
-                      sort_by: Optional[str] = None, sort_order: str = 'asc') -> List[User]:
-        query = self.db_session.query(User)
+                      sort_by: Optional[str] = None, sort_order: str = 'asc',
+                      cursor: Optional[str] = None, expand: Iterable[str] = ()) -> List[User]:
+        query, relevance = _in_organization(self.db_session.query(User), self.org_id), None
+        query = query.options(*get_expansion_options(expand, self.org_id))
         if search_query:
-            query = query.filter(or_(User.name.ilike(f"%{search_query}%"), User.email.ilike(f"%{search_query}%")))
-        if sort_by:
-            query = query.order_by(
-                getattr(User, sort_by).desc() if sort_order == 'desc' else getattr(User, sort_by).asc())
-        else:
-            query = query.order_by(User.id)
-        return query.offset(offset).limit(limit).all()  # noqa
+            query, relevance = apply_search(query, User, search_query)
+        return paginate(query, User, sort_by, sort_order, limit, offset, cursor, relevance).all()  # noqa
+
+    def bulk_create_users(self, rows: List[Dict]) -> Tuple[List[int], Dict[int, str]]:
+        """Insert ``rows`` in a single transaction.
+
+        Returns the ids of the created users and an error for every row that was skipped, keyed by its position in
+        ``rows``. Rows clashing with an existing user or with an earlier row are rejected up front; if the batch
+        still hits a constraint it is retried row by row so one bad row does not sink the rest.
+        """
+        emails = [row["email"] for row in rows]
+        auth0_ids = [row["auth0_id"] for row in rows]
+        existing = self.db_session.query(User.email, User.auth0_id).filter(
+            or_(User.email.in_(emails), User.auth0_id.in_(auth0_ids))).all()
+        taken_emails = {email for email, _ in existing}
+        taken_auth0_ids = {auth0_id for _, auth0_id in existing}
+
+        errors: Dict[int, str] = {}
+        pending: List[Tuple[int, Dict]] = []
+        for position, row in enumerate(rows):
+            if row["email"] in taken_emails:
+                errors[position] = "A user with this email already exists."
+            elif row["auth0_id"] in taken_auth0_ids:
+                errors[position] = "A user with this auth0_id already exists."
+            else:
+                taken_emails.add(row["email"])
+                taken_auth0_ids.add(row["auth0_id"])
+                pending.append((position, row))
+
+        user_ids: List[int] = []
+        try:
+            user_ids = self._insert_users([row for _, row in pending])
+        except IntegrityError:
+            self.db_session.rollback()
+            for position, row in pending:
+                try:
+                    user_ids += self._insert_users([row])
+                except IntegrityError as e:
+                    self.db_session.rollback()
+                    errors[position] = f"Rejected by the database: {e.orig}"
+        invalidate_memberships(user_ids)
+        return user_ids, errors
+
+    def _insert_users(self, rows: List[Dict]) -> List[int]:
+        if not rows:
+            return []
+        user_ids = list(self.db_session.execute(insert(User).returning(User.id), rows).scalars())
+        self.db_session.commit()
+        return user_ids
+
+    def iter_users(self, batch_size: int = 1000) -> Iterator[User]:
+        """Walk every user in id order through a server-side cursor, ``batch_size`` rows at a time."""
+        try:
+            query = _in_organization(select(User), self.org_id).order_by(User.id)
+            yield from self.db_session.execute(query.execution_options(yield_per=batch_size)).scalars()
+        finally:
+            # Release the connection held by the read transaction once the export ends or is abandoned
+            self.db_session.commit()
 
     def update_user(self, user_id: int, **kwargs) -> Optional[User]:
         user = self.get_user_by_id(user_id)
@@ -39,6 +156,8 @@ class UserRepository:
                 setattr(user, key, value)
             self.db_session.commit()
             self.db_session.refresh(user)
+            invalidate_membership(user_id)
+            invalidate_user_etags([user_id])
         return user
 
     def delete_user(self, user_id: int) -> bool:
@@ -49,3 +168,43 @@ class UserRepository:
 
             return True
         return False
+
+
+class AsyncUserRepository(AsyncRepository):
+    def __init__(self, db_session: AsyncSession, org_id: Optional[int] = None):
+        super().__init__(db_session, UserRepository(db_session.sync_session, org_id))
+
+    @property
+    def org_id(self) -> Optional[int]:
+        return self.repository.org_id
+
+    async def create_user(self, name: str, email: str, auth0_id: str, user_type: str, is_active: bool = True) -> User:
+        return await self.run(self.repository.create_user, name, email, auth0_id, user_type, is_active)
+
+    async def get_user_by_id(self, user_id: int, expand: Iterable[str] = ()) -> Optional[User]:
+        return await self.run(self.repository.get_user_by_id, user_id, expand)
+
+    async def get_all_users(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                            sort_by: Optional[str] = None, sort_order: str = 'asc',
+                            cursor: Optional[str] = None, expand: Iterable[str] = ()) -> List[User]:
+        return await self.run(self.repository.get_all_users, search_query, limit, offset, sort_by, sort_order, cursor,
+                              expand)
+
+    async def bulk_create_users(self, rows: List[Dict]) -> Tuple[List[int], Dict[int, str]]:
+        return await self.run(self.repository.bulk_create_users, rows)
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        # Streams directly on the AsyncSession: a server-side cursor cannot be handed across run_sync calls
+        try:
+            result = await self.db_session.stream(_in_organization(select(User), self.org_id).order_by(
+                User.id).execution_options(yield_per=batch_size))
+            async for user in result.scalars():
+                yield user
+        finally:
+            await self.db_session.commit()
+
+    async def update_user(self, user_id: int, **kwargs) -> Optional[User]:
+        return await self.run(self.repository.update_user, user_id, **kwargs)
+
+    async def delete_user(self, user_id: int) -> bool:
+        return await self.run(self.repository.delete_user, user_id)
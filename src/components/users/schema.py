@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional, List
 from datetime import datetime
 
@@ -6,6 +6,9 @@ from .enums import UserTypeEnum
 
 
 class UserShort(BaseModel):
+    # Built straight from ``User`` rows with ``model_validate``
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     auth0_id: str
     name: str
@@ -23,6 +26,48 @@ class UserDetail(UserShort):
     updated_at: Optional[datetime]
 
 
+class UserOrganizationRef(BaseModel):
+    id: int
+    name: str
+    user_type: str
+
+
+class UserRoleRef(BaseModel):
+    id: int
+    name: str
+    organization_id: int
+
+
+class UserGroupRef(BaseModel):
+    id: int
+    name: str
+    organization_id: int
+
+
+class UserPermissionRef(BaseModel):
+    id: int
+    module: str
+    action: str
+
+
+class UserExpansions(BaseModel):
+    """Relationships requested with ``expand``; the ones that were not requested are left out of the response."""
+
+    organizations: Optional[List[UserOrganizationRef]] = None
+    roles: Optional[List[UserRoleRef]] = None
+    groups: Optional[List[UserGroupRef]] = None
+    # Direct grants only, not the ones inherited through roles or groups
+    permissions: Optional[List[UserPermissionRef]] = None
+
+
+class ExpandedUserShort(UserShort, UserExpansions):
+    pass
+
+
+class ExpandedUserDetail(UserDetail, UserExpansions):
+    pass
+
+
 class CreateUserRequest(BaseModel):
     name: str
     email: EmailStr
@@ -35,3 +80,14 @@ class UpdateUserRequest(BaseModel):
     email: Optional[EmailStr] = None
     user_type: Optional[UserTypeEnum] = None
     is_active: Optional[bool] = None
+
+
+class UserImportError(BaseModel):
+    line: int
+    error: str
+
+
+class UserImportResult(BaseModel):
+    created: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
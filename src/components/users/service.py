@@ -1,17 +1,63 @@
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, List, Tuple
 
 from pydantic import EmailStr
 
-from .repository import UserRepository
+from src.components.audit_log.service import record_audit, record_audit_async
+from src.utils.pagination import get_next_cursor
+
+from .bulk import format_csv, format_ndjson, to_import_values
+from .models import User
+from .repository import AsyncUserRepository, UserRepository
 from .schema import (
-    UserShort, UserDetail,
+    UserShort, UserDetail, ExpandedUserShort, ExpandedUserDetail,
+    UserOrganizationRef, UserRoleRef, UserGroupRef, UserPermissionRef,
     CreateUserRequest, UpdateUserRequest
 )
 
 
+def _format_export(users: List[UserDetail], export_format: str) -> str:
+    return format_csv(users) if export_format == "csv" else format_ndjson(users)
+
+
+def _get_expansions(user: User, expand: Iterable[str]) -> Dict[str, list]:
+    """Refs of the relationships in ``expand``, which the repository already eager-loaded."""
+    builders = {
+        "organizations": lambda: [UserOrganizationRef(id=membership.organization_id,
+                                                      name=membership.organization.name,
+                                                      user_type=membership.user_type.value)
+                                  for membership in user.organizations],
+        "roles": lambda: [UserRoleRef(id=user_role.role.id, name=user_role.role.name,
+                                      organization_id=user_role.role.organization_id) for user_role in user.roles],
+        "groups": lambda: [UserGroupRef(id=user_group.group.id, name=user_group.group.name,
+                                        organization_id=user_group.group.organization_id)
+                           for user_group in user.groups],
+        "permissions": lambda: [UserPermissionRef(id=grant.permission.id, module=grant.permission.module.name,
+                                                  action=grant.permission.action) for grant in user.permissions],
+    }
+    return {name: builders[name]() for name in expand}
+
+
+def _to_user_detail(user: User, expand: Iterable[str] = ()) -> UserDetail:
+    detail = UserDetail.model_validate(user)
+    if not expand:
+        return detail
+    # The base fields were just validated, so only the expansions (validated as they were built) are added;
+    # the expansions that were not requested stay unset and are left out of the response
+    return ExpandedUserDetail.model_construct(**dict(detail), **_get_expansions(user, expand))
+
+
+def _to_user_short(user: User, expand: Iterable[str] = ()) -> UserShort:
+    short = UserShort.model_validate(user)
+    if not expand:
+        return short
+    return ExpandedUserShort.model_construct(**dict(short), **_get_expansions(user, expand))
+
+
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, actor_id: Optional[int] = None):
         self.user_repository = user_repository
+        # User performing the requests, recorded in the audit log
+        self.actor_id = actor_id
 
     def get_user(self, user_id: int):
         return self.user_repository.get_user_by_id(user_id)
@@ -23,65 +69,146 @@ class UserService:
             user.auth0_id,
             user.user_type.name,
         )
-        return UserDetail(
-            id=user_obj.id,
-            name=user_obj.name,
-            email=user_obj.email,
-            auth0_id=user_obj.auth0_id,
-            is_active=user_obj.is_active,
-            user_type=user_obj.user_type,
-            created_at=user_obj.created_at,
-            updated_at=user_obj.updated_at
-        )
+        record_audit(self.actor_id, f"user.create:{user_obj.id}", org_id=self.user_repository.org_id)
+        return _to_user_detail(user_obj)
 
-    def get_user_by_id(self, user_id: int) -> Optional[UserDetail]:
-        """Fetch a user by ID."""
-        user = self.user_repository.get_user_by_id(user_id)
+    def get_user_by_id(self, user_id: int, expand: Iterable[str] = ()) -> Optional[UserDetail]:
+        """Fetch a user by ID, with the relationships named in ``expand``."""
+        user = self.user_repository.get_user_by_id(user_id, expand)
         if user:
-            return UserDetail(
-                id=user.id,
-                name=user.name,
-                email=user.email,
-                auth0_id=user.auth0_id,
-                user_type=user.user_type,
-                is_active=user.is_active,
-                created_at=user.created_at,
-                updated_at=user.updated_at
-            )
+            return _to_user_detail(user, expand)
         return None
 
     def get_all_users(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
                       sort_by: Optional[str] = None, sort_order: str = 'asc') -> List[UserShort]:
         """Fetch a list of users with pagination and sorting."""
+        users, _ = self.get_users_page(search_query, limit, offset, sort_by, sort_order)
+        return users
+
+    def get_users_page(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                       sort_by: Optional[str] = None, sort_order: str = 'asc',
+                       cursor: Optional[str] = None,
+                       expand: Iterable[str] = ()) -> Tuple[List[UserShort], Optional[str]]:
+        """Fetch a page of users together with the cursor of the next page."""
         users = self.user_repository.get_all_users(
-            search_query=search_query, limit=limit, offset=offset, sort_by=sort_by, sort_order=sort_order
+            search_query=search_query, limit=limit, offset=offset, sort_by=sort_by, sort_order=sort_order,
+            cursor=cursor, expand=expand
         )
-        return [
-            UserShort(
-                id=user.id,
-                auth0_id=user.auth0_id,
-                name=user.name,
-                email=user.email,  # noqa
-                is_active=user.is_active
-            ) for user in users
-        ]
+        # Without an explicit sort, search results are ranked by relevance, which a cursor cannot seek on
+        ranked = bool(search_query) and sort_by is None
+        return ([_to_user_short(user, expand) for user in users],
+                get_next_cursor(users, User, sort_by, sort_order, limit, ranked))
+
+    def import_users_chunk(self, rows: List[Tuple[int, CreateUserRequest]]) -> Dict[int, str]:
+        """Insert one chunk of validated rows; returns the rejected ones keyed by line number."""
+        user_ids, errors = self.user_repository.bulk_create_users([to_import_values(user) for _, user in rows])
+        for user_id in user_ids:
+            record_audit(self.actor_id, f"user.import:{user_id}", org_id=self.user_repository.org_id)
+        return {rows[position][0]: error for position, error in errors.items()}
+
+    def export_users(self, export_format: str = "ndjson", batch_size: int = 1000) -> Iterator[str]:
+        """Stream every user as NDJSON or CSV, one chunk of text per ``batch_size`` users."""
+        if export_format == "csv":
+            yield format_csv([], header=True)
+        batch = []
+        for user in self.user_repository.iter_users(batch_size):
+            batch.append(_to_user_detail(user))
+            if len(batch) >= batch_size:
+                yield _format_export(batch, export_format)
+                batch = []
+        if batch:
+            yield _format_export(batch, export_format)
 
     def update_user(self, user_id: int, update_data: UpdateUserRequest) -> Optional[UserDetail]:
         """Update user details."""
         updated_user = self.user_repository.update_user(user_id, **update_data.model_dump(exclude_unset=True))
         if updated_user:
-            return UserDetail(
-                id=updated_user.id,
-                auth0_id=updated_user.auth0_id,
-                name=updated_user.name,
-                email=updated_user.email,
-                is_active=updated_user.is_active,
-                user_type=updated_user.user_type,
-                created_at=updated_user.created_at,
-                updated_at=updated_user.updated_at
-            )
+            record_audit(self.actor_id, f"user.update:{user_id}", org_id=self.user_repository.org_id)
+            return _to_user_detail(updated_user)
         return None
 
     def delete_user(self, user_id: int) -> bool:
         """Deletes a user permanently."""
-        return self.user_repository.delete_user(user_id)
+        deleted = self.user_repository.delete_user(user_id)
+        if deleted:
+            record_audit(self.actor_id, f"user.delete:{user_id}", org_id=self.user_repository.org_id)
+        return deleted
+
+
+class AsyncUserService:
+    def __init__(self, user_repository: AsyncUserRepository, actor_id: Optional[int] = None):
+        self.user_repository = user_repository
+        # User performing the requests, recorded in the audit log
+        self.actor_id = actor_id
+
+    async def create_user(self, user: CreateUserRequest) -> UserDetail:
+        user_obj = await self.user_repository.create_user(
+            user.name,
+            str(user.email),
+            user.auth0_id,
+            user.user_type.name,
+        )
+        await record_audit_async(self.actor_id, f"user.create:{user_obj.id}", org_id=self.user_repository.org_id)
+        return _to_user_detail(user_obj)
+
+    async def get_user_by_id(self, user_id: int, expand: Iterable[str] = ()) -> Optional[UserDetail]:
+        """Fetch a user by ID, with the relationships named in ``expand``."""
+        user = await self.user_repository.get_user_by_id(user_id, expand)
+        if user:
+            return _to_user_detail(user, expand)
+        return None
+
+    async def get_all_users(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                            sort_by: Optional[str] = None, sort_order: str = 'asc') -> List[UserShort]:
+        """Fetch a list of users with pagination and sorting."""
+        users, _ = await self.get_users_page(search_query, limit, offset, sort_by, sort_order)
+        return users
+
+    async def get_users_page(self, search_query: Optional[str] = None, limit: int = 10, offset: int = 0,
+                             sort_by: Optional[str] = None, sort_order: str = 'asc',
+                             cursor: Optional[str] = None,
+                             expand: Iterable[str] = ()) -> Tuple[List[UserShort], Optional[str]]:
+        """Fetch a page of users together with the cursor of the next page."""
+        users = await self.user_repository.get_all_users(
+            search_query=search_query, limit=limit, offset=offset, sort_by=sort_by, sort_order=sort_order,
+            cursor=cursor, expand=expand
+        )
+        # Without an explicit sort, search results are ranked by relevance, which a cursor cannot seek on
+        ranked = bool(search_query) and sort_by is None
+        return ([_to_user_short(user, expand) for user in users],
+                get_next_cursor(users, User, sort_by, sort_order, limit, ranked))
+
+    async def import_users_chunk(self, rows: List[Tuple[int, CreateUserRequest]]) -> Dict[int, str]:
+        """Insert one chunk of validated rows; returns the rejected ones keyed by line number."""
+        user_ids, errors = await self.user_repository.bulk_create_users([to_import_values(user) for _, user in rows])
+        for user_id in user_ids:
+            await record_audit_async(self.actor_id, f"user.import:{user_id}", org_id=self.user_repository.org_id)
+        return {rows[position][0]: error for position, error in errors.items()}
+
+    async def export_users(self, export_format: str = "ndjson", batch_size: int = 1000) -> AsyncIterator[str]:
+        """Stream every user as NDJSON or CSV, one chunk of text per ``batch_size`` users."""
+        if export_format == "csv":
+            yield format_csv([], header=True)
+        batch = []
+        async for user in self.user_repository.iter_users(batch_size):
+            batch.append(_to_user_detail(user))
+            if len(batch) >= batch_size:
+                yield _format_export(batch, export_format)
+                batch = []
+        if batch:
+            yield _format_export(batch, export_format)
+
+    async def update_user(self, user_id: int, update_data: UpdateUserRequest) -> Optional[UserDetail]:
+        """Update user details."""
+        updated_user = await self.user_repository.update_user(user_id, **update_data.model_dump(exclude_unset=True))
+        if updated_user:
+            await record_audit_async(self.actor_id, f"user.update:{user_id}", org_id=self.user_repository.org_id)
+            return _to_user_detail(updated_user)
+        return None
+
+    async def delete_user(self, user_id: int) -> bool:
+        """Deletes a user permanently."""
+        deleted = await self.user_repository.delete_user(user_id)
+        if deleted:
+            await record_audit_async(self.actor_id, f"user.delete:{user_id}", org_id=self.user_repository.org_id)
+        return deleted
@@ -1,62 +1,268 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.core.db import get_db
+from src.config import Settings, get_settings
+from src.core.authorization import (
+    get_caller_org_id,
+    is_super_admin,
+    require_permission,
+    require_permission_async,
+    require_super_admin,
+)
+from src.core.db import get_async_db, get_db
+from src.utils.etag import cache_headers, etag_matches, not_modified
+from src.utils.responses import SchemaResponse
 
-from .repository import UserRepository
-from .schema import CreateUserRequest, UpdateUserRequest, UserShort, UserDetail
-from .service import UserService
+from .bulk import get_import_format, import_users, read_import_rows, restrict_user_types
+from .cache import get_cached_user_etag, get_user_version, set_cached_user_etag, user_etag
+from .enums import UserTypeEnum
+from .repository import EXPANSIONS, AsyncUserRepository, UserRepository
+from .schema import (CreateUserRequest, ExpandedUserDetail, ExpandedUserShort, UpdateUserRequest, UserShort, UserDetail,
+                     UserImportResult)
+from .service import AsyncUserService, UserService
 
 router = APIRouter()
 
+# Same routes served from an AsyncSession, mounted instead of ``router`` when async database mode is on
+async_router = APIRouter()
+
 
 # Dependency to get UserService
-def get_user_service(_: Request, db: Session = Depends(get_db)):
-    user_repo = UserRepository(db)
-    return UserService(user_repo)
+def get_user_service(request: Request, x_user_id: Optional[int] = Header(None), db: Session = Depends(get_db)):
+    user_repo = UserRepository(db, org_id=get_caller_org_id(request))
+    return UserService(user_repo, actor_id=x_user_id)
+
+
+# Dependency to get AsyncUserService
+def get_async_user_service(request: Request, x_user_id: Optional[int] = Header(None),
+                           db: AsyncSession = Depends(get_async_db)):
+    user_repo = AsyncUserRepository(db, org_id=get_caller_org_id(request))
+    return AsyncUserService(user_repo, actor_id=x_user_id)
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EXPAND_DESCRIPTION = f"Comma-separated relationships to include: {', '.join(EXPANSIONS)}"
+
+
+def _parse_expand(expand: Optional[str]) -> List[str]:
+    return list(dict.fromkeys(name.strip() for name in (expand or "").split(",") if name.strip()))
+
+
+def _get_not_modified(user_id: int, expand: List[str], if_none_match: Optional[str],
+                      settings: Settings) -> Tuple[Optional[int], Optional[Response]]:
+    """The user's ETag version and, when ``If-None-Match`` holds the ETag cached for it, a 304 that skips the read.
+
+    The version is read before the user, so an update landing in between leaves the ETag cached afterwards stale.
+    """
+    if expand:
+        # Expanded users also change with their memberships and grants, which updated_at does not track
+        return None, None
+    version = get_user_version(user_id)
+    etag = get_cached_user_etag(user_id, version)
+    if etag_matches(if_none_match, etag):
+        return version, not_modified(etag, settings.users_cache_control)
+    return version, None
+
+
+def _user_response(user: UserDetail, expand: List[str], version: Optional[int], if_none_match: Optional[str],
+                   settings: Settings) -> Response:
+    if expand:
+        # Unrequested expansions are unset rather than null, so they are left out entirely
+        return SchemaResponse(user, ExpandedUserDetail, exclude_unset=True,
+                              headers=cache_headers(None, settings.users_cache_control))
+    etag = user_etag(user)
+    set_cached_user_etag(user.id, version, etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, settings.users_cache_control)
+    return SchemaResponse(user, UserDetail, headers=cache_headers(etag, settings.users_cache_control))
 
 
-@router.post("/", response_model=UserDetail, status_code=201)
-def create_user(user: CreateUserRequest, user_service: UserService = Depends(get_user_service)):
-    user_data = user_service.create_user(user)
-    return user_data
+def _users_response(users: List[UserShort], expand: List[str], next_cursor: Optional[str]) -> SchemaResponse:
+    return SchemaResponse(users, List[ExpandedUserShort] if expand else List[UserShort], exclude_unset=bool(expand),
+                          headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 
-@router.get("/{user_id}", response_model=UserDetail, status_code=200)
-def get_user(user_id: int, user_service: UserService = Depends(get_user_service)):
-    user_data = user_service.get_user_by_id(user_id)
+def _check_user_type_change(request: Request, user_type: Optional[UserTypeEnum]) -> None:
+    # The global user type reaches every organization, so no organization-level grant may set it
+    if user_type not in (None, UserTypeEnum.ORG_USER):
+        require_super_admin(request, "Only super admins can set the user type.")
+
+
+def _get_import_format(request: Request) -> str:
+    import_format = get_import_format(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(status_code=415, detail="Upload users as application/x-ndjson or text/csv")
+    return import_format
+
+
+@router.post("/", response_model=UserDetail, status_code=201,
+             dependencies=[Depends(require_permission("users", "create"))])
+def create_user(request: Request, user: CreateUserRequest, user_service: UserService = Depends(get_user_service)):
+    _check_user_type_change(request, user.user_type)
+    return SchemaResponse(user_service.create_user(user), UserDetail, status_code=201)
+
+
+@router.post("/import", response_model=UserImportResult, status_code=200,
+             dependencies=[Depends(require_permission("users", "create"))])
+async def import_users_bulk(request: Request, user_service: UserService = Depends(get_user_service),
+                            settings: Settings = Depends(get_settings)):
+    rows = restrict_user_types(read_import_rows(request.stream(), _get_import_format(request)), is_super_admin(request))
+    return await import_users(rows, settings.user_import_chunk_size,
+                              lambda chunk: run_in_threadpool(user_service.import_users_chunk, chunk))
+
+
+@router.get("/export", status_code=200, dependencies=[Depends(require_permission("users", "read"))])
+def export_users(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                 user_service: UserService = Depends(get_user_service), settings: Settings = Depends(get_settings)):
+    return StreamingResponse(user_service.export_users(export_format, settings.user_export_batch_size),
+                             media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@router.get("/{user_id}", response_model=ExpandedUserDetail, status_code=200,
+            dependencies=[Depends(require_permission("users", "read"))])
+def get_user(user_id: int, expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+             if_none_match: Optional[str] = Header(None), user_service: UserService = Depends(get_user_service),
+             settings: Settings = Depends(get_settings)):
+    expand_names = _parse_expand(expand)
+    version, response = _get_not_modified(user_id, expand_names, if_none_match, settings)
+    if response is not None:
+        return response
+    try:
+        user_data = user_service.get_user_by_id(user_id, expand_names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
-    return user_data
+    return _user_response(user_data, expand_names, version, if_none_match, settings)
 
 
-@router.get("/", response_model=List[UserShort], status_code=200)
+@router.get("/", response_model=List[ExpandedUserShort], status_code=200,
+            dependencies=[Depends(require_permission("users", "read"))])
 def get_users(
         search_query: Optional[str] = Query(None, description="Search users by name or email"),
         limit: int = Query(10, description="Number of users per page"),
         offset: int = Query(0, description="Offset for pagination"),
         sort_by: Optional[str] = Query(None, description="Field to sort by"),
         sort_order: str = Query("asc", description="Sort order: 'asc' or 'desc'"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces offset"),
+        expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
         user_service: UserService = Depends(get_user_service)
 ):
-    users = user_service.get_all_users(search_query, limit, offset, sort_by, sort_order)
-    return users
+    expand_names = _parse_expand(expand)
+    try:
+        users, next_cursor = user_service.get_users_page(search_query, limit, offset, sort_by, sort_order, cursor,
+                                                         expand_names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _users_response(users, expand_names, next_cursor)
 
 
-@router.patch("/{user_id}", response_model=UserDetail, status_code=200)
-def update_user(user_id: int, update_data: UpdateUserRequest, user_service: UserService = Depends(get_user_service)):
+@router.patch("/{user_id}", response_model=UserDetail, status_code=200,
+              dependencies=[Depends(require_permission("users", "update"))])
+def update_user(request: Request, user_id: int, update_data: UpdateUserRequest,
+                user_service: UserService = Depends(get_user_service)):
+    if update_data.user_type is not None:
+        require_super_admin(request, "Only super admins can change the user type.")
     updated_user = user_service.update_user(user_id, update_data)
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
-    return updated_user
+    return SchemaResponse(updated_user, UserDetail)
 
 
-@router.delete("/{user_id}")
+@router.delete("/{user_id}", dependencies=[Depends(require_permission("users", "delete"))])
 def delete_user(user_id: int, user_service: UserService = Depends(get_user_service)):
     deleted = user_service.delete_user(user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
     return Response(content="User deleted successfully", status_code=200)
+
+
+@async_router.post("/", response_model=UserDetail, status_code=201,
+                   dependencies=[Depends(require_permission_async("users", "create"))])
+async def create_user_async(request: Request, user: CreateUserRequest,
+                            user_service: AsyncUserService = Depends(get_async_user_service)):
+    _check_user_type_change(request, user.user_type)
+    return SchemaResponse(await user_service.create_user(user), UserDetail, status_code=201)
+
+
+@async_router.post("/import", response_model=UserImportResult, status_code=200,
+                   dependencies=[Depends(require_permission_async("users", "create"))])
+async def import_users_bulk_async(request: Request, user_service: AsyncUserService = Depends(get_async_user_service),
+                                  settings: Settings = Depends(get_settings)):
+    rows = restrict_user_types(read_import_rows(request.stream(), _get_import_format(request)), is_super_admin(request))
+    return await import_users(rows, settings.user_import_chunk_size, user_service.import_users_chunk)
+
+
+@async_router.get("/export", status_code=200, dependencies=[Depends(require_permission_async("users", "read"))])
+async def export_users_async(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                             user_service: AsyncUserService = Depends(get_async_user_service),
+                             settings: Settings = Depends(get_settings)):
+    return StreamingResponse(user_service.export_users(export_format, settings.user_export_batch_size),
+                             media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@async_router.get("/{user_id}", response_model=ExpandedUserDetail, status_code=200,
+                  dependencies=[Depends(require_permission_async("users", "read"))])
+async def get_user_async(user_id: int, expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+                         if_none_match: Optional[str] = Header(None),
+                         user_service: AsyncUserService = Depends(get_async_user_service),
+                         settings: Settings = Depends(get_settings)):
+    expand_names = _parse_expand(expand)
+    version, response = _get_not_modified(user_id, expand_names, if_none_match, settings)
+    if response is not None:
+        return response
+    try:
+        user_data = await user_service.get_user_by_id(user_id, expand_names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not user_data:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _user_response(user_data, expand_names, version, if_none_match, settings)
+
+
+@async_router.get("/", response_model=List[ExpandedUserShort], status_code=200,
+                  dependencies=[Depends(require_permission_async("users", "read"))])
+async def get_users_async(
+        search_query: Optional[str] = Query(None, description="Search users by name or email"),
+        limit: int = Query(10, description="Number of users per page"),
+        offset: int = Query(0, description="Offset for pagination"),
+        sort_by: Optional[str] = Query(None, description="Field to sort by"),
+        sort_order: str = Query("asc", description="Sort order: 'asc' or 'desc'"),
+        cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces offset"),
+        expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+        user_service: AsyncUserService = Depends(get_async_user_service)
+):
+    expand_names = _parse_expand(expand)
+    try:
+        users, next_cursor = await user_service.get_users_page(search_query, limit, offset, sort_by, sort_order,
+                                                               cursor, expand_names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _users_response(users, expand_names, next_cursor)
+
+
+@async_router.patch("/{user_id}", response_model=UserDetail, status_code=200,
+                    dependencies=[Depends(require_permission_async("users", "update"))])
+async def update_user_async(request: Request, user_id: int, update_data: UpdateUserRequest,
+                            user_service: AsyncUserService = Depends(get_async_user_service)):
+    if update_data.user_type is not None:
+        require_super_admin(request, "Only super admins can change the user type.")
+    updated_user = await user_service.update_user(user_id, update_data)
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return SchemaResponse(updated_user, UserDetail)
+
+
+@async_router.delete("/{user_id}", dependencies=[Depends(require_permission_async("users", "delete"))])
+async def delete_user_async(user_id: int, user_service: AsyncUserService = Depends(get_async_user_service)):
+    deleted = await user_service.delete_user(user_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found")
+    return Response(content="User deleted successfully", status_code=200)
@@ -1,5 +1,6 @@
 import logging
 from functools import lru_cache
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -10,6 +11,91 @@ class Settings(BaseSettings):
     environment: str = "dev"
     testing: bool = False
 
+    # Enforce require_permission on the routes; only meant to be turned off for local development
+    authorization_enabled: bool = True
+
+    # Import and mount the component routers on the first request instead of in create_application(), so workers
+    # boot faster; turn off to surface import errors at boot
+    lazy_routers: bool = True
+
+    # Database; async mode serves requests from AsyncSession-backed repositories and async routes
+    database_url: str = "sqlite:///rbac.sqlite"
+    database_async: bool = False
+    async_database_url: Optional[str] = None
+
+    # Read replicas, as a JSON list of URLs: repository methods marked read_only (listings and search) run on one
+    # of them, picked "round_robin" or by "least_connections". A session that wrote, and for
+    # database_read_your_writes_window seconds the X-User-Id that wrote through this worker, stay on the primary
+    database_replica_urls: List[str] = []
+    database_replica_strategy: str = "round_robin"
+    database_read_your_writes_window: float = 5.0
+
+    # Connection pool; pool_recycle of -1 keeps connections forever
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = -1
+    database_pool_pre_ping: bool = False
+
+    # Per-connection pragmas applied when the database is SQLite
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout: int = 5000
+
+    # In-process cache of effective (org, user) permissions
+    permission_cache_max_size: int = 10000
+    permission_cache_ttl: float = 300.0
+
+    # In-process cache of (user, org) memberships backing the request-scoped membership context
+    membership_cache_max_size: int = 10000
+    membership_cache_ttl: float = 300.0
+
+    # Keep user_effective_permission in sync with every grant change and resolve permissions from it with one
+    # indexed lookup. Run "python -m src.components.access_control.maintenance rebuild" after turning it on
+    effective_permissions_enabled: bool = False
+
+    # Cache shared by the worker processes: "redis://host:6379/0" or "file:///dev/shm/rbac-cache" for the workers of
+    # one host. Workers check per-organization versions in it before trusting their in-process permission and
+    # membership caches, and share resolved permissions through it. Unset, each worker only sees its own changes
+    shared_cache_url: Optional[str] = None
+
+    # Audit log: entries are queued in process and batch-inserted by a background writer.
+    # audit_overflow_policy decides what happens when the queue is full: "block" waits up to
+    # audit_enqueue_timeout and then drops, "drop" drops at once, "spill" appends to audit_spill_path
+    audit_enabled: bool = False
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval: float = 1.0
+    audit_overflow_policy: str = "block"
+    audit_enqueue_timeout: float = 0.5
+    audit_spill_path: str = "audit_spill.ndjson"
+    audit_drain_timeout: float = 10.0
+    # Monthly audit partitions older than audit_retention_months are dropped (0 keeps them forever),
+    # after being archived as gzipped NDJSON when audit_archive_dir is set
+    audit_retention_months: int = 12
+    audit_archive_dir: Optional[str] = None
+
+    # Per-request SQL profiling: statement count and database time in a Server-Timing header and a JSON log line,
+    # with the profiling_slowest_statements slowest statements. Statements repeated profiling_repeat_threshold
+    # times within one request are logged as likely N+1 queries
+    profiling_enabled: bool = False
+    profiling_slowest_statements: int = 5
+    profiling_repeat_threshold: int = 5
+
+    # Conditional GETs: GET /users/{id} and the permission lookups send strong ETags and answer a matching
+    # If-None-Match with a 304 before reading the database, plus these Cache-Control headers (empty to omit).
+    # "no-cache" lets clients keep responses but makes them revalidate every time. The ETags of the last users
+    # served are kept in process, trusted while the user's version in the shared cache is unchanged
+    users_cache_control: str = "private, no-cache"
+    permissions_cache_control: str = "private, no-cache"
+    user_etag_cache_max_size: int = 10000
+    user_etag_cache_ttl: float = 300.0
+
+    # Bulk user import/export: rows inserted per transaction and rows fetched per server-side cursor batch
+    user_import_chunk_size: int = 1000
+    user_export_batch_size: int = 1000
+
 
 @lru_cache()
 def get_settings() -> BaseSettings:
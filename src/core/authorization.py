@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Optional
+
+from fastapi import Depends, Header, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.components.organizations.models import OrgUserTypeEnum
+from src.core.db import get_async_db, get_db
+
+# Component modules import each other's packages, and those load their routes, which import this module; the
+# membership and RBAC modules are therefore only imported when a dependency first runs
+if TYPE_CHECKING:
+    from src.components.access_control.bitset import PermissionCatalogue
+    from src.components.organizations.membership import MembershipContext
+
+# Organization roles that manage an organization and are therefore not limited by its permission grants
+ORG_MANAGER_TYPES = (OrgUserTypeEnum.ORG_OWNER.value, OrgUserTypeEnum.ORG_ADMIN.value)
+
+
+@dataclass(frozen=True)
+class CallerPermissions:
+    """Effective permissions of the caller, resolved once and memoized on ``request.state`` for the request."""
+
+    membership: "MembershipContext"
+    catalogue: Optional["PermissionCatalogue"] = None
+    bits: int = 0
+    # Whether the organization comes from the route's path, i.e. the route only reaches that organization's data
+    org_scoped: bool = False
+
+    @property
+    def unrestricted(self) -> bool:
+        # Managing an organization only lifts the checks within it, not on global routes such as /users/
+        return self.membership.is_super_admin or (self.org_scoped and
+                                                  self.membership.org_user_type in ORG_MANAGER_TYPES)
+
+    def allows(self, module: str, action: str) -> bool:
+        if self.unrestricted:
+            return True
+        if not self.org_scoped and self.membership.org_user_type is None:
+            # Global routes limit their data to the X-Org-Id organization, so the caller must belong to it
+            return False
+        return self.catalogue is not None and self.catalogue.has(self.bits, module, action)
+
+
+def resolve_caller_permissions(db_session: Session, membership: "MembershipContext",
+                               org_scoped: bool = False) -> CallerPermissions:
+    from src.components.access_control.repository import RBACRepository
+
+    caller = CallerPermissions(membership, org_scoped=org_scoped)
+    if caller.unrestricted:
+        # Super admins and organization managers never need their grants looked up
+        return caller
+    catalogue, bitsets = RBACRepository(db_session, membership=membership).get_permission_bitsets(
+        [membership.user_id])
+    return CallerPermissions(membership, catalogue, bitsets[membership.user_id], org_scoped)
+
+
+def _is_org_scoped(request: Request) -> bool:
+    return "org_id" in request.path_params
+
+
+def _get_org_id(request: Request, x_org_id: Optional[int]) -> Optional[int]:
+    # Organization routes carry the organization in the path; the others may name it in a header
+    org_id = request.path_params.get("org_id")
+    return int(org_id) if org_id is not None else x_org_id
+
+
+def _get_stored_permissions(request: Request, user_id: int, org_id: Optional[int]) -> Optional[CallerPermissions]:
+    caller = getattr(request.state, "caller_permissions", None)
+    if caller is not None and (caller.membership.user_id, caller.membership.org_id) == (user_id, org_id):
+        return caller
+    return None
+
+
+def _check(caller: CallerPermissions, module: str, action: str) -> None:
+    if not caller.allows(module, action):
+        raise HTTPException(status_code=403, detail=f"Missing permission {module}:{action}.")
+
+
+def _authorization_enabled(request: Request) -> bool:
+    settings = getattr(request.app.state, "settings", None)
+    return settings is None or settings.authorization_enabled
+
+
+def require_permission(module: str, action: str) -> Callable:
+    """Dependency rejecting callers that do not hold ``module``:``action`` in the organization of the request.
+
+    The caller is named by the ``X-User-Id`` header and the organization by the ``org_id`` path parameter or the
+    ``X-Org-Id`` header. Their permissions are resolved on the first check of a request and reused by the others.
+    On routes without an ``org_id`` only super admins reach every organization: other callers must belong to the
+    ``X-Org-Id`` one, and the route limits its data to it with ``get_caller_org_id``.
+    """
+
+    def dependency(request: Request, x_user_id: Optional[int] = Header(None), x_org_id: Optional[int] = Header(None),
+                   db: Session = Depends(get_db)) -> None:
+        if not _authorization_enabled(request):
+            return
+        if x_user_id is None:
+            raise HTTPException(status_code=401, detail="Missing X-User-Id header.")
+        org_id = _get_org_id(request, x_org_id)
+        caller = _get_stored_permissions(request, x_user_id, org_id)
+        if caller is None:
+            from src.components.organizations.membership import get_request_membership
+
+            membership = get_request_membership(request, db, x_user_id, org_id)
+            if membership.user_type is None:
+                raise HTTPException(status_code=401, detail="Unknown user.")
+            caller = resolve_caller_permissions(db, membership, _is_org_scoped(request))
+            request.state.caller_permissions = caller
+        _check(caller, module, action)
+
+    return dependency
+
+
+def require_permission_async(module: str, action: str) -> Callable:
+    """``require_permission`` for the routes served from an ``AsyncSession``."""
+
+    async def dependency(request: Request, x_user_id: Optional[int] = Header(None),
+                         x_org_id: Optional[int] = Header(None), db: AsyncSession = Depends(get_async_db)) -> None:
+        if not _authorization_enabled(request):
+            return
+        if x_user_id is None:
+            raise HTTPException(status_code=401, detail="Missing X-User-Id header.")
+        org_id = _get_org_id(request, x_org_id)
+        caller = _get_stored_permissions(request, x_user_id, org_id)
+        if caller is None:
+            from src.components.organizations.membership import get_async_request_membership
+
+            membership = await get_async_request_membership(request, db, x_user_id, org_id)
+            if membership.user_type is None:
+                raise HTTPException(status_code=401, detail="Unknown user.")
+            caller = await db.run_sync(
+                lambda session: resolve_caller_permissions(session, membership, _is_org_scoped(request)))
+            request.state.caller_permissions = caller
+        _check(caller, module, action)
+
+    return dependency
+
+
+def is_super_admin(request: Request) -> bool:
+    """Whether the caller ``require_permission`` resolved for the request is a super admin.
+
+    For changes no organization grant may allow, such as setting a user's global type.
+    """
+    if not _authorization_enabled(request):
+        return True
+    caller = getattr(request.state, "caller_permissions", None)
+    return caller is not None and caller.membership.is_super_admin
+
+
+def get_caller_org_id(request: Request) -> Optional[int]:
+    """Organization a global route must limit its data to; None when the caller may reach every organization.
+
+    Only super admins, or every caller while authorization is disabled, reach every organization. Anyone else was
+    let through ``require_permission`` on a grant held in the ``X-Org-Id`` organization, so only reaches that one.
+    """
+    if is_super_admin(request):
+        return None
+    return request.state.caller_permissions.membership.org_id
+
+
+def require_super_admin(request: Request, detail: str) -> None:
+    if not is_super_admin(request):
+        raise HTTPException(status_code=403, detail=detail)
@@ -1,28 +1,86 @@
 # ruff: noqa: F401
-import os
+from typing import Any, Callable, Optional
 
+from fastapi import Header
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from src.config import get_settings
+from src.core.pool import configure_sqlite, get_engine_options
+from src.core.routing import CLIENT, RoutingSession, get_routing_options
+
+settings = get_settings()
+
+# Async drivers used when the configured URL names a sync one
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(database_url: str, async_database_url: Optional[str] = None) -> str:
+    if async_database_url:
+        return async_database_url
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False)
+
+
 # Default to a file-based database
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///rbac.sqlite")
+SQLALCHEMY_DATABASE_URL = settings.database_url
 
 # Create engine and session
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_engine_options(make_url(SQLALCHEMY_DATABASE_URL), settings))
+configure_sqlite(engine, settings)
+replica_engines = [create_engine(url, **get_engine_options(make_url(url), settings))
+                   for url in settings.database_replica_urls]
+for replica_engine in replica_engines:
+    configure_sqlite(replica_engine, settings)
+routing_options = get_routing_options(replica_engines, settings.database_replica_strategy,
+                                      settings.database_read_your_writes_window)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine,
+                            **(dict(class_=RoutingSession, **routing_options) if routing_options else {}))
+
+# Async engine and session, only bound when async mode is enabled
+async_engine = None
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+if settings.database_async:
+    ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL, settings.async_database_url)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **get_engine_options(make_url(ASYNC_DATABASE_URL), settings, is_async=True))
+    configure_sqlite(async_engine.sync_engine, settings)
+    AsyncSessionLocal.configure(bind=async_engine)
+    if settings.database_replica_urls:
+        async_replica_engines = []
+        for url in settings.database_replica_urls:
+            async_url = get_async_database_url(url)
+            async_replica_engines.append(create_async_engine(
+                async_url, **get_engine_options(make_url(async_url), settings, is_async=True)))
+            configure_sqlite(async_replica_engines[-1].sync_engine, settings)
+        # AsyncSession hands these arguments to the Session it wraps, which routes on the engines' sync side
+        AsyncSessionLocal.configure(sync_session_class=RoutingSession, **get_routing_options(
+            [replica.sync_engine for replica in async_replica_engines], settings.database_replica_strategy,
+            settings.database_read_your_writes_window))
 
 Base = declarative_base()
 
 
 # noinspection PyUnresolvedReferences
-def init_db():
+def load_models():
+    """Register every model on ``Base.metadata`` so string relationships resolve; routers may load much later."""
     from src.components.access_control.models import (
         FeatureModule,
         Group,
         GroupRole,
         Permission,
         Role,
+        RoleClosure,
+        RoleParent,
         RolePermission,
+        UserEffectivePermission,
         UserGroup,
         UserPermission,
         UserRole,
@@ -31,14 +89,43 @@ def init_db():
     from src.components.organizations.models import Organization, UserOrganization
     from src.components.users.models import User
 
-    # Create all tables in the provided engine
-    Base.metadata.create_all(bind=engine)
-    print("Database created and tables ensured!")
 
+def init_db(force: bool = False):
+    from src.core.schema import ensure_schema
+
+    load_models()
+
+    # Create all tables in the provided engine, unless the stored schema fingerprint shows they are current
+    if ensure_schema(engine, Base.metadata, force=force):
+        print("Database created and tables ensured!")
+    else:
+        print("Database schema is current, skipped creating tables.")
 
-def get_db():
-    db = SessionLocal()
+
+def get_db(x_user_id: Optional[int] = Header(None)):
+    # The caller keys the read-your-writes window when reads are routed to replicas
+    db = SessionLocal(info={CLIENT: x_user_id})
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(x_user_id: Optional[int] = Header(None)):
+    async with AsyncSessionLocal(info={CLIENT: x_user_id}) as db:
+        yield db
+
+
+class AsyncRepository:
+    """Exposes a synchronous repository on an ``AsyncSession``.
+
+    Calls run through ``AsyncSession.run_sync``: the repository's query code is shared with the sync path while the
+    database I/O itself is awaited on the event loop instead of holding a threadpool worker.
+    """
+
+    def __init__(self, db_session: AsyncSession, repository: Any):
+        self.db_session = db_session
+        self.repository = repository
+
+    async def run(self, method: Callable, *args, **kwargs) -> Any:
+        return await self.db_session.run_sync(lambda _: method(*args, **kwargs))
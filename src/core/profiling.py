@@ -0,0 +1,137 @@
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger("uvicorn")
+
+# Longest statement text written to the logs
+_MAX_STATEMENT_LENGTH = 500
+
+
+class RequestProfile:
+    """SQL statements executed while serving one request, grouped by statement text."""
+
+    def __init__(self):
+        self.statement_count = 0
+        self.db_time = 0.0
+        # statement -> [executions, total seconds, slowest seconds]
+        self.statements: Dict[str, List[Any]] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statement_count += 1
+        self.db_time += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def slowest(self, limit: int) -> List[Tuple[str, float]]:
+        """The ``limit`` statements with the slowest single execution, slowest first."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][2], reverse=True)
+        return [(statement, entry[2]) for statement, entry in ranked[:limit]]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, the usual sign of an N+1 query pattern."""
+        return sorted(((statement, entry[0]) for statement, entry in self.statements.items() if entry[0] >= threshold),
+                      key=lambda item: item[1], reverse=True)
+
+    def server_timing(self, elapsed: float) -> str:
+        return (f'db;dur={self.db_time * 1000:.3f};desc="{self.statement_count} statements", '
+                f'app;dur={elapsed * 1000:.3f}')
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def get_request_profile() -> Optional[RequestProfile]:
+    """Profile of the request being served, None outside a profiled request."""
+    return _current_profile.get()
+
+
+def _normalize(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        context._profiling_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profiling_started", None)
+    if profile is not None and started is not None:
+        profile.record(_normalize(statement), time.perf_counter() - started)
+
+
+def instrument_sql() -> None:
+    """Time every statement of every engine, sync or async, into the profile of the current request."""
+    # Listening on the Engine class also covers engines created later, e.g. by tests and benchmarks
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """Report the SQL cost of each request in a ``Server-Timing`` header and a structured log line.
+
+    Statements repeated ``repeat_threshold`` times or more within a request are logged as likely N+1 queries.
+    Statements run while the response body streams are logged but miss the header, which is already sent.
+    """
+
+    def __init__(self, app, slowest: int = 5, repeat_threshold: int = 5):
+        self.app = app
+        self.slowest = slowest
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing",
+                                                     profile.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            self._log(scope, status_code, profile, time.perf_counter() - started)
+
+    def _log(self, scope, status_code: Optional[int], profile: RequestProfile, elapsed: float) -> None:
+        repeated = profile.repeated(self.repeat_threshold)
+        logger.info(json.dumps({
+            "event": "request_profile",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "db_statements": profile.statement_count,
+            "db_time_ms": round(profile.db_time * 1000, 3),
+            "slowest": [{"statement": statement[:_MAX_STATEMENT_LENGTH], "ms": round(seconds * 1000, 3)}
+                        for statement, seconds in profile.slowest(self.slowest)],
+            "repeated": [{"statement": statement[:_MAX_STATEMENT_LENGTH], "count": count}
+                         for statement, count in repeated],
+        }))
+        for statement, count in repeated:
+            logger.warning(f"Possible N+1 query in {scope['method']} {scope['path']}: executed {count} times: "
+                           f"{statement[:_MAX_STATEMENT_LENGTH]}")
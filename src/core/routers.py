@@ -0,0 +1,84 @@
+import importlib
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Tuple
+
+from fastapi import APIRouter, FastAPI
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    """Where a component's routes live and where they are mounted; the module is only imported when mounting."""
+
+    module: str
+    prefix: str = ""
+    tags: Tuple[str, ...] = field(default_factory=tuple)
+
+
+# Mounted by create_application() on the first request rather than at import time
+COMPONENT_ROUTERS = (
+    RouterSpec("src.components.users", "/users", ("users",)),
+    RouterSpec("src.components.access_control", "/access-control", ("access_control",)),
+    RouterSpec("src.components.audit_log", "/audit-log", ("audit_log",)),
+)
+
+
+def component_routers(package: str) -> Callable[[str], APIRouter]:
+    """Module ``__getattr__`` exposing ``router``/``async_router`` of ``package``, built from its views on first use.
+
+    Importing another module of the package, e.g. its service, then no longer imports and builds every route.
+    """
+
+    def __getattr__(name: str) -> APIRouter:
+        if name not in ("router", "async_router"):
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        views = importlib.import_module(f"{package}.views")
+        namespace = importlib.import_module(package).__dict__
+        for attribute in ("router", "async_router"):
+            router = APIRouter()
+            router.include_router(getattr(views, attribute))
+            namespace[attribute] = router
+        return namespace[name]
+
+    return __getattr__
+
+
+class LazyRouters:
+    """Mounts the routers of ``specs`` on ``application`` once, the first time they are needed."""
+
+    def __init__(self, application: FastAPI, specs: Tuple[RouterSpec, ...], use_async: bool):
+        self.application = application
+        self.specs = specs
+        self.use_async = use_async
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            for spec in self.specs:
+                module = importlib.import_module(spec.module)
+                router = module.async_router if self.use_async else module.router
+                self.application.include_router(router, prefix=spec.prefix, tags=list(spec.tags))
+            # The schema may have been generated before these routes existed
+            self.application.openapi_schema = None
+            self.loaded = True
+
+
+class LazyRouterMiddleware:
+    """Loads the application's ``LazyRouters`` before the first request is routed.
+
+    Starlette matches against the live route list, so routes appended after the app started are served normally.
+    """
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and not self.routers.loaded:
+            self.routers.load()
+        await self.app(scope, receive, send)
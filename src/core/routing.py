@@ -0,0 +1,142 @@
+import functools
+import itertools
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+from src.utils.cache import TTLCache
+
+# Keys of Session.info: nesting depth of read_only methods, and who the session acts for
+_READ_ONLY = "read_only"
+CLIENT = "client"
+
+
+class ReplicaSelector(ABC):
+    """Picks the replica engine a session reads from."""
+
+    @abstractmethod
+    def select(self, replicas: Sequence[Engine]) -> Engine:
+        ...
+
+
+class RoundRobinSelector(ReplicaSelector):
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def select(self, replicas: Sequence[Engine]) -> Engine:
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastConnectionsSelector(ReplicaSelector):
+    """Replica with the fewest connections checked out of its pool; ties rotate so idle replicas share the load."""
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def select(self, replicas: Sequence[Engine]) -> Engine:
+        start = next(self._counter)
+        candidates = [replicas[(start + offset) % len(replicas)] for offset in range(len(replicas))]
+        return min(candidates, key=lambda replica: replica.pool.checkedout() if isinstance(replica.pool, QueuePool)
+                   else 0)
+
+
+REPLICA_SELECTORS: Dict[str, Callable[[], ReplicaSelector]] = {
+    "round_robin": RoundRobinSelector,
+    "least_connections": LeastConnectionsSelector,
+}
+
+
+def create_replica_selector(strategy: str) -> ReplicaSelector:
+    if strategy not in REPLICA_SELECTORS:
+        raise ValueError(f"Unknown replica strategy '{strategy}'; choose from {', '.join(REPLICA_SELECTORS)}.")
+    return REPLICA_SELECTORS[strategy]()
+
+
+class ReadYourWrites:
+    """Remembers, for ``window`` seconds, the clients that wrote through this process.
+
+    Their reads stay on the primary until the replicas have had time to catch up with their writes. Only writes
+    made through this worker are seen, so ``window`` should cover the replication lag.
+    """
+
+    def __init__(self, window: float, max_size: int = 100000):
+        self.window = window
+        self._writes = TTLCache(max_size=max_size, ttl=window) if window > 0 else None
+
+    def record(self, client: Hashable) -> None:
+        if self._writes is not None:
+            self._writes.set(client, True)
+
+    def is_recent(self, client: Hashable) -> bool:
+        return self._writes is not None and self._writes.get(client, False)
+
+
+class RoutingSession(Session):
+    """Session sending the queries of ``read_only`` repository methods to a replica, and the rest to the primary.
+
+    The primary is the session's ``bind``. A session reads from at most one replica, so a request sees a single
+    snapshot, and stops using replicas once it has written or while its client is within the read-your-writes
+    window; the client is ``info["client"]``, set by ``get_db`` from the ``X-User-Id`` header.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), selector: Optional[ReplicaSelector] = None,
+                 read_your_writes: Optional[ReadYourWrites] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas: List[Engine] = list(replicas)
+        self.selector = selector or RoundRobinSelector()
+        self.read_your_writes = read_your_writes
+        self.wrote = False
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._record_write()
+        elif self._can_use_replica():
+            if self._replica is None:
+                self._replica = self.selector.select(self.replicas)
+            return self._replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _record_write(self) -> None:
+        self.wrote = True
+        if self.read_your_writes is not None:
+            self.read_your_writes.record(self.info.get(CLIENT))
+
+    def _can_use_replica(self) -> bool:
+        if not self.replicas or not self.info.get(_READ_ONLY) or self.wrote:
+            return False
+        return self.read_your_writes is None or not self.read_your_writes.is_recent(self.info.get(CLIENT))
+
+
+def read_only(method: Callable) -> Callable:
+    """Marks a repository method whose queries a ``RoutingSession`` may send to a replica.
+
+    Only for methods whose results may lag behind the primary: not for reads that feed version-stamped caches, as
+    those would keep a stale answer under the new version. Has no effect on other sessions.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> Any:
+        info = self.db_session.info
+        info[_READ_ONLY] = info.get(_READ_ONLY, 0) + 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            info[_READ_ONLY] -= 1
+
+    return wrapper
+
+
+def get_routing_options(replicas: Sequence[Engine], strategy: str, read_your_writes_window: float) -> Dict[str, Any]:
+    """``sessionmaker`` arguments routing reads to ``replicas``; none, i.e. a plain Session, without replicas."""
+    if not replicas:
+        return {}
+    return {
+        "replicas": list(replicas),
+        "selector": create_replica_selector(strategy),
+        "read_your_writes": ReadYourWrites(read_your_writes_window),
+    }
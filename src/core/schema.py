@@ -0,0 +1,137 @@
+import fcntl
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, inspect, select
+from sqlalchemy.engine import Connection, Dialect, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.sql import func
+
+from src.core.pool import is_sqlite, is_sqlite_memory
+
+logger = logging.getLogger("uvicorn")
+
+# Kept out of Base.metadata so it neither changes the fingerprint nor shows up in Alembic autogenerate
+schema_fingerprint_table = Table(
+    "schema_fingerprint",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+# Arbitrary application-wide key for the PostgreSQL advisory lock and the MySQL named lock
+_LOCK_KEY = 0x5242_4143
+_LOCK_NAME = "rbac_schema"
+
+_process_lock = threading.Lock()
+
+
+def get_schema_fingerprint(metadata: MetaData, dialect: Dialect) -> str:
+    """SHA-256 of the DDL ``create_all`` would emit for ``metadata`` on ``dialect``."""
+    digest = hashlib.sha256()
+    for table in sorted(metadata.tables.values(), key=lambda table: table.fullname):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf-8"))
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_schema_fingerprint(engine: Engine) -> Optional[str]:
+    """Fingerprint recorded by the last ``ensure_schema``; None when there is none yet."""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(schema_fingerprint_table.c.fingerprint)).scalar()
+    except DBAPIError:
+        # Most likely the table does not exist yet, i.e. a fresh database
+        return None
+
+
+def _write_schema_fingerprint(connection: Connection, fingerprint: str) -> None:
+    schema_fingerprint_table.create(connection, checkfirst=True)
+    connection.execute(delete(schema_fingerprint_table))
+    connection.execute(insert(schema_fingerprint_table).values(id=1, fingerprint=fingerprint))
+
+
+def find_missing_schema(connection: Connection, metadata: MetaData) -> List[str]:
+    """Columns and indexes of ``metadata`` the database lacks, as ``table.column`` and index names.
+
+    ``create_all`` only creates missing tables, so these are left for the Alembic migrations to add.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in sorted(metadata.tables.values(), key=lambda table: table.fullname):
+        if table.name not in existing_tables:
+            missing.append(table.name)
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [f"{table.name}.{column.name}" for column in table.columns if column.name not in columns]
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing += sorted(index.name for index in table.indexes if index.name not in indexes)
+    return missing
+
+
+@contextmanager
+def schema_lock(engine: Engine) -> Iterator[None]:
+    """Serialize schema changes across worker processes, and hosts where the database allows it.
+
+    PostgreSQL and MySQL use a session-level advisory lock; file-based SQLite takes an ``flock`` on a file next to
+    the database; in-memory SQLite is private to the process, so a thread lock is enough.
+    """
+    with _process_lock:
+        backend = engine.url.get_backend_name()
+        if is_sqlite_memory(engine.url):
+            yield
+        elif is_sqlite(engine.url):
+            with open(f"{engine.url.database}.schema.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        elif backend == "postgresql":
+            with engine.connect() as connection:
+                connection.exec_driver_sql(f"SELECT pg_advisory_lock({_LOCK_KEY})")
+                try:
+                    yield
+                finally:
+                    connection.exec_driver_sql(f"SELECT pg_advisory_unlock({_LOCK_KEY})")
+        elif backend in ("mysql", "mariadb"):
+            with engine.connect() as connection:
+                connection.exec_driver_sql(f"SELECT GET_LOCK('{_LOCK_NAME}', -1)")
+                try:
+                    yield
+                finally:
+                    connection.exec_driver_sql(f"SELECT RELEASE_LOCK('{_LOCK_NAME}')")
+        else:
+            yield
+
+
+def ensure_schema(engine: Engine, metadata: MetaData, force: bool = False) -> bool:
+    """Run ``create_all`` unless the database already records the fingerprint of ``metadata``.
+
+    The check is a single query, so booting against a current schema sends no DDL nor per-table probes. Otherwise
+    the DDL runs under ``schema_lock`` and only in the first worker to get there. Returns whether DDL ran.
+    The fingerprint is only recorded once every column and index exists: ``create_all`` does not alter existing
+    tables, so until the Alembic migrations have run each boot checks the schema again.
+    """
+    fingerprint = get_schema_fingerprint(metadata, engine.dialect)
+    if not force and read_schema_fingerprint(engine) == fingerprint:
+        return False
+    with schema_lock(engine):
+        # Another worker may have applied it while this one waited for the lock
+        if not force and read_schema_fingerprint(engine) == fingerprint:
+            return False
+        with engine.begin() as connection:
+            metadata.create_all(connection)
+            missing = find_missing_schema(connection, metadata)
+            if missing:
+                logger.warning(f"Database schema lacks {', '.join(missing)}; run `alembic upgrade head`")
+            else:
+                _write_schema_fingerprint(connection, fingerprint)
+    return True
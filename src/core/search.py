@@ -0,0 +1,137 @@
+import logging
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import column, event, func, inspect, literal_column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+from src.core.db import Base
+
+logger = logging.getLogger("uvicorn")
+
+# Trigram matching needs at least three characters; shorter terms fall back to ILIKE
+MIN_INDEXED_TERM_LENGTH = 3
+
+# model -> names of its searchable columns
+_search_indexes: Dict[type, List[str]] = {}
+
+# engine -> {search table name: whether it exists}
+_search_tables_by_engine: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def register_search_index(model, *columns: str) -> None:
+    """Declare ``columns`` of ``model`` as searchable through the name search index."""
+    _search_indexes[model] = list(columns)
+
+
+def get_search_table_name(model) -> str:
+    return f"{model.__tablename__}_search"
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+
+def _sqlite_search_ddl(model) -> List[str]:
+    """FTS5 external-content table over the model's table, kept in sync by triggers."""
+    source = model.__tablename__
+    search_table = get_search_table_name(model)
+    columns = _search_indexes[model]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} USING fts5({column_list}, content={_quote(source)}, "
+        f"content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_ai AFTER INSERT ON {_quote(source)} BEGIN "
+        f"INSERT INTO {search_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_ad AFTER DELETE ON {_quote(source)} BEGIN "
+        f"INSERT INTO {search_table}({search_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"END",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_au AFTER UPDATE OF {column_list} ON {_quote(source)} BEGIN "
+        f"INSERT INTO {search_table}({search_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {search_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _postgresql_search_ddl(model) -> List[str]:
+    source = model.__tablename__
+    return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+        f"CREATE INDEX IF NOT EXISTS ix_{source}_{name}_trgm ON {_quote(source)} USING gin ({name} gin_trgm_ops)"
+        for name in _search_indexes[model]
+    ]
+
+
+def create_search_indexes(connection) -> None:
+    """Create the search structures for every registered model; safe to run repeatedly."""
+    dialect = connection.dialect.name
+    for model in _search_indexes:
+        if dialect == "sqlite":
+            search_table = get_search_table_name(model)
+            existed = inspect(connection).has_table(search_table)
+            try:
+                for statement in _sqlite_search_ddl(model):
+                    connection.execute(text(statement))
+            except OperationalError as e:
+                # SQLite builds without FTS5 or the trigram tokenizer keep using ILIKE
+                logger.warning(f"Search index {search_table} unavailable: {e}")
+                continue
+            if not existed:
+                # Index the rows that were written before the search table existed
+                connection.execute(text(f"INSERT INTO {search_table}({search_table}) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            for statement in _postgresql_search_ddl(model):
+                connection.execute(text(statement))
+
+
+def drop_search_indexes(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for model in _search_indexes:
+        connection.execute(text(f"DROP TABLE IF EXISTS {get_search_table_name(model)}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(_, connection, **__):
+    _search_tables_by_engine.pop(connection.engine, None)
+    create_search_indexes(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(_, connection, **__):
+    _search_tables_by_engine.pop(connection.engine, None)
+    drop_search_indexes(connection)
+
+
+def _has_search_table(session, model) -> bool:
+    bind = session.get_bind()
+    known = _search_tables_by_engine.setdefault(getattr(bind, "engine", bind), {})
+    search_table = get_search_table_name(model)
+    if search_table not in known:
+        known[search_table] = inspect(bind).has_table(search_table)
+    return known[search_table]
+
+
+def apply_search(query: Query, model, search_query: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """Filter ``query`` down to rows of ``model`` matching ``search_query`` in any searchable column.
+
+    Returns the filtered query and an ordering clause ranking the best matches first, or None when the
+    backend cannot rank (plain ILIKE fallback).
+    """
+    columns = [getattr(model, name) for name in _search_indexes[model]]
+    dialect = query.session.get_bind().dialect.name
+    if dialect == "sqlite" and len(search_query) >= MIN_INDEXED_TERM_LENGTH and _has_search_table(query.session,
+                                                                                                  model):
+        search_table = get_search_table_name(model)
+        fts = table(search_table, column("rowid"))
+        phrase = '"' + search_query.replace('"', '""') + '"'
+        matches = select(fts.c.rowid.label("id"), func.bm25(literal_column(search_table)).label("rank")).where(
+            literal_column(search_table).op("MATCH")(phrase)).subquery()
+        return query.join(matches, matches.c.id == model.id), matches.c.rank.asc()
+    query = query.filter(or_(*[column_.ilike(f"%{search_query}%") for column_ in columns]))
+    if dialect == "postgresql":
+        # ILIKE is served by the pg_trgm GIN indexes; rank by the closest column
+        return query, func.greatest(*[func.similarity(column_, search_query) for column_ in columns]).desc()
+    return query, None
@@ -1,29 +1,63 @@
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from src.core.db import init_db
+from src.components.audit_log.service import run_audit_maintenance, start_audit_writer, stop_audit_writer
+from src.config import Settings, get_settings
+from src.core.db import SessionLocal, engine, init_db, load_models
+from src.core.profiling import ProfilingMiddleware, instrument_sql
+from src.core.routers import COMPONENT_ROUTERS, LazyRouterMiddleware, LazyRouters
+from src.utils.shared_cache import create_shared_cache, set_shared_cache
 
 logger = logging.getLogger("uvicorn")
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(application: FastAPI):
     logger.info("Starting up...")
+    settings = application.state.settings
     # Ensure the database and tables are created when the app starts
     init_db()
+    if settings.audit_enabled:
+        run_audit_maintenance(settings, engine)
+    start_audit_writer(settings, SessionLocal)
     yield
     logger.info("Shutting down...")
+    # Write out every queued audit entry before the process exits
+    stop_audit_writer(settings.audit_drain_timeout)
 
 
-def create_application() -> FastAPI:
-    from src.components import health, users
+def create_application(settings: Optional[Settings] = None) -> FastAPI:
+    from src.components import health
 
-    application = FastAPI(lifespan=lifespan)
+    load_models()
+    settings = settings or get_settings()
+    # orjson encodes every response that is not already a Response; see utils.responses for the user routes
+    application = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+    application.state.settings = settings
+    set_shared_cache(create_shared_cache(settings.shared_cache_url))
+    if settings.profiling_enabled:
+        instrument_sql()
+        application.add_middleware(ProfilingMiddleware, slowest=settings.profiling_slowest_statements,
+                                   repeat_threshold=settings.profiling_repeat_threshold)
 
     application.include_router(health.router)
-    application.include_router(users.router, prefix="/users", tags=["users"])
+    routers = LazyRouters(application, COMPONENT_ROUTERS, use_async=settings.database_async)
+    application.state.routers = routers
+    if settings.lazy_routers:
+        application.add_middleware(LazyRouterMiddleware, routers=routers)
+        openapi = application.openapi
+
+        def openapi_with_routers():
+            routers.load()
+            return openapi()
+
+        application.openapi = openapi_with_routers
+    else:
+        routers.load()
 
     return application
 
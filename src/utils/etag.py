@@ -0,0 +1,33 @@
+import hashlib
+from typing import Dict, Optional
+
+from starlette.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag of the ``parts`` a representation is derived from, e.g. a row's id and update time."""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an ``If-None-Match`` header lists ``etag``, using the weak comparison RFC 9110 prescribes for it."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: Optional[str], cache_control: Optional[str]) -> Dict[str, str]:
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified(etag: str, cache_control: Optional[str]) -> Response:
+    """304 carrying the validators the full response would have had, and no body."""
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
@@ -0,0 +1,107 @@
+import base64
+import binascii
+import enum
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Set
+
+from sqlalchemy import UniqueConstraint, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+
+@lru_cache()
+def get_cursor_columns(model) -> Set[str]:
+    """Columns a keyset cursor may seek on: non-nullable and leading some index, unique constraint or the PK."""
+    table = model.__table__
+    leading = {column.name for column in table.primary_key.columns}
+    for column in table.columns:
+        if column.index or column.unique:
+            leading.add(column.name)
+    for constraint in list(table.indexes) + [c for c in table.constraints if isinstance(c, UniqueConstraint)]:
+        columns = list(constraint.columns)
+        if columns:
+            leading.add(columns[0].name)
+    return {name for name in leading if not table.columns[name].nullable}
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_by: str, sort_order: str, sort_value: Any, last_id: int) -> str:
+    payload = json.dumps({"k": sort_by, "o": sort_order, "v": _encode_value(sort_value), "id": last_id},
+                         separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, dict) or {"k", "o", "v", "id"} - payload.keys():
+            raise ValueError
+        return payload
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid pagination cursor.")
+
+
+def paginate(query: Query, model, sort_by: Optional[str] = None, sort_order: str = 'asc', limit: int = 10,
+             offset: int = 0, cursor: Optional[str] = None, relevance: Optional[ColumnElement] = None) -> Query:
+    """Order and page ``query`` by ``(sort_by, id)``.
+
+    Without a cursor the page is taken with OFFSET, so any column can be sorted on. With a cursor the query seeks
+    past the last row of the previous page instead, which only indexed columns support. A ``relevance`` ordering
+    from a search ranks the first, offset-paged results when no explicit sort is requested.
+    """
+    if relevance is not None and sort_by is None and cursor is None:
+        return query.order_by(relevance, model.id).offset(offset).limit(limit)
+    sort_key = sort_by or "id"
+    sort_column = getattr(model, sort_key)
+    descending = sort_order == 'desc'
+    if cursor is not None:
+        if sort_key not in get_cursor_columns(model):
+            raise ValueError(f"Cannot paginate with a cursor on '{sort_key}'; it is not an indexed column.")
+        payload = decode_cursor(cursor)
+        if payload["k"] != sort_key or payload["o"] != sort_order:
+            raise ValueError("Pagination cursor does not match the requested sorting.")
+        if sort_key == "id":
+            query = query.filter(model.id < payload["id"] if descending else model.id > payload["id"])
+        else:
+            seek = tuple_(sort_column, model.id)
+            position = tuple_(_decode_value(sort_column, payload["v"]), payload["id"])
+            query = query.filter(seek < position if descending else seek > position)
+    order = [sort_column] if sort_key == "id" else [sort_column, model.id]
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order])
+    if cursor is None:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+
+def get_next_cursor(items: Sequence, model, sort_by: Optional[str] = None, sort_order: str = 'asc',
+                    limit: int = 10, ranked: bool = False) -> Optional[str]:
+    """Cursor for the page after ``items``, or None when it was the last page or the sort key is not seekable.
+
+    Pages ``ranked`` by search relevance get no cursor either: relevance is not a column to seek on, so the next
+    page must be taken with an offset.
+    """
+    sort_key = sort_by or "id"
+    if not items or len(items) < limit or ranked or sort_key not in get_cursor_columns(model):
+        return None
+    last = items[-1]
+    return encode_cursor(sort_key, sort_order, getattr(last, sort_key), last.id)
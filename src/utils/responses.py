@@ -0,0 +1,37 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+@lru_cache(maxsize=None)
+def _get_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any, exclude_unset: bool = False) -> bytes:
+    """Serialize already-validated ``content`` of type ``schema`` (e.g. ``List[UserShort]``) in pydantic-core."""
+    return _get_adapter(schema).dump_json(content, exclude_unset=exclude_unset)
+
+
+class SchemaResponse(Response):
+    """JSON response for content that was validated when it was built, e.g. with ``model_validate`` on ORM rows.
+
+    FastAPI leaves returned ``Response`` objects alone, so this skips the second validation against
+    ``response_model`` as well as the ``jsonable_encoder`` pass; keep ``response_model`` on the route for the
+    OpenAPI schema. Headers set on an injected ``Response`` are dropped, so pass them here instead.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, schema: Any, status_code: int = 200,
+                 headers: Optional[Mapping[str, str]] = None, background: Optional[BackgroundTask] = None,
+                 exclude_unset: bool = False):
+        self.schema = schema
+        self.exclude_unset = exclude_unset
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(self.schema, content, self.exclude_unset)
@@ -0,0 +1,200 @@
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("uvicorn")
+
+
+class SharedCache(ABC):
+    """String key/value store shared by every worker process, with atomic counters used as version numbers."""
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        ...
+
+    @abstractmethod
+    def set_many(self, values: Dict[str, str], ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def incr_many(self, keys: List[str]) -> List[int]:
+        ...
+
+
+class LocalFileCache(SharedCache):
+    """Shared cache for the workers of a single host: one file per key in ``directory``.
+
+    Point it at a tmpfs such as ``/dev/shm`` to keep it in shared memory. Values are replaced atomically with
+    ``os.replace``; counters are incremented under an exclusive ``flock`` on the directory's lock file. Expired
+    files are deleted when read, and ``set_many`` sweeps the whole directory every ``sweep_interval`` seconds for
+    the ones never read again, such as entries keyed by an outdated version.
+    """
+
+    def __init__(self, directory: str, sweep_interval: float = 60.0):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, ".lock")
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                expires_at, value = entry_file.read().split("\n", 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        if expires_at and float(expires_at) < time.time():
+            _remove(path)
+            return None
+        return value
+
+    def _write(self, key: str, value: str, ttl: Optional[float]) -> None:
+        expires_at = repr(time.time() + ttl) if ttl else ""
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as entry_file:
+            entry_file.write(f"{expires_at}\n{value}")
+        os.replace(temporary_path, self._path(key))
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [self._read(key) for key in keys]
+
+    def set_many(self, values: Dict[str, str], ttl: Optional[float] = None) -> None:
+        for key, value in values.items():
+            self._write(key, value, ttl)
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete the expired entries, and temporary files a crashed writer left behind; returns how many."""
+        now, removed = time.time(), 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.startswith(".tmp"):
+                    expired = os.path.getmtime(path) < now - self.sweep_interval
+                elif name.startswith("."):
+                    continue
+                else:
+                    with open(path, encoding="utf-8") as entry_file:
+                        expires_at = entry_file.readline().rstrip("\n")
+                    expired = bool(expires_at) and float(expires_at) < now
+            except (FileNotFoundError, ValueError):
+                continue
+            if expired and _remove(path):
+                removed += 1
+        return removed
+
+    def incr_many(self, keys: List[str]) -> List[int]:
+        counters = []
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                for key in keys:
+                    counters.append(int(self._read(key) or 0) + 1)
+                    self._write(key, str(counters[-1]), None)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return counters
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        # Another worker got there first
+        return False
+
+
+class RedisCache(SharedCache):
+    """Shared cache backed by Redis or any server speaking its protocol; each call is a single round trip."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return [value.decode("utf-8") if isinstance(value, bytes) else value for value in self.client.mget(keys)]
+
+    def set_many(self, values: Dict[str, str], ttl: Optional[float] = None) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(key, value, px=int(ttl * 1000) if ttl else None)
+        pipeline.execute()
+
+    def incr_many(self, keys: List[str]) -> List[int]:
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(key)
+        return [int(counter) for counter in pipeline.execute()]
+
+
+def create_shared_cache(url: Optional[str]) -> Optional[SharedCache]:
+    """Build the backend of ``url``: ``redis://``/``rediss://`` for Redis, ``file://<directory>`` for files."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("Redis shared caches need the 'redis' extra: pip install 'sass-rbac-management[redis]'.")
+
+        return RedisCache(redis.Redis.from_url(url))
+    if url.startswith("file://"):
+        return LocalFileCache(url[len("file://"):])
+    raise ValueError(f"Unsupported shared cache URL '{url}'.")
+
+
+_shared_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    return _shared_cache
+
+
+def set_shared_cache(cache: Optional[SharedCache]) -> None:
+    global _shared_cache
+    _shared_cache = cache
+
+
+def _version_key(namespace: str) -> str:
+    return f"version:{namespace}"
+
+
+def get_versions(namespaces: List[str]) -> Optional[List[int]]:
+    """Current version of each namespace, all 0 without a shared cache; None when the shared cache is unreachable.
+
+    Process-local entries stamped with these versions stay valid until another worker bumps one of them.
+    """
+    cache = _shared_cache
+    if cache is None:
+        return [0] * len(namespaces)
+    try:
+        values = cache.get_many([_version_key(namespace) for namespace in namespaces])
+    except Exception as e:  # noqa
+        logger.warning(f"Shared cache unavailable, bypassing local caches: {e}")
+        return None
+    return [int(value or 0) for value in values]
+
+
+def bump_versions(namespaces: Iterable[str]) -> None:
+    """Invalidate, in every worker, the local entries stamped with the versions of ``namespaces``."""
+    cache = _shared_cache
+    namespaces = sorted(set(namespaces))
+    if cache is None or not namespaces:
+        return
+    try:
+        cache.incr_many([_version_key(namespace) for namespace in namespaces])
+    except Exception as e:  # noqa
+        logger.error(f"Failed to bump shared cache versions {namespaces}: {e}")
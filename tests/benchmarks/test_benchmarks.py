@@ -0,0 +1,98 @@
+import json
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from benchmarks.generator import TenantProfile, generate_tenants
+from benchmarks.harness import compare_reports, measure
+from benchmarks.run import main
+from benchmarks.serialization import main as serialization_main
+from src.components.access_control.models import (
+    FeatureModule,
+    GroupRole,
+    Permission,
+    RoleClosure,
+    RolePermission,
+    UserGroup,
+    UserPermission,
+    UserRole,
+)
+from src.components.access_control.repository import RBACRepository
+from src.components.users.models import User
+from src.core.db import Base
+
+TINY = TenantProfile(orgs=2, users_per_org=5, groups_per_org=2, roles_per_org=3, modules=2, actions_per_module=2)
+
+
+def _role_assignments(db_session):
+    return db_session.execute(select(UserRole.user_id, UserRole.role_id).order_by(UserRole.user_id,
+                                                                                 UserRole.role_id)).all()
+
+
+def _granted(db_session, user_id):
+    """(module, action) granted to the user directly, through its roles or through its groups' roles."""
+    role_ids = select(UserRole.role_id).where(UserRole.user_id == user_id).union(
+        select(GroupRole.role_id).join(UserGroup, UserGroup.group_id == GroupRole.group_id).where(
+            UserGroup.user_id == user_id))
+    permission_ids = select(RolePermission.permission_id).where(RolePermission.role_id.in_(role_ids)).union(
+        select(UserPermission.permission_id).where(UserPermission.user_id == user_id))
+    return set(db_session.execute(select(FeatureModule.name, Permission.action).join(
+        Permission, Permission.module_id == FeatureModule.id).where(Permission.id.in_(permission_ids))).all())
+
+
+def test_generator_is_seeded(db_session):
+    tenants = generate_tenants(db_session, TINY)
+    assert len(tenants.org_ids) == 2
+    assert all(len(tenants.staff_ids[org_id]) == 5 for org_id in tenants.org_ids)
+    assert len(tenants.permission_ids) == 4
+    # Owners, staff and the super admin
+    assert db_session.execute(select(func.count()).select_from(User)).scalar_one() == 13
+
+    org_id = tenants.org_ids[0]
+    staff_id = tenants.staff_ids[org_id][0]
+    # Every generated role is its own closure ancestor, so role grants resolve like direct ones
+    assert db_session.execute(select(func.count()).select_from(RoleClosure)).scalar_one() == 2 * 3
+    permissions = RBACRepository(db_session, org_id=org_id, user_id=staff_id).get_permissions_for_user(staff_id)
+    assert permissions and _granted(db_session, staff_id) == {
+        (module, action) for module, actions in permissions.items() for action in actions}
+
+    # The same profile and seed reproduce the same assignments
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as other_session:
+        generate_tenants(other_session, TINY)
+        assert _role_assignments(other_session) == _role_assignments(db_session)
+    engine.dispose()
+
+
+def test_measure_and_compare():
+    result = measure("noop", lambda: None, iterations=10, warmup=1)
+    assert result.iterations == 10
+    assert result.min <= result.median <= result.p95 <= result.max
+
+    baseline = {"results": [{"name": "noop", "median": 1.0}, {"name": "gone", "median": 1.0}]}
+    current = {"results": [{"name": "noop", "median": 1.05}, {"name": "new", "median": 5.0}]}
+    assert compare_reports(baseline, current, threshold=0.1) == []
+    assert len(compare_reports(baseline, current, threshold=0.01)) == 1
+
+
+def test_run_writes_json_report(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["--orgs", "1", "--users-per-org", "5", "--iterations", "2", "--warmup", "0",
+                 "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["profile"]["users_per_org"] == 5
+    names = {result["name"] for result in report["results"]}
+    assert {"repository.get_permissions_for_user.cold", "repository.bulk_assign.user_permissions",
+            "http.users.list", "http.access_control.holders"} <= names
+    assert main(["--orgs", "1", "--users-per-org", "5", "--iterations", "2", "--warmup", "0",
+                 "--output", str(tmp_path / "again.json"), "--compare", str(output), "--threshold", "1000"]) == 0
+
+
+def test_serialization_reports_per_item_cost(tmp_path):
+    output = tmp_path / "serialization.json"
+    assert serialization_main(["--items", "5", "--iterations", "2", "--warmup", "0", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert {result["name"] for result in results} == {"serialize.users.legacy", "serialize.users.schema_response",
+                                                      "serialize.users.orjson_response"}
+    assert all(result["items"] == 5 and result["per_item_median"] > 0 for result in results)
@@ -0,0 +1,643 @@
+import pytest
+from sqlalchemy import event
+
+from src.components.access_control.bitset import PermissionCatalogue
+from src.components.access_control.cache import clear_permission_caches, permission_cache, role_bitset_cache
+from src.components.access_control.effective import check_effective_permissions, rebuild_effective_permissions
+from src.components.access_control.hierarchy import rebuild_role_closure
+from src.components.access_control.models import (
+    FeatureModule,
+    Group,
+    GroupRole,
+    Permission,
+    Role,
+    RoleClosure,
+    RolePermission,
+    UserEffectivePermission,
+    UserGroup,
+    UserPermission,
+    UserRole,
+)
+from src.components.access_control.repository import RBACRepository, _insert_ignoring_conflicts
+from src.components.organizations.models import Organization, OrgUserTypeEnum, UserOrganization
+from src.components.organizations.repository import OrganizationRepository
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.config import get_settings
+from src.utils.shared_cache import LocalFileCache, set_shared_cache
+
+
+def create_user(db, name, org=None, org_user_type=OrgUserTypeEnum.ORG_STAFF):
+    user = User(name=name, email=f"{name}@test.com", auth0_id=name, user_type=UserTypeEnum.ORG_USER)
+    db.add(user)
+    db.flush()
+    if org:
+        db.add(UserOrganization(user_id=user.id, organization_id=org.id, user_type=org_user_type))
+    db.commit()
+    return user
+
+
+def create_org(db, name):
+    org = Organization(name=name, slug=name)
+    db.add(org)
+    db.commit()
+    return org
+
+
+def create_permission(db, module_name, action):
+    module = db.query(FeatureModule).filter(FeatureModule.name == module_name).first()
+    if not module:
+        module = FeatureModule(name=module_name)
+        db.add(module)
+        db.flush()
+    permission = Permission(module_id=module.id, action=action)
+    db.add(permission)
+    db.commit()
+    return permission
+
+
+def test_get_permissions_for_user_resolves_all_paths(db_session):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    delete = create_permission(db_session, "billing", "delete")
+    create = create_permission(db_session, "users", "create")
+    role = Role(name="viewer", organization_id=org.id)
+    group_role = Role(name="deleter", organization_id=org.id)
+    group = Group(name="ops", organization_id=org.id)
+    db_session.add_all([role, group_role, group])
+    db_session.flush()
+    db_session.add_all([
+        UserPermission(user_id=staff.id, permission_id=create.id),
+        RolePermission(role_id=role.id, permission_id=read.id),
+        UserRole(user_id=staff.id, role_id=role.id),
+        RolePermission(role_id=group_role.id, permission_id=delete.id),
+        GroupRole(group_id=group.id, role_id=group_role.id),
+        UserGroup(user_id=staff.id, group_id=group.id),
+    ])
+    db_session.commit()
+
+    repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    permissions = repository.get_permissions_for_user(staff.id)
+
+    assert sorted(permissions["billing"]) == ["delete", "read"]
+    assert permissions["users"] == ["create"]
+
+
+def test_get_permissions_for_user_ignores_roles_of_other_organizations(db_session):
+    org = create_org(db_session, "acme")
+    other_org = create_org(db_session, "globex")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    other_role = Role(name="viewer", organization_id=other_org.id)
+    db_session.add(other_role)
+    db_session.flush()
+    db_session.add_all([RolePermission(role_id=other_role.id, permission_id=read.id),
+                        UserRole(user_id=staff.id, role_id=other_role.id)])
+    db_session.commit()
+
+    repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    assert repository.get_permissions_for_user(staff.id) == {}
+
+
+def test_get_permissions_for_user_is_served_from_cache(db_session):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+    repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+    # Rows changed behind the repository's back are not seen until the entry is invalidated
+    db_session.query(UserPermission).delete()
+    db_session.commit()
+    assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+    assert permission_cache.hits == 1
+
+
+def test_assign_methods_invalidate_cached_permissions(db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    delete = create_permission(db_session, "billing", "delete")
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {}
+
+    owner_repository.assign_permission_to_user(staff.id, read.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+    group = owner_repository.create_group("ops")
+    role = owner_repository.create_role("deleter", created_by_id=owner.id)
+    staff_repository.assign_user_to_group(staff.id, group.id)
+    owner_repository.assign_role_to_group(group.id, role.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+    owner_repository.assign_permission_to_role(role.id, delete.id)
+    assert sorted(staff_repository.get_permissions_for_user(staff.id)["billing"]) == ["delete", "read"]
+
+
+def test_check_permissions_returns_matrix(test_app_with_session, db_session):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    admin = create_user(db_session, "admin", org, OrgUserTypeEnum.ORG_ADMIN)
+    outsider = create_user(db_session, "outsider")
+    read = create_permission(db_session, "billing", "read")
+    create_permission(db_session, "billing", "delete")
+    role = Role(name="viewer", organization_id=org.id)
+    db_session.add(role)
+    db_session.flush()
+    db_session.add_all([RolePermission(role_id=role.id, permission_id=read.id),
+                        UserRole(user_id=staff.id, role_id=role.id),
+                        UserPermission(user_id=outsider.id, permission_id=read.id)])
+    db_session.commit()
+
+    response = test_app_with_session.post(f"/access-control/{org.id}/permissions/check", json={
+        "user_ids": [staff.id, admin.id, outsider.id],
+        "permissions": [{"module": "billing", "action": "read"}, {"module": "billing", "action": "delete"},
+                        {"module": "unknown", "action": "read"}]
+    })
+
+    assert response.status_code == 200
+    assert response.json()["matrix"] == [[True, False, False], [False, False, False], [False, False, False]]
+    assert response.json()["bitmaps"] == ["1", "0", "0"]
+
+
+def test_permission_bitsets_use_fixed_number_of_queries(db_session):
+    org = create_org(db_session, "acme")
+    users = [create_user(db_session, f"staff{i}", org) for i in range(20)]
+    permissions = [create_permission(db_session, "billing", f"action{i}") for i in range(10)]
+    db_session.add_all([UserPermission(user_id=user.id, permission_id=permissions[i % 10].id)
+                        for i, user in enumerate(users)])
+    db_session.commit()
+    org_id, user_ids = org.id, [user.id for user in users]
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    repository = RBACRepository(db_session, org_id=org_id)
+    catalogue, bitsets = repository.get_permission_bitsets(user_ids)
+
+    # catalogue load + one UNION over the grant paths
+    assert len(statements) == 2
+    assert all(catalogue.decode(bitsets[user_id]) == {"billing": [f"action{i % 10}"]}
+               for i, user_id in enumerate(user_ids))
+
+
+def test_permission_catalogue_round_trips_bitsets():
+    catalogue = PermissionCatalogue([(7, "users", "read"), (3, "billing", "read"), (5, "billing", "delete")])
+
+    bits = catalogue.encode([3, 7])
+
+    assert bits == 0b101
+    assert catalogue.decode(bits) == {"billing": ["read"], "users": ["read"]}
+    assert catalogue.has(bits, "users", "read")
+    assert not catalogue.has(bits, "billing", "delete")
+    assert not catalogue.has(bits, "unknown", "read")
+    assert catalogue.mask([("billing", "delete"), ("unknown", "read")]) == 0b010
+    assert PermissionCatalogue([(3, "billing", "read"), (5, "billing", "delete"), (7, "users", "read"),
+                                (9, "users", "delete")]).extends(catalogue)
+    assert not PermissionCatalogue([(3, "billing", "read"), (7, "users", "read")]).extends(catalogue)
+
+
+def test_role_bitsets_are_shared_between_users(db_session):
+    org = create_org(db_session, "acme")
+    first = create_user(db_session, "first", org)
+    second = create_user(db_session, "second", org)
+    read = create_permission(db_session, "billing", "read")
+    role = Role(name="viewer", organization_id=org.id)
+    db_session.add(role)
+    db_session.flush()
+    db_session.add_all([RolePermission(role_id=role.id, permission_id=read.id),
+                        UserRole(user_id=first.id, role_id=role.id), UserRole(user_id=second.id, role_id=role.id)])
+    db_session.commit()
+    repository = RBACRepository(db_session, org_id=org.id)
+
+    repository.get_permission_bitsets([first.id])
+    role_misses = role_bitset_cache.misses
+    catalogue, bitsets = repository.get_permission_bitsets([second.id])
+
+    assert role_bitset_cache.misses == role_misses
+    assert catalogue.decode(bitsets[second.id]) == {"billing": ["read"]}
+
+
+def test_membership_is_resolved_once_across_repositories(db_session):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    org_id, staff_id = org.id, staff.id
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first = RBACRepository(db_session, org_id=org_id, user_id=staff_id)
+    second = RBACRepository(db_session, org_id=org_id, user_id=staff_id)
+    third = RBACRepository(db_session, membership=first.membership)
+
+    assert len(statements) == 1
+    assert first.org_user_type == second.org_user_type == third.org_user_type == OrgUserTypeEnum.ORG_STAFF.value
+
+
+def test_assign_user_to_organization_invalidates_membership(db_session):
+    org = create_org(db_session, "acme")
+    user = create_user(db_session, "user")
+    assert RBACRepository(db_session, org_id=org.id, user_id=user.id).org_user_type is None
+
+    OrganizationRepository(db_session).assign_user_to_organization(user.id, org.id, OrgUserTypeEnum.ORG_ADMIN)
+
+    repository = RBACRepository(db_session, org_id=org.id, user_id=user.id)
+    assert repository.org_user_type == OrgUserTypeEnum.ORG_ADMIN.value
+    assert repository.create_group("ops").name == "ops"
+
+
+def test_super_admin_is_detected_from_membership(db_session):
+    org = create_org(db_session, "acme")
+    admin = User(name="root", email="root@test.com", auth0_id="root", user_type=UserTypeEnum.SUPER_ADMIN)
+    db_session.add(admin)
+    db_session.commit()
+
+    repository = RBACRepository(db_session, org_id=org.id, user_id=admin.id)
+
+    assert repository.is_super_admin
+    assert repository.create_role("auditor", created_by_id=admin.id).organization_id == org.id
+
+
+def test_bulk_assignments_skip_existing_pairs_and_invalidate(db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    delete = create_permission(db_session, "billing", "delete")
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    role = owner_repository.create_role("billing", created_by_id=owner.id)
+    assert db_session.get(RoleClosure, (role.id, role.id)).path_count == 1
+    staff_repository.assign_role_to_user(staff.id, role.id)
+    owner_repository.assign_permission_to_role(role.id, read.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+    pairs = [(role.id, read.id), (role.id, delete.id), (role.id, delete.id)]
+    assert owner_repository.bulk_assign_permissions_to_roles(pairs) == (1, 2, [])
+    assert sorted(staff_repository.get_permissions_for_user(staff.id)["billing"]) == ["delete", "read"]
+    assert owner_repository.bulk_assign_permissions_to_roles(pairs) == (0, 3, [])
+    assert staff_repository.bulk_assign_roles_to_users([(staff.id, role.id)]) == (0, 1, [])
+
+
+def test_bulk_assignments_reject_pairs_outside_the_organization(db_session):
+    org, other_org = create_org(db_session, "acme"), create_org(db_session, "other")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff, foreign = create_user(db_session, "staff", org), create_user(db_session, "foreign", other_org)
+    role, foreign_role = Role(name="viewer", organization_id=org.id), Role(name="viewer", organization_id=other_org.id)
+    group, foreign_group = Group(name="ops", organization_id=org.id), Group(name="ops", organization_id=other_org.id)
+    db_session.add_all([role, foreign_role, group, foreign_group])
+    db_session.commit()
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+
+    assert staff_repository.bulk_assign_roles_to_users([(staff.id, role.id), (staff.id, foreign_role.id),
+                                                        (foreign.id, role.id)]) == (
+        1, 0, [(staff.id, foreign_role.id), (foreign.id, role.id)])
+    assert staff_repository.bulk_assign_users_to_groups([(foreign.id, group.id), (staff.id, foreign_group.id)]) == (
+        0, 0, [(foreign.id, group.id), (staff.id, foreign_group.id)])
+    assert owner_repository.bulk_assign_roles_to_groups([(group.id, foreign_role.id)]) == (
+        0, 0, [(group.id, foreign_role.id)])
+    assert owner_repository.bulk_assign_permissions_to_roles([(role.id, 999)]) == (0, 0, [(role.id, 999)])
+    assert {(user_role.user_id, user_role.role_id) for user_role in db_session.query(UserRole)} == {
+        (staff.id, role.id)}
+    assert db_session.query(UserGroup).count() == 0 and db_session.query(GroupRole).count() == 0
+
+
+def test_bulk_assignments_are_all_or_nothing(db_session, monkeypatch):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    role = Role(name="viewer", organization_id=org.id)
+    db_session.add(role)
+    db_session.commit()
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    link_missing = owner_repository._link_missing
+
+    def fail_on_user_permissions(model, pairs):
+        if model is UserPermission:
+            raise RuntimeError("connection lost")
+        return link_missing(model, pairs)
+
+    monkeypatch.setattr(owner_repository, "_link_missing", fail_on_user_permissions)
+    with pytest.raises(RuntimeError):
+        owner_repository.bulk_assign({"role_permissions": [(role.id, read.id)],
+                                      "user_permissions": [(staff.id, read.id)]})
+    assert db_session.query(RolePermission).count() == 0 and db_session.query(UserPermission).count() == 0
+
+    # Unauthorized kinds are refused before anything is written
+    with pytest.raises(Exception, match="Only OrgStaff can have roles assigned"):
+        owner_repository.bulk_assign({"role_permissions": [(role.id, read.id)], "user_roles": [(staff.id, role.id)]})
+    assert db_session.query(RolePermission).count() == 0
+
+
+def test_bulk_inserts_ignore_conflicts_per_dialect(db_session):
+    from sqlalchemy.dialects import mysql
+
+    statement = _insert_ignoring_conflicts(db_session, UserRole)
+    assert "ON CONFLICT DO NOTHING" in str(statement.compile(db_session.get_bind()))
+
+    class OtherBackend:
+        def __init__(self, name):
+            self.dialect = type("Dialect", (), {"name": name})()
+
+        def get_bind(self):
+            return self
+
+    statement = _insert_ignoring_conflicts(OtherBackend("mysql"), UserRole)
+    assert str(statement.compile(dialect=mysql.dialect())).startswith("INSERT IGNORE INTO user_role")
+    with pytest.raises(ValueError):
+        _insert_ignoring_conflicts(OtherBackend("mssql"), UserRole)
+
+
+def test_bulk_assign_endpoint(test_app_with_session, db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    role = Role(name="viewer", organization_id=org.id)
+    db_session.add(role)
+    db_session.commit()
+
+    response = test_app_with_session.post(f"/access-control/{org.id}/assignments/bulk", headers={
+        "X-User-Id": str(owner.id)
+    }, json={"role_permissions": [[role.id, read.id]], "user_permissions": [[staff.id, read.id]]})
+    assert response.status_code == 200
+    assert response.json() == {"role_permissions": {"created": 1, "skipped": 0, "rejected": []},
+                               "user_permissions": {"created": 1, "skipped": 0, "rejected": []}}
+
+    response = test_app_with_session.post(f"/access-control/{org.id}/assignments/bulk", headers={
+        "X-User-Id": str(staff.id)
+    }, json={"role_permissions": [[role.id, read.id]]})
+    assert response.status_code == 403
+
+
+def test_version_bump_from_another_worker_invalidates_local_permissions(db_session, tmp_path):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+    set_shared_cache(LocalFileCache(str(tmp_path)))
+    try:
+        repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+        assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+        # Another worker revokes the grant: this worker's cache is untouched but the organization version moves on
+        db_session.query(UserPermission).delete()
+        db_session.commit()
+        assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+        LocalFileCache(str(tmp_path)).incr_many([f"version:rbac:org:{org.id}"])
+        assert repository.get_permissions_for_user(staff.id) == {}
+    finally:
+        set_shared_cache(None)
+
+
+def test_permissions_resolved_by_another_worker_are_reused(db_session, tmp_path):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+    set_shared_cache(LocalFileCache(str(tmp_path)))
+    try:
+        repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+        assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+        # A fresh worker with an empty local cache gets the bits from the shared cache without resolving them
+        clear_permission_caches()
+        db_session.query(UserPermission).delete()
+        db_session.commit()
+        assert repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+    finally:
+        set_shared_cache(None)
+
+
+def test_roles_inherit_permissions_through_the_closure(db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    delete = create_permission(db_session, "billing", "delete")
+    base, middle, left, right = (Role(name=name, organization_id=org.id)
+                                 for name in ("base", "middle", "left", "right"))
+    db_session.add_all([base, middle, left, right])
+    db_session.flush()
+    db_session.add_all([RolePermission(role_id=base.id, permission_id=read.id),
+                        RolePermission(role_id=middle.id, permission_id=delete.id),
+                        UserRole(user_id=staff.id, role_id=left.id)])
+    db_session.commit()
+    repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+
+    # left -> middle -> base and left -> right -> base: a diamond over base
+    assert repository.add_role_parent(middle.id, base.id)
+    assert repository.add_role_parent(right.id, base.id)
+    assert repository.add_role_parent(left.id, middle.id)
+    assert repository.add_role_parent(left.id, right.id)
+    assert not repository.add_role_parent(left.id, right.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read", "delete"]}
+    closure = {(row.ancestor_id, row.descendant_id): row.path_count for row in db_session.query(RoleClosure)}
+    assert closure[(base.id, left.id)] == 2
+
+    with pytest.raises(ValueError):
+        repository.add_role_parent(base.id, left.id)
+
+    # base stays reachable through right after the middle edge goes
+    assert repository.remove_role_parent(left.id, middle.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+    assert repository.remove_role_parent(left.id, right.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {}
+    assert {pair for pair in closure if pair[1] == left.id} - {
+        (row.ancestor_id, row.descendant_id) for row in db_session.query(RoleClosure)} == {
+        (base.id, left.id), (middle.id, left.id), (right.id, left.id)}
+    assert rebuild_role_closure(db_session) == db_session.query(RoleClosure).count()
+
+
+def test_granting_a_parent_role_invalidates_inheriting_users(db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    parent, child = Role(name="parent", organization_id=org.id), Role(name="child", organization_id=org.id)
+    db_session.add_all([parent, child])
+    db_session.flush()
+    db_session.add(UserRole(user_id=staff.id, role_id=child.id))
+    db_session.commit()
+    repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+    repository.add_role_parent(child.id, parent.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {}
+
+    repository.assign_permission_to_role(parent.id, read.id)
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read"]}
+
+
+def test_role_parent_endpoint(test_app_with_session, db_session):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    parent, child = Role(name="parent", organization_id=org.id), Role(name="child", organization_id=org.id)
+    db_session.add_all([parent, child])
+    db_session.commit()
+    url = f"/access-control/{org.id}/roles/{child.id}/parents/{parent.id}"
+
+    response = test_app_with_session.put(url, headers={"X-User-Id": str(owner.id)})
+    assert response.status_code == 200
+    assert response.json() == {"role_id": child.id, "parent_id": parent.id, "changed": True}
+    response = test_app_with_session.put(f"/access-control/{org.id}/roles/{parent.id}/parents/{child.id}",
+                                         headers={"X-User-Id": str(owner.id)})
+    assert response.status_code == 400
+    response = test_app_with_session.delete(url, headers={"X-User-Id": str(owner.id)})
+    assert response.json()["changed"] is True
+
+
+@pytest.fixture
+def effective_permissions(monkeypatch):
+    monkeypatch.setattr(get_settings(), "effective_permissions_enabled", True)
+
+
+def test_effective_permissions_follow_grant_changes(db_session, effective_permissions):
+    org = create_org(db_session, "acme")
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    delete = create_permission(db_session, "billing", "delete")
+    create = create_permission(db_session, "users", "create")
+    parent, role = Role(name="parent", organization_id=org.id), Role(name="viewer", organization_id=org.id)
+    group = Group(name="ops", organization_id=org.id)
+    db_session.add_all([parent, role, group])
+    db_session.commit()
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=staff.id)
+
+    staff_repository.assign_role_to_user(staff.id, role.id)
+    owner_repository.add_role_parent(role.id, parent.id)
+    owner_repository.assign_permission_to_role(parent.id, read.id)
+    owner_repository.assign_role_to_group(group.id, parent.id)
+    owner_repository.assign_permission_to_user(staff.id, create.id)
+    staff_repository.bulk_assign_users_to_groups([(staff.id, group.id)])
+    owner_repository.bulk_assign_permissions_to_roles([(role.id, delete.id)])
+
+    assert set(db_session.query(UserEffectivePermission.org_id, UserEffectivePermission.permission_id,
+                                UserEffectivePermission.source)) == {
+        (org.id, read.id, "role"), (org.id, delete.id, "role"), (org.id, read.id, "group"),
+        (None, create.id, "direct")}
+    assert check_effective_permissions(db_session) == ([], [])
+    assert staff_repository.get_permissions_for_user(staff.id) == {"billing": ["read", "delete"], "users": ["create"]}
+
+    owner_repository.remove_role_parent(role.id, parent.id)
+    assert check_effective_permissions(db_session) == ([], [])
+
+
+def test_effective_permissions_check_and_rebuild(db_session, effective_permissions):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    # Written behind the repository's back, so the table misses it until it is rebuilt
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+
+    assert check_effective_permissions(db_session) == ([(staff.id, None, read.id, "direct")], [])
+    assert rebuild_effective_permissions(db_session) == 1
+    assert check_effective_permissions(db_session) == ([], [])
+    db_session.query(UserPermission).delete()
+    db_session.commit()
+    assert check_effective_permissions(db_session) == ([], [(staff.id, None, read.id, "direct")])
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+def test_get_permission_holders_pages_through_every_path(db_session, monkeypatch, materialized):
+    monkeypatch.setattr(get_settings(), "effective_permissions_enabled", materialized)
+    org = create_org(db_session, "acme")
+    other_org = create_org(db_session, "other")
+    direct, by_role, by_group, outsider = (create_user(db_session, name, org)
+                                           for name in ("direct", "by_role", "by_group", "outsider"))
+    owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+    foreign = create_user(db_session, "foreign", other_org)
+    delete = create_permission(db_session, "billing", "delete")
+    parent, role = Role(name="parent", organization_id=org.id), Role(name="child", organization_id=org.id)
+    foreign_role = Role(name="parent", organization_id=other_org.id)
+    group = Group(name="ops", organization_id=org.id)
+    db_session.add_all([parent, role, foreign_role, group])
+    db_session.commit()
+    owner_repository = RBACRepository(db_session, org_id=org.id, user_id=owner.id)
+    owner_repository.assign_permission_to_user(direct.id, delete.id)
+    owner_repository.assign_permission_to_role(parent.id, delete.id)
+    owner_repository.add_role_parent(role.id, parent.id)
+    owner_repository.assign_role_to_group(group.id, role.id)
+    staff_repository = RBACRepository(db_session, org_id=org.id, user_id=direct.id)
+    staff_repository.bulk_assign_roles_to_users([(by_role.id, role.id), (direct.id, role.id)])
+    staff_repository.bulk_assign_users_to_groups([(by_group.id, group.id)])
+    RBACRepository(db_session, org_id=other_org.id, is_super_admin=True).bulk_assign_permissions_to_roles(
+        [(foreign_role.id, delete.id)])
+    db_session.add(UserRole(user_id=foreign.id, role_id=foreign_role.id))
+    db_session.commit()
+
+    first_page, cursor = owner_repository.get_permission_holders("billing", "delete", limit=2)
+    second_page, last_cursor = owner_repository.get_permission_holders("billing", "delete", limit=2, cursor=cursor)
+    assert [(user.id, sources) for user, sources in first_page + second_page] == [
+        (direct.id, ["direct", "role"]), (by_role.id, ["role"]), (by_group.id, ["group"])]
+    assert last_cursor is None
+    with pytest.raises(ValueError):
+        owner_repository.get_permission_holders("billing", "approve")
+    # A permission created after the catalogue was loaded is found once it is reloaded
+    approve = create_permission(db_session, "billing", "approve")
+    owner_repository.assign_permission_to_user(direct.id, approve.id)
+    holders, _ = owner_repository.get_permission_holders("billing", "approve")
+    assert [(user.id, sources) for user, sources in holders] == [(direct.id, ["direct"])]
+
+
+def test_permission_holders_endpoint(test_app_with_session, db_session):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+
+    response = test_app_with_session.get(f"/access-control/{org.id}/permissions/billing/read/holders?limit=1")
+    assert response.status_code == 200
+    assert response.json() == [{"user_id": staff.id, "name": "staff", "email": "staff@test.com",
+                                "sources": ["direct"]}]
+    response = test_app_with_session.get(f"/access-control/{org.id}/permissions/billing/read/holders",
+                                         params={"cursor": response.headers["X-Next-Cursor"]})
+    assert response.json() == []
+    response = test_app_with_session.get(f"/access-control/{org.id}/permissions/billing/nope/holders")
+    assert response.status_code == 400
+
+
+def test_permission_holders_endpoint_honors_if_none_match(test_app_with_session, db_session, tmp_path):
+    org = create_org(db_session, "acme")
+    staff = create_user(db_session, "staff", org)
+    read = create_permission(db_session, "billing", "read")
+    db_session.add(UserPermission(user_id=staff.id, permission_id=read.id))
+    db_session.commit()
+    url = f"/access-control/{org.id}/permissions/billing/read/holders"
+
+    # Without a shared cache the RBAC version is per process, so holders get no ETag
+    response = test_app_with_session.get(url)
+    assert "ETag" not in response.headers and response.headers["Cache-Control"] == "private, no-cache"
+
+    set_shared_cache(LocalFileCache(str(tmp_path)))
+    try:
+        response = test_app_with_session.get(url)
+        etag = response.headers["ETag"]
+        response = test_app_with_session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.headers["ETag"] == etag
+        assert test_app_with_session.get(url, params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+
+        # Granting through the repository bumps the organization's RBAC version
+        owner = create_user(db_session, "owner", org, OrgUserTypeEnum.ORG_OWNER)
+        other = create_user(db_session, "other", org)
+        RBACRepository(db_session, org_id=org.id, user_id=owner.id).assign_permission_to_user(other.id, read.id)
+        response = test_app_with_session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200 and len(response.json()) == 2
+        etag = response.headers["ETag"]
+
+        test_app_with_session.patch(f"/users/{other.id}", json={"name": "renamed"})
+        response = test_app_with_session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.json()[1]["name"] == "renamed"
+    finally:
+        set_shared_cache(None)
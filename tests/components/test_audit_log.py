@@ -0,0 +1,132 @@
+import gzip
+import json
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.components.audit_log import service as audit_service
+from src.components.audit_log.partitions import apply_retention, list_partitions, rollover
+from src.components.audit_log.repository import AuditLogRepository
+from src.components.audit_log.writer import AuditLogWriter, make_entry
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.config import Settings
+from src.core.db import Base
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def get_entries(session_factory):
+    """Every stored entry, oldest first."""
+    with session_factory() as session:
+        entries, _ = AuditLogRepository(session).get_entries(limit=1000)
+    return list(reversed(entries))
+
+
+def test_writer_batches_entries_and_drains_on_stop():
+    session_factory = make_session_factory()
+    writer = AuditLogWriter(session_factory, batch_size=3, flush_interval=60)
+    writer.start()
+    for i in range(7):
+        writer.record(make_entry(1, f"user.update:{i}"))
+    assert writer.drain(timeout=5)
+
+    assert [entry["action"] for entry in get_entries(session_factory)] == [f"user.update:{i}" for i in range(7)]
+    assert writer.stats()["written"] == 7
+
+
+def test_writer_drops_when_full():
+    writer = AuditLogWriter(make_session_factory(), queue_size=2, overflow_policy="drop")
+    for i in range(5):
+        writer.record(make_entry(None, "user.create"))
+    assert writer.stats()["enqueued"] == 2
+    assert writer.stats()["dropped"] == 3
+
+
+def test_writer_spills_overflow_and_replays_it(tmp_path):
+    spill_path = str(tmp_path / "audit_spill.ndjson")
+    session_factory = make_session_factory()
+    writer = AuditLogWriter(session_factory, queue_size=2, overflow_policy="spill", spill_path=spill_path)
+    for i in range(5):
+        writer.record(make_entry(None, f"user.create:{i}"))
+    with open(spill_path) as spill_file:
+        assert [json.loads(line)["action"] for line in spill_file] == ["user.create:2", "user.create:3",
+                                                                       "user.create:4"]
+
+    writer.start()
+    assert writer.drain(timeout=5)
+    assert sorted(entry["action"] for entry in get_entries(session_factory)) == [f"user.create:{i}" for i in range(5)]
+
+
+def test_services_record_mutations_when_enabled(test_app_with_db):
+    session_factory = make_session_factory()
+    audit_service.start_audit_writer(Settings(audit_enabled=True, audit_flush_interval=0.01), session_factory)
+    try:
+        response = test_app_with_db.post("/users/", headers={"X-User-Id": "42"},
+                                         json={"name": "user1", "email": "user1@test.com", "auth0_id": "1"})
+        user_id = response.json()["id"]
+        test_app_with_db.patch(f"/users/{user_id}", json={"name": "renamed"})
+    finally:
+        audit_service.stop_audit_writer(timeout=5)
+
+    assert [(entry["user_id"], entry["action"]) for entry in get_entries(session_factory)] == [
+        (42, f"user.create:{user_id}"), (None, f"user.update:{user_id}")]
+
+
+def test_entries_are_partitioned_by_month_and_paged_across_partitions():
+    session_factory = make_session_factory()
+    with session_factory() as session:
+        repository = AuditLogRepository(session)
+        repository.bulk_create([
+            {"user_id": user_id, "org_id": 7 if user_id == 2 else None, "action": f"{month}:{user_id}",
+             "created_at": datetime(2026, month, 15)}
+            for month in (8, 9, 10) for user_id in (1, 2)
+        ])
+        assert list_partitions(session.connection()) == ["audit_log_p202608", "audit_log_p202609",
+                                                         "audit_log_p202610"]
+
+        actions, cursor = [], None
+        while True:
+            entries, cursor = repository.get_entries(user_id=1, limit=2, cursor=cursor)
+            actions += [entry["action"] for entry in entries]
+            if not cursor:
+                break
+        assert actions == ["10:1", "9:1", "8:1"]
+
+        entries, _ = repository.get_entries(since=datetime(2026, 9, 1), until=datetime(2026, 10, 1))
+        assert [entry["action"] for entry in entries] == ["9:2", "9:1"]
+        entries, _ = repository.get_entries(org_id=7)
+        assert [entry["action"] for entry in entries] == ["10:2", "9:2", "8:2"]
+
+
+def test_retention_archives_and_drops_old_partitions(tmp_path):
+    session_factory = make_session_factory()
+    engine = session_factory.kw["bind"]
+    with session_factory() as session:
+        AuditLogRepository(session).bulk_create([{"user_id": 1, "action": "old", "created_at": datetime(2025, 1, 5)},
+                                                 {"user_id": 1, "action": "new", "created_at": datetime(2026, 9, 5)}])
+    with engine.begin() as connection:
+        assert rollover(connection, now=datetime(2026, 10, 18)) == ["audit_log_p202610", "audit_log_p202611"]
+        assert apply_retention(connection, 12, now=datetime(2026, 10, 18), archive_dir=str(tmp_path)) == [
+            "audit_log_p202501"]
+        assert list_partitions(connection) == ["audit_log_p202609", "audit_log_p202610", "audit_log_p202611"]
+    with gzip.open(tmp_path / "audit_log_p202501.ndjson.gz", "rt") as archive:
+        assert [json.loads(line)["action"] for line in archive] == ["old"]
+
+
+def test_audit_log_endpoint_is_restricted_to_super_admins(test_app_with_auth, db_session):
+    admin = User(name="admin", email="admin@test.com", auth0_id="1", user_type=UserTypeEnum.SUPER_ADMIN)
+    user = User(name="user", email="user@test.com", auth0_id="2", user_type=UserTypeEnum.ORG_USER)
+    db_session.add_all([admin, user])
+    db_session.commit()
+    assert test_app_with_auth.get("/audit-log/", headers={"X-User-Id": str(user.id)}).status_code == 403
+
+    response = test_app_with_auth.get("/audit-log/", headers={"X-User-Id": str(admin.id)}, params={"user_id": user.id})
+    assert response.status_code == 200
+    assert response.json() == []
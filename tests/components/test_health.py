@@ -1,4 +1,15 @@
 def test_health(test_app):
     response = test_app.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"environment": "dev", "status": "active", "testing": True}
+    response_data = response.json()
+    assert {key: response_data[key] for key in ("environment", "status", "testing")} == {
+        "environment": "dev", "status": "active", "testing": True}
+
+
+def test_health_reports_pool_metrics(test_app):
+    test_app.get("/health")
+    pool = test_app.get("/health").json()["database_pool"]["sync"]
+    assert pool["pool"] == "InstrumentedQueuePool"
+    assert {"size", "checked_out", "overflow", "checkouts", "timeouts", "wait_time_avg_ms",
+            "wait_time_max_ms"} <= pool.keys()
+    assert pool["checkouts"] >= 1
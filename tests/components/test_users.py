@@ -61,3 +61,201 @@ def test_delete_user(test_app_with_db):
     user_id = response.json()["id"]
     response = test_app_with_db.delete(f"/users/{user_id}")
     assert response.status_code == 200
+
+
+def test_read_users_with_cursor_pagination(test_app_with_db):
+    for i in range(7):
+        test_app_with_db.post("/users/", content=json.dumps(
+            {"name": f"user{i}", "email": f"user{i}@test.com", "auth0_id": f"123456{i}", "is_active": True}))
+    names, cursor = [], None
+    while True:
+        response = test_app_with_db.get("/users/", params={"limit": 3, "sort_by": "email", "sort_order": "desc",
+                                                           **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names += [user["name"] for user in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == [f"user{i}" for i in reversed(range(7))]
+
+
+def test_read_users_ranked_by_relevance_page_by_offset(test_app_with_db):
+    for i in range(4):
+        test_app_with_db.post("/users/", content=json.dumps(
+            {"name": f"user{i}", "email": f"user{i}@test.com", "auth0_id": f"123456{i}", "is_active": True}))
+    response = test_app_with_db.get("/users/", params={"search_query": "user", "limit": 2})
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+    response = test_app_with_db.get("/users/", params={"search_query": "user", "limit": 2, "sort_by": "email"})
+    assert response.headers["X-Next-Cursor"]
+
+
+def test_read_users_with_cursor_rejects_unindexed_sort_key(test_app_with_db):
+    response = test_app_with_db.get("/users/", params={"limit": 1})
+    cursor = response.headers.get("X-Next-Cursor")
+    response = test_app_with_db.get("/users/", params={"sort_by": "name", "cursor": cursor or "x"})
+    assert response.status_code == 400
+
+
+def test_read_users_with_invalid_cursor(test_app_with_db):
+    response = test_app_with_db.get("/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor."
+
+
+def test_import_users_ndjson_reports_row_errors(test_app_with_db):
+    test_app_with_db.post("/users/", json={"name": "taken", "email": "taken@test.com", "auth0_id": "taken"})
+    lines = [
+        json.dumps({"name": "user1", "email": "user1@test.com", "auth0_id": "a1"}),
+        json.dumps({"name": "user2", "email": "not-an-email", "auth0_id": "a2"}),
+        "{broken",
+        "",
+        json.dumps({"name": "user3", "email": "taken@test.com", "auth0_id": "a3"}),
+        json.dumps({"name": "user4", "email": "user4@test.com", "auth0_id": "a1"}),
+        json.dumps({"name": "user5", "email": "user5@test.com", "auth0_id": "a5", "user_type": "super_admin"}),
+    ]
+    response = test_app_with_db.post("/users/import", content="\n".join(lines),
+                                     headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    assert result["failed"] == 4
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5, 6]
+    assert result["errors"][0]["error"].startswith("email:")
+
+    names = [user["name"] for user in test_app_with_db.get("/users/", params={"limit": 10}).json()]
+    assert names == ["taken", "user1", "user5"]
+
+
+def test_import_users_csv(test_app_with_db):
+    body = "name,email,auth0_id,user_type\r\nuser1,user1@test.com,a1,\r\n\"Doe, Jane\",jane@test.com,a2,super_admin\r\n"
+    response = test_app_with_db.post("/users/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.json() == {"created": 2, "failed": 0, "errors": []}
+
+
+def test_import_users_csv_with_multiline_fields(test_app_with_db):
+    body = ('name,email,auth0_id\r\n"Jane\r\nDoe",jane@test.com,a1\r\nuser2,not-an-email,a2\r\n'
+            '"Line\n\nbreaks",lines@test.com,a3\r\n"unterminated,open@test.com,a4\r\n')
+    response = test_app_with_db.post("/users/import", content=body, headers={"Content-Type": "text/csv"})
+    result = response.json()
+    assert result["created"] == 2
+    assert [error["line"] for error in result["errors"]] == [4, 8]
+    assert result["errors"][1]["error"] == "Unterminated quoted field."
+    names = [user["name"] for user in test_app_with_db.get("/users/", params={"limit": 10}).json()]
+    assert names == ["Jane\nDoe", "Line\n\nbreaks"]
+
+
+def test_import_users_rejects_unknown_content_type(test_app_with_db):
+    response = test_app_with_db.post("/users/import", content="{}", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+
+def test_export_users(test_app_with_db):
+    lines = "\n".join(json.dumps({"name": f"user{i}", "email": f"user{i}@test.com", "auth0_id": f"a{i}"})
+                      for i in range(5))
+    test_app_with_db.post("/users/import", content=lines, headers={"Content-Type": "application/x-ndjson"})
+
+    response = test_app_with_db.get("/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["name"] for user in exported] == [f"user{i}" for i in range(5)]
+
+    response = test_app_with_db.get("/users/export", params={"format": "csv"})
+    rows = response.text.splitlines()
+    assert rows[0] == "id,auth0_id,name,email,is_active,user_type,created_at,updated_at"
+    assert len(rows) == 6
+
+
+def _seed_memberships(db_session, count):
+    from src.components.access_control.models import (FeatureModule, Group, Permission, Role, UserGroup,
+                                                      UserPermission, UserRole)
+    from src.components.organizations.models import Organization, OrgUserTypeEnum, UserOrganization
+    from src.components.users.models import User
+
+    org = Organization(name="acme", slug="acme")
+    module = FeatureModule(name="billing")
+    db_session.add_all([org, module])
+    db_session.flush()
+    role, group = Role(name="viewer", organization_id=org.id), Group(name="finance", organization_id=org.id)
+    permission = Permission(module_id=module.id, action="read")
+    db_session.add_all([role, group, permission])
+    db_session.flush()
+    for i in range(count):
+        user = User(name=f"user{i}", email=f"user{i}@example.com", auth0_id=f"auth0|{i}", user_type="ORG_USER")
+        db_session.add(user)
+        db_session.flush()
+        db_session.add_all([UserOrganization(user_id=user.id, organization_id=org.id,
+                                             user_type=OrgUserTypeEnum.ORG_STAFF),
+                            UserRole(user_id=user.id, role_id=role.id), UserGroup(user_id=user.id, group_id=group.id),
+                            UserPermission(user_id=user.id, permission_id=permission.id)])
+    db_session.commit()
+    db_session.expunge_all()
+
+
+def test_expand_loads_relationships_in_constant_queries(test_app_with_session, db_session):
+    from sqlalchemy import event
+
+    _seed_memberships(db_session, 100)
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    response = test_app_with_session.get("/users/", params={"limit": 100,
+                                                            "expand": "organizations,roles,groups,permissions"})
+    assert response.status_code == 200
+    users = response.json()
+    assert len(users) == 100
+    assert users[0]["organizations"] == [{"id": 1, "name": "acme", "user_type": "org_staff"}]
+    assert users[0]["roles"] == [{"id": 1, "name": "viewer", "organization_id": 1}]
+    assert users[0]["groups"] == [{"id": 1, "name": "finance", "organization_id": 1}]
+    assert users[0]["permissions"] == [{"id": 1, "module": "billing", "action": "read"}]
+    # The page itself, then one query per expanded relationship, whatever the page size
+    assert len(statements) == 5
+
+    statements.clear()
+    db_session.expunge_all()
+    response = test_app_with_session.get("/users/1", params={"expand": "roles"})
+    assert response.json()["roles"] == [{"id": 1, "name": "viewer", "organization_id": 1}]
+    assert "groups" not in response.json() and "updated_at" in response.json()
+    assert len(statements) == 2
+
+    assert "roles" not in test_app_with_session.get("/users/", params={"limit": 1}).json()[0]
+    assert test_app_with_session.get("/users/", params={"expand": "secrets"}).status_code == 400
+
+
+def test_get_user_answers_if_none_match_without_reading_the_user(test_app_with_session, db_session, tmp_path):
+    from sqlalchemy import event
+
+    from src.utils.shared_cache import LocalFileCache, set_shared_cache
+
+    user_id = test_app_with_session.post("/users/", content=json.dumps(
+        {"name": "user1", "email": "user1@example.com", "auth0_id": "123456"})).json()["id"]
+    response = test_app_with_session.get(f"/users/{user_id}")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    # Without a shared cache the ETag is derived from the row every time, as other workers' updates go unseen
+    response = test_app_with_session.get(f"/users/{user_id}", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag and response.content == b""
+    assert statements != []
+
+    set_shared_cache(LocalFileCache(str(tmp_path)))
+    try:
+        test_app_with_session.get(f"/users/{user_id}")
+        statements.clear()
+        response = test_app_with_session.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304 and statements == []
+
+        test_app_with_session.patch(f"/users/{user_id}", content=json.dumps({"name": "renamed"}))
+        response = test_app_with_session.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["name"] == "renamed" and response.headers["ETag"] != etag
+    finally:
+        set_shared_cache(None)
+
+    # Expanded users also change with their grants, so they are not given an ETag
+    response = test_app_with_session.get(f"/users/{user_id}", params={"expand": "roles"})
+    assert "ETag" not in response.headers and response.headers["Cache-Control"] == "private, no-cache"
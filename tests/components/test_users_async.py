@@ -0,0 +1,62 @@
+import json
+
+
+def test_create_and_read_user(test_async_app_with_db):
+    response = test_async_app_with_db.post("/users/", json={"name": "user1", "email": "user1@test.com",
+                                                             "auth0_id": "123456"})
+    assert response.status_code == 201
+    user_id = response.json()["id"]
+
+    response = test_async_app_with_db.get(f"/users/{user_id}")
+    response_data = response.json()
+    assert response.status_code == 200
+    assert response_data["name"] == "user1"
+    assert response_data["user_type"] == "org_user"
+    assert response_data["created_at"] is not None
+
+
+def test_read_users_with_search(test_async_app_with_db):
+    for i in range(3):
+        test_async_app_with_db.post("/users/", json={"name": f"user{i}", "email": f"user{i}@test.com",
+                                                     "auth0_id": f"123456{i}"})
+    response = test_async_app_with_db.get("/users/?search_query=user1")
+    assert response.status_code == 200
+    assert [user["name"] for user in response.json()] == ["user1"]
+
+
+def test_update_and_delete_user(test_async_app_with_db):
+    response = test_async_app_with_db.post("/users/", json={"name": "user1", "email": "user1@test.com",
+                                                             "auth0_id": "123456"})
+    user_id = response.json()["id"]
+
+    response = test_async_app_with_db.patch(f"/users/{user_id}", json={"name": "renamed"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "renamed"
+
+    response = test_async_app_with_db.delete(f"/users/{user_id}")
+    assert response.status_code == 200
+    assert test_async_app_with_db.get(f"/users/{user_id}").json()["is_active"] is False
+
+
+def test_read_user_not_found(test_async_app_with_db):
+    response = test_async_app_with_db.get("/users/999")
+    assert response.status_code == 404
+
+
+def test_check_permissions(test_async_app_with_db):
+    response = test_async_app_with_db.post("/access-control/1/permissions/check", json={
+        "user_ids": [1], "permissions": [{"module": "billing", "action": "read"}]})
+    assert response.status_code == 200
+    assert response.json()["matrix"] == [[False]]
+
+
+def test_import_and_export_users(test_async_app_with_db):
+    lines = "\n".join(json.dumps({"name": f"user{i}", "email": f"user{i}@test.com", "auth0_id": f"a{i}"})
+                      for i in range(3))
+    response = test_async_app_with_db.post("/users/import", content=lines + "\n" + lines.splitlines()[0],
+                                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.json()["created"] == 3
+    assert [error["line"] for error in response.json()["errors"]] == [4]
+
+    response = test_async_app_with_db.get("/users/export")
+    assert [json.loads(line)["name"] for line in response.text.splitlines()] == ["user0", "user1", "user2"]
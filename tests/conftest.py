@@ -4,11 +4,16 @@ import uuid
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
+from src.components.access_control.bitset import invalidate_permission_catalogue
+from src.components.access_control.cache import clear_permission_caches
+from src.components.organizations.cache import membership_cache
+from src.components.users.cache import user_etag_cache
 from src.config import Settings, get_settings
-from src.core.db import Base, get_db
+from src.core.db import Base, get_async_db, get_db
 from src.main import create_application
 
 
@@ -55,8 +60,8 @@ def test_app_with_db():
     # Create all tables in the test database
     Base.metadata.create_all(bind=engine)
 
-    # Create FastAPI application
-    app = create_application()
+    # Create FastAPI application; these tests exercise the routes themselves, authorization has its own fixture
+    app = create_application(Settings(authorization_enabled=False))
 
     # Override the dependency
     def override_get_db():
@@ -74,6 +79,10 @@ def test_app_with_db():
 
     # Cleanup
     test_session.remove()
+    invalidate_permission_catalogue()
+    clear_permission_caches()
+    membership_cache.clear()
+    user_etag_cache.clear()
     engine.dispose()
     Base.metadata.drop_all(bind=engine)
 
@@ -81,3 +90,80 @@ def test_app_with_db():
     db_file = database_url.replace("sqlite:///", "")
     if os.path.exists(db_file):
         os.remove(db_file)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Fixture that yields a session bound to a fresh in-memory database"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    yield session
+
+    # Cleanup
+    session.close()
+    invalidate_permission_catalogue()
+    clear_permission_caches()
+    membership_cache.clear()
+    user_etag_cache.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def test_app_with_session(db_session):
+    """Fixture that serves the FastAPI app from the ``db_session`` database so tests can seed it directly"""
+    app = create_application(Settings(authorization_enabled=False))
+    app.dependency_overrides[get_db] = lambda: db_session  # noqa
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def test_app_with_auth(db_session):
+    """Like ``test_app_with_session`` but with route authorization enforced"""
+    app = create_application(Settings(authorization_enabled=True))
+    app.dependency_overrides[get_db] = lambda: db_session  # noqa
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def test_async_app_with_db():
+    """Fixture that serves the async routes from a fresh database for each test function"""
+    database_url = get_test_db_url()
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+
+    # Connections are opened on the TestClient's event loop, so they must not outlive it in a pool
+    async_engine = create_async_engine(database_url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    local_test_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    app = create_application(Settings(database_async=True, authorization_enabled=False))
+
+    async def override_get_async_db():
+        async with local_test_session() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db  # noqa
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+    # Cleanup
+    invalidate_permission_catalogue()
+    clear_permission_caches()
+    membership_cache.clear()
+    user_etag_cache.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    db_file = database_url.replace("sqlite:///", "")
+    if os.path.exists(db_file):
+        os.remove(db_file)
@@ -0,0 +1,203 @@
+from sqlalchemy import event
+
+from src.components.access_control.cache import invalidate_user_permissions
+from src.components.access_control.models import (
+    FeatureModule,
+    Group,
+    Permission,
+    Role,
+    RolePermission,
+    UserGroup,
+    UserRole,
+)
+from src.components.organizations.models import Organization, OrgUserTypeEnum, UserOrganization
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+
+
+def add_user(db, name, user_type=UserTypeEnum.ORG_USER, org=None, org_user_type=OrgUserTypeEnum.ORG_STAFF):
+    user = User(name=name, email=f"{name}@test.com", auth0_id=name, user_type=user_type)
+    db.add(user)
+    db.flush()
+    if org:
+        db.add(UserOrganization(user_id=user.id, organization_id=org.id, user_type=org_user_type))
+    db.commit()
+    return user
+
+
+def grant_through_role(db, org, user, module_name, action):
+    module = db.query(FeatureModule).filter(FeatureModule.name == module_name).first()
+    if module is None:
+        module = FeatureModule(name=module_name)
+        db.add(module)
+        db.flush()
+    permission = Permission(module_id=module.id, action=action)
+    role = Role(name=f"{module_name}-{action}", organization_id=org.id)
+    db.add_all([permission, role])
+    db.flush()
+    db.add_all([RolePermission(role_id=role.id, permission_id=permission.id),
+                UserRole(user_id=user.id, role_id=role.id)])
+    db.commit()
+
+
+def test_requests_without_a_known_caller_are_rejected(test_app_with_auth):
+    assert test_app_with_auth.get("/users/").status_code == 401
+    assert test_app_with_auth.get("/users/", headers={"X-User-Id": "999"}).status_code == 401
+
+
+def test_super_admins_and_org_managers_are_let_through(test_app_with_auth, db_session):
+    org = Organization(name="acme", slug="acme")
+    db_session.add(org)
+    db_session.commit()
+    admin = add_user(db_session, "admin", UserTypeEnum.SUPER_ADMIN)
+    owner = add_user(db_session, "owner", org=org, org_user_type=OrgUserTypeEnum.ORG_OWNER)
+    grant_through_role(db_session, org, admin, "users", "read")
+
+    assert test_app_with_auth.get("/users/", headers={"X-User-Id": str(admin.id)}).status_code == 200
+    assert test_app_with_auth.get("/users/", headers={"X-User-Id": str(owner.id)}).status_code == 403
+    # /users/ reaches every organization, so managing one does not lift its checks
+    assert test_app_with_auth.get("/users/", headers={"X-User-Id": str(owner.id),
+                                                      "X-Org-Id": str(org.id)}).status_code == 403
+    # Routes taking the organization from the path only reach that organization's data
+    assert test_app_with_auth.get(f"/access-control/{org.id}/permissions/users/read/holders",
+                                  headers={"X-User-Id": str(owner.id)}).status_code == 200
+
+
+def test_staff_need_the_permission_in_the_organization(test_app_with_auth, db_session):
+    org = Organization(name="acme", slug="acme")
+    db_session.add(org)
+    db_session.commit()
+    staff = add_user(db_session, "staff", org=org)
+    headers = {"X-User-Id": str(staff.id), "X-Org-Id": str(org.id)}
+    assert test_app_with_auth.get(f"/users/{staff.id}", headers=headers).status_code == 403
+
+    grant_through_role(db_session, org, staff, "users", "read")
+    # Seeded behind the repository's back, so drop the permissions cached by the first request
+    invalidate_user_permissions([staff.id])
+    assert test_app_with_auth.get(f"/users/{staff.id}", headers=headers).status_code == 200
+    assert test_app_with_auth.delete(f"/users/{staff.id}", headers=headers).status_code == 403
+
+
+def test_warm_requests_authorize_without_queries(test_app_with_auth, db_session):
+    org = Organization(name="acme", slug="acme")
+    db_session.add(org)
+    db_session.commit()
+    staff = add_user(db_session, "staff", org=org)
+    grant_through_role(db_session, org, staff, "users", "read")
+    headers = {"X-User-Id": str(staff.id), "X-Org-Id": str(org.id)}
+    user_id = staff.id
+    test_app_with_auth.get(f"/users/{user_id}", headers=headers)
+    db_session.expunge_all()
+
+    statements = []
+    event.listen(db_session.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert test_app_with_auth.get(f"/users/{user_id}", headers=headers).status_code == 200
+    # Only the endpoint's own lookup of the user reaches the database
+    assert len(statements) == 1
+
+
+def test_only_super_admins_set_the_user_type(test_app_with_auth, db_session):
+    org = Organization(name="acme", slug="acme")
+    db_session.add(org)
+    db_session.commit()
+    admin = add_user(db_session, "admin", UserTypeEnum.SUPER_ADMIN)
+    owner = add_user(db_session, "owner", org=org, org_user_type=OrgUserTypeEnum.ORG_OWNER)
+    grant_through_role(db_session, org, owner, "users", "update")
+    headers = {"X-User-Id": str(owner.id), "X-Org-Id": str(org.id)}
+
+    response = test_app_with_auth.patch(f"/users/{owner.id}", json={"user_type": "super_admin"}, headers=headers)
+    assert response.status_code == 403
+    assert test_app_with_auth.patch(f"/users/{owner.id}", json={"name": "renamed"}, headers=headers).status_code == 200
+    db_session.expire_all()
+    assert db_session.get(User, owner.id).user_type == UserTypeEnum.ORG_USER
+
+    response = test_app_with_auth.patch(f"/users/{owner.id}", json={"user_type": "super_admin"},
+                                        headers={"X-User-Id": str(admin.id)})
+    assert response.status_code == 200 and response.json()["user_type"] == "super_admin"
+
+
+def test_bulk_assignments_need_the_update_permission(test_app_with_auth, db_session):
+    org = Organization(name="acme", slug="acme")
+    db_session.add(org)
+    db_session.commit()
+    owner = add_user(db_session, "owner", org=org, org_user_type=OrgUserTypeEnum.ORG_OWNER)
+    staff = add_user(db_session, "staff", org=org)
+    url = f"/access-control/{org.id}/assignments/bulk"
+
+    assert test_app_with_auth.post(url, json={}, headers={"X-User-Id": str(staff.id)}).status_code == 403
+    assert test_app_with_auth.post(url, json={}, headers={"X-User-Id": str(owner.id)}).status_code == 200
+
+
+def test_global_routes_only_reach_the_named_organization(test_app_with_auth, db_session):
+    org, other_org = Organization(name="acme", slug="acme"), Organization(name="other", slug="other")
+    db_session.add_all([org, other_org])
+    db_session.commit()
+    owner = add_user(db_session, "owner", org=org, org_user_type=OrgUserTypeEnum.ORG_OWNER)
+    colleague = add_user(db_session, "colleague", org=org)
+    foreign = add_user(db_session, "foreign", org=other_org)
+    for action in ("read", "update", "delete"):
+        grant_through_role(db_session, org, owner, "users", action)
+    headers = {"X-User-Id": str(owner.id), "X-Org-Id": str(org.id)}
+
+    assert {user["id"] for user in test_app_with_auth.get("/users/", headers=headers).json()} == {owner.id,
+                                                                                                 colleague.id}
+    assert test_app_with_auth.get(f"/users/{foreign.id}", headers=headers).status_code == 404
+    assert test_app_with_auth.patch(f"/users/{foreign.id}", json={"name": "taken"}, headers=headers).status_code == 404
+    assert test_app_with_auth.delete(f"/users/{foreign.id}", headers=headers).status_code == 404
+    assert test_app_with_auth.patch(f"/users/{colleague.id}", json={"name": "renamed"},
+                                    headers=headers).status_code == 200
+    # Grants only count in an organization the caller belongs to
+    response = test_app_with_auth.get("/users/", headers={"X-User-Id": str(owner.id), "X-Org-Id": str(other_org.id)})
+    assert response.status_code == 403
+
+
+def test_expansions_only_include_the_named_organization(test_app_with_auth, db_session):
+    org, other_org = Organization(name="acme", slug="acme"), Organization(name="other", slug="other")
+    db_session.add_all([org, other_org])
+    db_session.commit()
+    owner = add_user(db_session, "owner", org=org, org_user_type=OrgUserTypeEnum.ORG_OWNER)
+    grant_through_role(db_session, org, owner, "users", "read")
+    colleague = add_user(db_session, "colleague", org=org)
+    db_session.add(UserOrganization(user_id=colleague.id, organization_id=other_org.id,
+                                    user_type=OrgUserTypeEnum.ORG_STAFF))
+    groups = [Group(name=f"{tenant.slug}-team", organization_id=tenant.id) for tenant in (org, other_org)]
+    db_session.add_all(groups)
+    db_session.commit()
+    db_session.add_all([UserGroup(user_id=colleague.id, group_id=group.id) for group in groups])
+    db_session.commit()
+    grant_through_role(db_session, other_org, colleague, "secrets", "read")
+    headers = {"X-User-Id": str(owner.id), "X-Org-Id": str(org.id)}
+
+    response = test_app_with_auth.get(f"/users/{colleague.id}", params={"expand": "organizations,roles,groups"},
+                                      headers=headers)
+    assert [membership["name"] for membership in response.json()["organizations"]] == ["acme"]
+    assert response.json()["roles"] == []
+    assert [group["name"] for group in response.json()["groups"]] == ["acme-team"]
+    admin = add_user(db_session, "admin", UserTypeEnum.SUPER_ADMIN)
+    response = test_app_with_auth.get(f"/users/{colleague.id}", params={"expand": "organizations,roles,groups"},
+                                      headers={"X-User-Id": str(admin.id)})
+    assert len(response.json()["organizations"]) == len(response.json()["groups"]) == 2
+    assert [role["name"] for role in response.json()["roles"]] == ["secrets-read"]
+
+
+def test_audit_log_readers_only_see_their_organization(test_app_with_auth, db_session):
+    from datetime import datetime
+
+    from src.components.audit_log.repository import AuditLogRepository
+
+    org, other_org = Organization(name="acme", slug="acme"), Organization(name="other", slug="other")
+    db_session.add_all([org, other_org])
+    db_session.commit()
+    admin = add_user(db_session, "admin", UserTypeEnum.SUPER_ADMIN)
+    staff = add_user(db_session, "staff", org=org)
+    grant_through_role(db_session, org, staff, "audit_log", "read")
+    AuditLogRepository(db_session).bulk_create([
+        {"user_id": None, "org_id": org_id, "action": f"org:{org_id}", "created_at": datetime(2026, 10, 1)}
+        for org_id in (org.id, other_org.id)])
+
+    headers = {"X-User-Id": str(staff.id), "X-Org-Id": str(org.id)}
+    for params in ({}, {"org_id": other_org.id}):
+        response = test_app_with_auth.get("/audit-log/", params=params, headers=headers)
+        assert [entry["action"] for entry in response.json()] == [f"org:{org.id}"]
+    response = test_app_with_auth.get("/audit-log/", headers={"X-User-Id": str(admin.id)})
+    assert len(response.json()) == 2
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config import Settings
+from src.core.pool import configure_sqlite, get_engine_options, get_pool_status
+
+
+def test_sqlite_pragmas_are_applied(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    settings = Settings(sqlite_busy_timeout=1234)
+    engine = create_engine(url, **get_engine_options(make_url(url), settings))
+    configure_sqlite(engine, settings)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    engine.dispose()
+
+
+def test_pool_status_tracks_checkouts_and_timeouts(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    settings = Settings(database_pool_size=1, database_max_overflow=0, database_pool_timeout=0.01)
+    engine = create_engine(url, **get_engine_options(make_url(url), settings))
+
+    with engine.connect():
+        assert get_pool_status(engine)["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    status = get_pool_status(engine)
+    assert status["size"] == 1
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_time_max_ms"] >= 10
+    engine.dispose()
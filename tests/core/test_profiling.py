@@ -0,0 +1,57 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.config import Settings
+from src.core.db import get_db
+from src.core.profiling import ProfilingMiddleware, RequestProfile, get_request_profile, instrument_sql
+from src.main import create_application
+
+
+def test_profile_groups_statements():
+    profile = RequestProfile()
+    for seconds in (0.001, 0.003, 0.002):
+        profile.record("SELECT 1", seconds)
+    profile.record("SELECT 2", 0.005)
+
+    assert profile.statement_count == 4
+    assert profile.slowest(1) == [("SELECT 2", 0.005)]
+    assert profile.repeated(3) == [("SELECT 1", 3)]
+    assert profile.server_timing(0.02) == 'db;dur=11.000;desc="4 statements", app;dur=20.000'
+
+
+def test_server_timing_header(db_session):
+    app = create_application(Settings(authorization_enabled=False, profiling_enabled=True))
+    app.dependency_overrides[get_db] = lambda: db_session  # noqa
+
+    with TestClient(app) as client:
+        response = client.get("/users/")
+    assert response.status_code == 200
+    db_timing, app_timing = response.headers["Server-Timing"].split(", ")
+    assert db_timing.startswith("db;dur=")
+    assert not db_timing.endswith('desc="0 statements"')
+    assert app_timing.startswith("app;dur=")
+
+
+def test_repeated_statements_are_flagged(db_session, caplog):
+    instrument_sql()
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, repeat_threshold=3)
+
+    @app.get("/loop")
+    def loop():
+        for user_id in range(4):
+            db_session.execute(text("SELECT :user_id"), {"user_id": user_id})
+        return {"statements": get_request_profile().statement_count}
+
+    with caplog.at_level(logging.INFO, logger="uvicorn"):
+        response = TestClient(app).get("/loop")
+    assert response.json() == {"statements": 4}
+
+    profile_log = json.loads(next(record.message for record in caplog.records if "request_profile" in record.message))
+    assert profile_log["db_statements"] == 4
+    assert profile_log["repeated"] == [{"statement": "SELECT ?", "count": 4}]
+    assert any("Possible N+1" in record.message for record in caplog.records)
@@ -0,0 +1,114 @@
+import time
+from typing import Optional
+
+import pytest
+from fastapi import Header
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.components.users.models import User
+from src.components.users.repository import UserRepository
+from src.config import Settings
+from src.core.db import Base, get_db
+from src.core.routing import (
+    CLIENT,
+    LeastConnectionsSelector,
+    ReadYourWrites,
+    ReplicaSelector,
+    RoundRobinSelector,
+    RoutingSession,
+    create_replica_selector,
+)
+from src.main import create_application
+
+
+def _add_user(engine, name: str):
+    with sessionmaker(bind=engine)() as session:
+        session.add(User(name=name, email=f"{name}@example.com", auth0_id=f"auth0|{name}", user_type="ORG_USER"))
+        session.commit()
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary and replica SQLite files; the replica lags behind and misses the primary's last user."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.sqlite'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.sqlite'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+        _add_user(engine, "alice")
+    _add_user(primary, "bob")
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _names(users):
+    return [user.name for user in users]
+
+
+def test_read_only_methods_use_the_replica_until_the_session_writes(databases):
+    primary, replica = databases
+    session = RoutingSession(bind=primary, replicas=[replica])
+    repository = UserRepository(session)
+
+    assert _names(repository.get_all_users()) == ["alice"]
+    # Unmarked reads and lazy loads outside read_only methods stay on the primary
+    assert repository.get_user_by_id(2).name == "bob"
+
+    repository.create_user("carol", "carol@example.com", "auth0|carol", "ORG_USER")
+    assert _names(repository.get_all_users()) == ["alice", "bob", "carol"]
+    session.close()
+    assert _names(UserRepository(RoutingSession(bind=replica)).get_all_users()) == ["alice"]
+
+
+def test_writers_read_their_writes_from_the_primary_within_the_window(databases):
+    primary, replica = databases
+    factory = sessionmaker(class_=RoutingSession, bind=primary, replicas=[replica],
+                           read_your_writes=ReadYourWrites(window=0.2))
+    with factory(info={CLIENT: 7}) as session:
+        UserRepository(session).update_user(1, name="alicia")
+
+    with factory(info={CLIENT: 7}) as session:
+        assert _names(UserRepository(session).get_all_users()) == ["alicia", "bob"]
+    with factory(info={CLIENT: 8}) as session:
+        assert _names(UserRepository(session).get_all_users()) == ["alice"]
+    time.sleep(0.25)
+    with factory(info={CLIENT: 7}) as session:
+        assert _names(UserRepository(session).get_all_users()) == ["alice"]
+
+
+def test_replica_selectors(databases):
+    primary, replica = databases
+    selector = RoundRobinSelector()
+    assert [selector.select([primary, replica]) for _ in range(4)] == [primary, replica, primary, replica]
+
+    selector = LeastConnectionsSelector()
+    with replica.connect():
+        assert {selector.select([primary, replica]) for _ in range(4)} == {primary}
+    assert {selector.select([primary, replica]) for _ in range(4)} == {primary, replica}
+
+    assert isinstance(create_replica_selector("least_connections"), LeastConnectionsSelector)
+    with pytest.raises(TypeError):
+        ReplicaSelector()
+    with pytest.raises(ValueError):
+        create_replica_selector("random")
+
+
+def test_listing_endpoint_is_served_by_the_replica(databases):
+    primary, replica = databases
+    factory = sessionmaker(class_=RoutingSession, autoflush=False, bind=primary, replicas=[replica],
+                           read_your_writes=ReadYourWrites(window=60))
+    app = create_application(Settings(authorization_enabled=False))
+
+    def override_get_db(x_user_id: Optional[int] = Header(None)):
+        with factory(info={CLIENT: x_user_id}) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        assert [user["name"] for user in client.get("/users/").json()] == ["alice"]
+        assert client.get("/users/2").json()["name"] == "bob"
+        client.patch("/users/1", json={"name": "alicia"}, headers={"X-User-Id": "1"})
+        assert [user["name"] for user in client.get("/users/", headers={"X-User-Id": "1"}).json()] == ["alicia", "bob"]
+        assert [user["name"] for user in client.get("/users/", headers={"X-User-Id": "2"}).json()] == ["alice"]
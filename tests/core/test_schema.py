@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, event, inspect
+
+from src.config import Settings
+from src.core.db import Base
+from src.core.schema import ensure_schema, get_schema_fingerprint, read_schema_fingerprint
+from src.main import create_application
+
+
+def test_ensure_schema_skips_ddl_when_fingerprint_matches(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.sqlite'}")
+    assert read_schema_fingerprint(engine) is None
+    assert ensure_schema(engine, Base.metadata) is True
+    assert "user" in inspect(engine).get_table_names()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert ensure_schema(engine, Base.metadata) is False
+    # Only the fingerprint lookup, no DDL nor table probes
+    assert len(statements) == 1
+
+    changed = MetaData()
+    for table in Base.metadata.tables.values():
+        table.to_metadata(changed)
+    Table("extra", changed, Column("id", Integer, primary_key=True))
+    assert ensure_schema(engine, changed) is True
+    assert "extra" in inspect(engine).get_table_names()
+    engine.dispose()
+
+
+def test_ensure_schema_waits_for_migrations_before_recording_fingerprint(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.sqlite'}")
+    older = MetaData()
+    Table("account", older, Column("id", Integer, primary_key=True))
+    assert ensure_schema(engine, older) is True
+
+    current = MetaData()
+    Table("account", current, Column("id", Integer, primary_key=True), Column("org_id", Integer, index=True))
+    # create_all leaves the existing table alone, so the new column and index are still missing
+    assert ensure_schema(engine, current) is True
+    assert read_schema_fingerprint(engine) == get_schema_fingerprint(older, engine.dialect)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE account ADD COLUMN org_id INTEGER")
+        connection.exec_driver_sql("CREATE INDEX ix_account_org_id ON account (org_id)")
+    assert ensure_schema(engine, current) is True
+    assert ensure_schema(engine, current) is False
+    engine.dispose()
+
+
+def test_only_one_worker_runs_ddl(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.sqlite'}")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        applied = list(executor.map(lambda _: ensure_schema(engine, Base.metadata), range(4)))
+    assert applied.count(True) == 1
+    engine.dispose()
+
+
+def test_component_routers_load_on_first_request():
+    app = create_application(Settings(authorization_enabled=False))
+    assert not any(route.path.startswith("/users") for route in app.routes)
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert any(route.path.startswith("/users") for route in app.routes)
+    assert "/access-control/{org_id}/permissions/check" in create_application(Settings()).openapi()["paths"]
@@ -0,0 +1,44 @@
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.components.users.repository import UserRepository
+
+
+def add_user(db, name, email):
+    user = User(name=name, email=email, auth0_id=email, user_type=UserTypeEnum.ORG_USER)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def search(db, term):
+    return [user.name for user in UserRepository(db).get_all_users(search_query=term, limit=50)]
+
+
+def test_search_matches_substrings_through_index(db_session):
+    add_user(db_session, "Margaret Hamilton", "margaret@apollo.com")
+    add_user(db_session, "Grace Hopper", "grace@navy.mil")
+    assert search(db_session, "hamil") == ["Margaret Hamilton"]
+    assert search(db_session, "NAVY") == ["Grace Hopper"]
+
+
+def test_search_ranks_best_matches_first(db_session):
+    add_user(db_session, "Ada Lovelace", "countess@analytical.org")
+    add_user(db_session, "Ada Ada", "ada@ada.org")
+    assert search(db_session, "ada")[0] == "Ada Ada"
+
+
+def test_search_index_follows_updates_and_deletes(db_session):
+    user = add_user(db_session, "Alan Turing", "alan@bletchley.uk")
+    user.name = "Alonzo Church"
+    db_session.commit()
+    assert search(db_session, "turing") == []
+    assert search(db_session, "church") == ["Alonzo Church"]
+    db_session.delete(user)
+    db_session.commit()
+    assert search(db_session, "church") == []
+
+
+def test_short_terms_fall_back_to_like(db_session):
+    add_user(db_session, "Ken Thompson", "ken@bell-labs.com")
+    add_user(db_session, "Dennis Ritchie", "dmr@bell-labs.com")
+    assert search(db_session, "en") == ["Ken Thompson", "Dennis Ritchie"]
@@ -0,0 +1,22 @@
+from src.utils.etag import cache_headers, etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_strong_and_stable():
+    etag = make_etag("user", 1, None)
+    assert etag == make_etag("user", 1, None) and etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("user", 2, None)
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = make_etag("user", 1)
+    assert etag_matches(f'"a", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"a"', etag)
+    assert not etag_matches(None, etag) and not etag_matches(etag, None)
+
+
+def test_not_modified_carries_the_validators():
+    response = not_modified('"abc"', "private, no-cache")
+    assert response.status_code == 304 and response.body == b""
+    assert response.headers["ETag"] == '"abc"' and response.headers["Cache-Control"] == "private, no-cache"
+    assert cache_headers(None, "") == {}
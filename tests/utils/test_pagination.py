@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+
+from src.components.access_control.models import Role
+from src.components.users.models import User
+from src.utils.pagination import decode_cursor, encode_cursor, get_cursor_columns
+
+
+def test_cursor_columns_are_indexed_and_not_nullable():
+    assert get_cursor_columns(User) == {"id", "email", "auth0_id"}
+    # leading column of the (name, organization_id) unique constraint
+    assert "name" in get_cursor_columns(Role)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("created_at", "desc", datetime(2025, 1, 2, 3, 4, 5), 42)
+    assert decode_cursor(cursor) == {"k": "created_at", "o": "desc", "v": "2025-01-02T03:04:05", "id": 42}
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("e30")  # "{}"
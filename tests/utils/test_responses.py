@@ -0,0 +1,24 @@
+import json
+from datetime import datetime
+from typing import List
+
+from src.components.users.enums import UserTypeEnum
+from src.components.users.models import User
+from src.components.users.schema import UserDetail, UserShort
+from src.utils.responses import SchemaResponse
+
+
+def test_schema_response_renders_models_built_from_rows():
+    user = User(id=7, name="Ada", email="ada@example.com", auth0_id="auth0|7", user_type=UserTypeEnum.ORG_USER,
+                is_active=True, created_at=datetime(2025, 1, 2, 3, 4, 5))
+
+    response = SchemaResponse([UserShort.model_validate(user)], List[UserShort], headers={"X-Next-Cursor": "abc"})
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert json.loads(response.body) == [{"id": 7, "auth0_id": "auth0|7", "name": "Ada", "email": "ada@example.com",
+                                          "is_active": True}]
+
+    response = SchemaResponse(UserDetail.model_validate(user), UserDetail, status_code=201)
+    assert response.status_code == 201
+    assert json.loads(response.body)["created_at"] == "2025-01-02T03:04:05"
+    assert json.loads(response.body)["user_type"] == UserTypeEnum.ORG_USER.value
@@ -0,0 +1,112 @@
+import os
+import time
+
+import pytest
+
+from src.utils.shared_cache import (
+    LocalFileCache,
+    RedisCache,
+    SharedCache,
+    bump_versions,
+    create_shared_cache,
+    get_versions,
+    set_shared_cache,
+)
+
+
+class FakeRedis:
+    """Stand-in for a Redis server implementing the few commands RedisCache sends."""
+
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        now = time.monotonic()
+        return [value.encode() if value is not None and (expires_at is None or expires_at > now) else None
+                for value, expires_at in (self.values.get(key, (None, None)) for key in keys)]
+
+    def set(self, key, value, px=None):
+        self.values[key] = (str(value), time.monotonic() + px / 1000 if px else None)
+
+    def incr(self, key):
+        value = int(self.mget([key])[0] or 0) + 1
+        self.set(key, value)
+        return value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append(lambda: self.client.set(*args, **kwargs))
+
+    def incr(self, key):
+        self.commands.append(lambda: self.client.incr(key))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture(params=["file", "redis"])
+def shared_cache(request, tmp_path):
+    if request.param == "file":
+        return LocalFileCache(str(tmp_path))
+    return RedisCache(FakeRedis())
+
+
+def test_get_many_returns_none_for_missing_and_expired_keys(shared_cache):
+    shared_cache.set_many({"a": "1", "b": "2"})
+    shared_cache.set_many({"c": "3"}, ttl=0.001)
+    time.sleep(0.01)
+    assert shared_cache.get_many(["a", "b", "c", "d"]) == ["1", "2", None, None]
+
+
+def test_incr_many_counts_from_zero(shared_cache):
+    assert shared_cache.incr_many(["x", "y"]) == [1, 1]
+    assert shared_cache.incr_many(["x"]) == [2]
+    assert shared_cache.get_many(["x", "y"]) == ["2", "1"]
+
+
+def test_file_cache_is_shared_between_handles(tmp_path):
+    first, second = LocalFileCache(str(tmp_path)), LocalFileCache(str(tmp_path))
+    first.incr_many(["version"])
+    second.incr_many(["version"])
+    assert first.get_many(["version"]) == ["2"]
+
+
+def test_file_cache_deletes_expired_entries(tmp_path):
+    cache = LocalFileCache(str(tmp_path), sweep_interval=0)
+    cache.set_many({"read": "1", "abandoned": "2"}, ttl=0.001)
+    cache.set_many({"counter": "3"})
+    time.sleep(0.01)
+    assert cache.get_many(["read"]) == [None]
+    assert len(os.listdir(tmp_path)) == 2
+    # Entries nobody reads again, e.g. of an outdated version, go with the next sweep
+    cache.set_many({"fresh": "4"}, ttl=60)
+    assert sorted(cache.get_many(["counter", "fresh"])) == ["3", "4"]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_create_shared_cache_picks_the_backend(tmp_path):
+    with pytest.raises(TypeError):
+        SharedCache()
+    assert create_shared_cache(None) is None
+    assert isinstance(create_shared_cache(f"file://{tmp_path}"), LocalFileCache)
+    with pytest.raises(ValueError):
+        create_shared_cache("memcached://localhost")
+
+
+def test_versions_without_and_with_a_shared_cache(tmp_path):
+    assert get_versions(["a", "b"]) == [0, 0]
+    bump_versions(["a"])  # nothing to bump without a shared cache
+    set_shared_cache(LocalFileCache(str(tmp_path)))
+    try:
+        bump_versions(["a", "a"])
+        assert get_versions(["a", "b"]) == [1, 0]
+    finally:
+        set_shared_cache(None)